@@ -0,0 +1,207 @@
+from django.conf import settings
+from django.db import connections, transaction
+from rest_framework import generics, status
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+from home.stats import refresh_authors
+from listcache.signals import invalidate_lists
+
+
+DEFAULT_MAX_ITEMS = 5000
+DEFAULT_BATCH_SIZE = 1000
+
+
+def update_from_values(queryset, instances, field_names, batch_size):
+    model = queryset.model
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    fields = [model._meta.pk] + [model._meta.get_field(name) for name in field_names]
+    columns = ', '.join(quote(field.column) for field in fields)
+    row = '(' + ', '.join(f'%s::{field.db_type(connection)}' for field in fields) + ')'
+    assignments = ', '.join(f'{quote(field.column)} = v.{quote(field.column)}' for field in fields[1:])
+    table, pk = quote(model._meta.db_table), quote(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        for start in range(0, len(instances), batch_size):
+            batch = instances[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(getattr(instance, field.attname), connection)
+                for instance in batch
+                for field in fields
+            ]
+            cursor.execute(
+                f'UPDATE {table} SET {assignments} FROM (VALUES {", ".join([row] * len(batch))}) AS v ({columns}) '
+                f'WHERE {table}.{pk} = v.{pk}',
+                params,
+            )
+
+
+class BulkAPIView(generics.GenericAPIView):
+    authentication_classes = [BasicAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(author=self.request.user)
+
+    def check_author(self, attrs, creating):
+        if self.request.user.is_staff:
+            return
+        if (creating or 'author' in attrs) and attrs.get('author') != self.request.user:
+            raise PermissionDenied('Only staff can write posts of other users.')
+
+    def get_max_items(self):
+        return getattr(settings, 'API_BULK_MAX_ITEMS', DEFAULT_MAX_ITEMS)
+
+    def get_batch_size(self):
+        return getattr(settings, 'API_BULK_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    def get_items(self):
+        items = self.request.data
+        if not isinstance(items, list):
+            raise ValidationError({'non_field_errors': ['Send a list of objects.']})
+        if len(items) > self.get_max_items():
+            raise ValidationError({'non_field_errors': [f'Send at most {self.get_max_items()} objects at a time.']})
+        return items
+
+    def get_ids(self, items):
+        ids, errors = [], []
+        for item in items:
+            pk = item.get('id') if isinstance(item, dict) else item
+            if isinstance(pk, int) and not isinstance(pk, bool):
+                ids.append(pk)
+                errors.append({})
+            else:
+                ids.append(None)
+                errors.append({'id': ['This field is required.']})
+        if len(set(ids)) < len(ids):
+            seen = set()
+            for index, pk in enumerate(ids):
+                if pk is not None and pk in seen:
+                    errors[index] = {'id': ['This object is listed twice.']}
+                seen.add(pk)
+        return ids, errors
+
+    def get_instances(self, items):
+        ids, errors = self.get_ids(items)
+        found = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        for index, pk in enumerate(ids):
+            if pk is not None and pk not in found and not errors[index]:
+                errors[index] = {'id': [f'No object with id {pk}.']}
+        if any(errors):
+            raise ValidationError(errors)
+        return [found[pk] for pk in ids]
+
+    def preload_related(self, items):
+        preloaded = {}
+        for name, field in self.get_serializer_class()().fields.items():
+            if field.read_only or not isinstance(field, PrimaryKeyRelatedField):
+                continue
+            ids = {item[name] for item in items if isinstance(item, dict) and type(item.get(name)) is int}
+            if ids:
+                preloaded[name] = field.get_queryset().in_bulk(ids)
+        return preloaded
+
+    def prepare(self, instance, fields):
+        return fields
+
+    def written(self):
+        invalidate_lists(self.get_queryset().model)
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items()
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.context['preloaded'] = self.preload_related(items)
+        serializer.is_valid(raise_exception=True)
+        model = self.get_queryset().model
+        instances = []
+        for attrs in serializer.validated_data:
+            self.check_author(attrs, creating=True)
+        for attrs in serializer.validated_data:
+            instance = model(**attrs)
+            self.prepare(instance, None)
+            instances.append(instance)
+        with transaction.atomic():
+            model._default_manager.bulk_create(instances, batch_size=self.get_batch_size())
+            refresh_authors(model, {getattr(instance, 'author_id', None) for instance in instances})
+            self.written()
+        return Response(self.get_serializer(instances, many=True).data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items()
+        instances = self.get_instances(items)
+        serializer = self.get_serializer(instances, data=items, many=True, partial=True)
+        serializer.context['preloaded'] = self.preload_related(items)
+        serializer.is_valid(raise_exception=True)
+
+        model = self.get_queryset().model
+        auto_now = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        fields = set()
+        authors = {getattr(instance, 'author_id', None) for instance in instances}
+        for attrs in serializer.validated_data:
+            self.check_author(attrs, creating=False)
+        for instance, attrs in zip(instances, serializer.validated_data):
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            for field in auto_now:
+                field.pre_save(instance, False)
+            fields |= self.prepare(instance, set(attrs)) | {field.name for field in auto_now}
+        if fields:
+            with transaction.atomic():
+                update_from_values(self.get_queryset(), instances, sorted(fields), self.get_batch_size())
+                if 'author' in fields:
+                    refresh_authors(model, authors | {instance.author_id for instance in instances})
+                self.written()
+        return Response(self.get_serializer(instances, many=True).data)
+
+    def delete(self, request, *args, **kwargs):
+        instances = self.get_instances(self.get_items())
+        with transaction.atomic():
+            deleted, _ = self.get_queryset().filter(pk__in=[instance.pk for instance in instances]).delete()
+        return Response({'deleted': deleted})
+
+"""
+- `update_from_values(queryset, instances, field_names, batch_size)` writes the given fields of model instances with
+one `UPDATE ... FROM (VALUES ...)` statement per batch, joining the table to the list of new values by primary key.
+Django's `bulk_update` builds a `CASE WHEN id = ... THEN ...` expression per row and field, which takes longer to
+build in Python and to run than the update itself for batches of thousands of rows. Values are converted as `save()`
+converts them and cast to the column types, since PostgreSQL cannot infer the types of a `VALUES` list.
+
+- `BulkAPIView` is the base of the `/apis/<resource>/bulk/` endpoints, which write many objects in one request and
+one transaction. They require an authenticated user, with HTTP basic authentication (an importer script) or a
+session; anonymous requests get a `401`. Staff users may write any post. Other users can only update and delete
+their own posts, whose ids are the only ones `get_queryset` finds, and only create posts as themselves: any other
+`author`, or none for posts that may have none, fails the whole request with a `403` (`check_author`). Every
+request is all or nothing: when one object is invalid nothing is written, and the response is a `400` with a list
+of errors in the order of the objects sent, `{}` for the valid ones.
+
+- `post` creates the objects of a JSON list. They are validated by the resource's serializer in list mode
+(`many=True`) and inserted with `bulk_create`, one `INSERT` per `API_BULK_BATCH_SIZE` objects. The response lists
+the created objects with their ids.
+
+- `patch` updates the objects of a JSON list, each with its `id` and the fields to change. The objects are loaded
+with one query (`get_instances`), validated as a partial update in list mode and written with `update_from_values`, one
+`UPDATE` per batch for the fields any of them changed. `auto_now` fields such as `updated_at` are set as `save()`
+would, so the exports' `?since=` pulls see the change.
+
+- `delete` deletes the objects whose ids (or `{"id": ...}` objects) are listed and returns how many were deleted,
+including the rows deleted with them (comments of a post).
+
+- `preload_related` loads the related objects referenced by the sent objects (the `author` ids) with one `in_bulk`
+query per related field and passes them to the serializer, whose `PreloadedPrimaryKeyRelatedField` validates
+them without a query per object.
+
+- `get_items` rejects a body that is not a list or has more than `API_BULK_MAX_ITEMS` objects.
+
+- `bulk_create` and the bulk `UPDATE` do not send `pre_save`/`post_save`. `prepare(instance, fields)` is the hook for the
+work a resource does on save; it gets the fields changed by an update (`None` on create) and returns them with
+the fields it changed itself. `written()` invalidates the cached list pages of the model once per request, as the
+`listcache` receiver does on every save. The home page counts of the authors of created posts, and of the old and
+new authors of posts whose author changed, are rebuilt (`home.stats.refresh_authors`). Deletes go through
+`QuerySet.delete()`, which sends `post_delete` for every row while receivers are connected.
+"""
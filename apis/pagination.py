@@ -0,0 +1,141 @@
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [queryset.model._meta.get_field(order.lstrip('-')) for order in self.ordering]
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (reverse, current_position, encoded_position) = (False, None, None)
+        else:
+            (_, reverse, current_position) = self.cursor
+            encoded_position = self._encode_position(current_position)
+
+        if reverse:
+            queryset = queryset.order_by(*[self._flip(order) for order in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._seek(current_position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+
+        if self.page:
+            self.next_position = self._get_position_from_instance(self.page[-1], self.ordering)
+            self.previous_position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            # An empty page can only be reached from a cursor; stepping back over it
+            # in either direction starts from that same position.
+            self.next_position = self.previous_position = encoded_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            values = json.loads(cursor.position)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            return self._encode_position([instance[field.name] for field in self.fields])
+        return self._encode_position([getattr(instance, field.attname) for field in self.fields])
+
+    @staticmethod
+    def _encode_position(values):
+        values = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+        return json.dumps(values, separators=(',', ':'))
+
+    def _seek(self, position, reverse):
+        condition = Q()
+        equal = {}
+        for order, value in zip(self.ordering, position):
+            name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first = self.ordering[0]
+        bound = 'lte' if first.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & condition
+
+    @staticmethod
+    def _flip(order):
+        return order[1:] if order.startswith('-') else '-' + order
+
+"""
+- `KeysetCursorPagination` is a pagination class that inherits from DRF's `CursorPagination` and pages through
+a list endpoint with opaque `next`/`previous` cursors.
+
+- `ordering` is the default keyset, `('-created_at', '-id')`. A view can override it with its own `ordering`
+attribute, e.g. `('-created_on', '-id')`. The last column should always be unique so that rows sharing a
+timestamp are never skipped or repeated.
+
+- `page_size` comes from `REST_FRAMEWORK['PAGE_SIZE']` and clients can ask for a different size with the
+`page_size` query parameter, capped at `max_page_size`.
+
+- `paginate_queryset()` differs from DRF's cursor implementation in that the cursor stores the values of every
+ordering column of the boundary row instead of a position plus an offset. `_seek()` selects the next page with
+`created_at <= v AND (created_at < v OR (created_at = v AND id < pk))`. The `OR` chain alone would be applied as
+a filter to an index read from the newest row; the bound on the first column is the start of the index range scan,
+so the database walks the `(created_at, id)` index from the cursor instead of skipping rows as `OFFSET` does, and
+every page costs the same no matter how deep into the table it is.
+
+- `decode_cursor()` and `_get_position_from_instance()` turn the boundary values into the JSON position stored
+in the cursor and back, using each model field's `to_python()` so dates and datetimes round-trip exactly.
+A tampered or malformed cursor results in a 404 `Invalid cursor` response. Pages of `.values()` rows (see
+`apis/values.py`) are dicts, whose boundary values are read by field name.
+"""
@@ -5,7 +5,23 @@ from marketplace.models import MarketplaceItemPost
 from tennis_app.models import Posts as TennisPost
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded and type(data) is int and data in preloaded:
+            return preloaded[data]
+        return super().to_internal_value(data)
+"""
+- The `PreloadedPrimaryKeyRelatedField` class is the related field of the serializers below. It is a
+`PrimaryKeyRelatedField` that first looks the id up in the objects the view passed in the `preloaded` context
+(`{field name: {id: object}}`), so validating a list of objects does not query the related object of each one.
+Ids that were not preloaded are looked up and validated as usual.
+"""
+
+
 class ParentingSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Post
         fields = ('id',
@@ -17,6 +33,7 @@ class ParentingSerializer(serializers.ModelSerializer):
                   'image')
 """
 - The `ParentingSerializer` class is a serializer class that inherits from `serializers.ModelSerializer`.
+- `serializer_related_field` makes the related fields (`author`) use the objects preloaded by the bulk endpoints.
 - The `Meta` inner class is used to specify the metadata for the serializer.
 - The `model` attribute is set to the `Post` model, indicating that this serializer will be used for serializing 
 and deserializing `Post` objects.
@@ -27,6 +44,8 @@ representation of a `Post` object. These fields include `id`, `author`, `title`,
 
 
 class LaikaSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = LaikaPost
         fields = ('id',
@@ -38,6 +57,7 @@ class LaikaSerializer(serializers.ModelSerializer):
                   'updated_at')
 """
 - The `LaikaSerializer` class is a serializer class that inherits from `serializers.ModelSerializer`.
+- `serializer_related_field` makes the related fields (`author`) use the objects preloaded by the bulk endpoints.
 - The `Meta` inner class is used to specify the metadata for the serializer.
 - The `model` attribute is set to the `LaikaPost` model, indicating that this serializer will be used for 
 serializing and deserializing `LaikaPost` objects.
@@ -48,6 +68,8 @@ representation of a `LaikaPost` object. These fields include `id`, `author`, `im
 
 
 class MarketplaceSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = MarketplaceItemPost
         fields = ('id',
@@ -62,6 +84,7 @@ class MarketplaceSerializer(serializers.ModelSerializer):
                   'image')
 """
 - The `MarketplaceSerializer` class is a serializer class that inherits from `serializers.ModelSerializer`.
+- `serializer_related_field` makes the related fields (`author`) use the objects preloaded by the bulk endpoints.
 - The `Meta` inner class is used to specify the metadata for the serializer.
 - The `model` attribute is set to the `MarketplaceItemPost` model, indicating that this serializer will be used 
 for serializing and deserializing `MarketplaceItemPost` objects.
@@ -72,12 +95,11 @@ representation of a `MarketplaceItemPost` object. These fields include `id`, `au
 
 
 class TennisSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = TennisPost
         fields = ('id',
-                  'user_name', 
-                  'user_last', 
-                  'user_email', 
                   'user_gender', 
                   'birth_date', 
                   'phone', 
@@ -92,11 +114,12 @@ class TennisSerializer(serializers.ModelSerializer):
                   'author')
 """
 - The `TennisSerializer` class is a serializer class that inherits from `serializers.ModelSerializer`.
+- `serializer_related_field` makes the related fields (`author`) use the objects preloaded by the bulk endpoints.
 - The `Meta` inner class is used to specify the metadata for the serializer.
 - The `model` attribute is set to the `TennisPost` model, indicating that this serializer will be used for 
 serializing and deserializing `TennisPost` objects.
 - The `fields` attribute is a tuple that specifies the fields that should be included in the serialized 
-representation of a `TennisPost` object. These fields include `id`, `user_name`, `user_last`, `user_email`, 
+representation of a `TennisPost` object. These fields include `id`, 
 `user_gender`, `birth_date`, `phone`, `description`, `current_date`, `play_date`, `image`, `level`, `language`, 
 `type`, `club_name`, and `author`.
 """
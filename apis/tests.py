@@ -1,3 +1,532 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from django.contrib.auth.models import User
+from get_app.models import Post
+from laika.models import Post as LaikaPost
+from tennis_app.models import Comments as TennisComment, Posts as TennisPost
+from marketplace.models import MarketplaceItemPost
+from apis.serializers import MarketplaceSerializer, TennisSerializer
+from apis.values import compile_serializer
+
+
+class ParentingAPIPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for i in range(7):
+            Post.objects.create(author=cls.user, title=f'Test Post {i}', description=f'This is test post {i}')
+        # Give every post the same timestamp so the pages can only be told apart by the `id` tie-breaker.
+        cls.created_at = Post.objects.first().created_at
+        Post.objects.update(created_at=cls.created_at)
+    """
+    The `setUpTestData` method creates a user and seven parenting posts that all share one `created_at` value.
+    """
+
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(post['id'] for post in response.data['results'])
+            url = response.data['next']
+        return ids
+    """
+    The `collect_pages` helper follows the `next` links from `url` until the last page and returns the ids of
+    every post it saw, in order.
+    """
+
+    def test_first_page_shape(self):
+        response = self.client.get(reverse('parenting-api'), {'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+    """
+    The `test_first_page_shape` method tests that the first page has `page_size` results, a `next` cursor and no
+    `previous` cursor.
+    """
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids = self.collect_pages(reverse('parenting-api') + '?page_size=3')
+        expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+    """
+    The `test_pages_cover_every_row_once_in_order` method tests that walking the `next` cursors returns every post
+    exactly once, newest first, even though all posts share the same timestamp.
+    """
+
+    def test_previous_cursor_returns_previous_page(self):
+        first = self.client.get(reverse('parenting-api'), {'page_size': 3}).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([post['id'] for post in back['results']], [post['id'] for post in first['results']])
+        self.assertIsNone(back['previous'])
+    """
+    The `test_previous_cursor_returns_previous_page` method tests that following `previous` from the second page
+    returns the first page again.
+    """
+
+    def test_constant_queries_per_page(self):
+        first = self.client.get(reverse('parenting-api'), {'page_size': 2}).data
+        with self.assertNumQueries(1):
+            self.client.get(first['next'])
+    """
+    The `test_constant_queries_per_page` method tests that a page is fetched with a single query and no `COUNT(*)`.
+    """
+
+    def test_deep_page_starts_the_index_scan_at_the_cursor(self):
+        Post.objects.bulk_create(
+            Post(author=self.user, title=f'Old post {i}', description='Older') for i in range(2000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE get_app_post SET created_at = created_at - id * interval '1 minute'")
+        url = reverse('parenting-api') + '?page_size=100'
+        for _ in range(15):
+            url = self.client.get(url).data['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE get_app_post')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f"EXPLAIN {queries[0]['sql']}")
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn('get_app_post_created_id_idx', plan)
+        conditions = [line for line in plan.splitlines() if 'Index Cond' in line]
+        self.assertTrue(conditions, plan)
+        self.assertTrue(all('created_at <' in line or 'created_at =' in line for line in conditions), plan)
+    """
+    The `test_deep_page_starts_the_index_scan_at_the_cursor` method tests that the query of a page 1500 posts deep
+    reads the `(created_at, id)` index from the cursor position, every index scan bounded by an `Index Cond` on
+    `created_at`, instead of reading it from the newest post, or the primary key from the lowest id, and filtering
+    the rows of the pages before.
+    """
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('parenting-api'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+    """
+    The `test_invalid_cursor` method tests that a malformed cursor results in a 404 response.
+    """
+
+
+class MarketplaceAPIPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for i in range(5):
+            MarketplaceItemPost.objects.create(
+                author=cls.user,
+                title=f'Test Post {i}',
+                description=f'Description for Test Post {i}',
+                price=10.0 + i,
+                location='Test Location',
+                category='technology',
+            )
+    """
+    The `setUpTestData` method creates a user and five marketplace posts.
+    """
+
+    def test_page_size_and_order(self):
+        response = self.client.get(reverse('marketplace-api'), {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        expected = list(MarketplaceItemPost.objects.order_by('-created_on', '-id').values_list('id', flat=True)[:2])
+        self.assertEqual([post['id'] for post in response.data['results']], expected)
+    """
+    The `test_page_size_and_order` method tests that the marketplace endpoint pages on `created_on`, newest first.
+    """
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get(reverse('marketplace-api'), {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+    """
+    The `test_last_page_has_no_next` method tests that a page that reaches the end of the table has no `next` link.
+    """
+
+
+class ExportAPITest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for i in range(5):
+            MarketplaceItemPost.objects.create(
+                author=cls.user, title=f'Item {i}', description='Good, as new', price=i, location='Lisbon', category='books'
+            )
+        posts = list(MarketplaceItemPost.objects.order_by('id'))
+        cls.start = timezone.now() - timedelta(days=10)
+        for days, post in enumerate(posts):
+            MarketplaceItemPost.objects.filter(pk=post.pk).update(updated_on=cls.start + timedelta(days=days))
+    """
+    The `setUpTestData` method creates five marketplace posts updated one day apart, the first ten days ago.
+    """
+
+    def export(self, **params):
+        response = self.client.get(reverse('marketplace-export-api'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+    """
+    The `export` helper requests the marketplace export and returns the response and its whole body.
+    """
+
+    def test_ndjson_export_streams_every_row_with_the_serializer_fields(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Item {i}' for i in range(5)])
+        self.assertEqual(list(rows[0]), list(MarketplaceSerializer.Meta.fields))
+    """
+    - The `test_ndjson_export_streams_every_row_with_the_serializer_fields` method tests that the default export is
+    one JSON object per line, oldest change first, with the fields of `MarketplaceSerializer`.
+    """
+
+    def test_csv_export_has_a_header_line(self):
+        response, body = self.export(format='csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="marketplaceitempost.csv"')
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual(rows[0], list(MarketplaceSerializer.Meta.fields))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][rows[0].index('description')], 'Good, as new')
+        self.assertEqual(rows[1][rows[0].index('image')], '')
+    """
+    - The `test_csv_export_has_a_header_line` method tests the CSV export: a header line with the serializer's field
+    names, then one quoted line per post, with empty values for missing ones.
+    """
+
+    def test_since_returns_the_rows_updated_later(self):
+        since = (self.start + timedelta(days=2)).isoformat()
+        _, body = self.export(since=since)
+        self.assertEqual([json.loads(line)['title'] for line in body.splitlines()], ['Item 3', 'Item 4'])
+
+        response = self.client.get(reverse('marketplace-export-api'), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('marketplace-export-api'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+    """
+    - The `test_since_returns_the_rows_updated_later` method tests that `?since=` keeps only the posts updated after
+    the timestamp, and that an invalid timestamp or format is rejected.
+    """
+
+    def test_every_resource_has_an_export(self):
+        Post.objects.create(author=self.user, title='Parenting post', description='A post')
+        for name in ['parenting-export-api', 'laika-export-api', 'tennis-export-api']:
+            response = self.client.get(reverse(name), {'since': '2000-01-01'})
+            self.assertEqual(response.status_code, 200)
+            b''.join(response.streaming_content)
+    """
+    - The `test_every_resource_has_an_export` method tests that the other resources have an export endpoint too.
+    """
+
+
+    def test_tennis_since_returns_edited_posts(self):
+        old = TennisPost.objects.create(
+            author=self.user, phone='123', description='Singles?', level='3', language='1', current_date='2020-01-01',
+        )
+        TennisPost.objects.create(author=self.user, phone='456', description='Doubles?', level='3', language='1')
+        TennisPost.objects.update(updated_at=self.start)
+        since = timezone.now().isoformat()
+        old.description = 'Singles on Sunday?'
+        old.save()
+        response = self.client.get(reverse('tennis-export-api'), {'since': since})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['description'] for row in rows], ['Singles on Sunday?'])
+    """
+    - The `test_tennis_since_returns_edited_posts` method tests that the tennis export filters on the time posts
+    were last saved, so `?since=` returns an old post edited after it and not the posts left alone.
+    """
+
+class BulkAPITest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.url = reverse('marketplace-bulk-api')
+        cls.other = User.objects.create_user(username='other', password='testpassword')
+
+    def setUp(self):
+        self.client.login(username='testuser', password='testpassword')
+
+    def item(self, i, **fields):
+        return {
+            'author': self.user.pk, 'title': f'Item {i}', 'description': 'Good as new', 'price': '10.00',
+            'location': 'Lisbon', 'category': 'books', **fields,
+        }
+    """
+    The `item` helper returns the JSON of a marketplace post to send to the bulk endpoint.
+    """
+
+    def test_create_inserts_every_object_in_one_statement(self):
+        items = [self.item(i) for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 300)
+        self.assertEqual(MarketplaceItemPost.objects.count(), 300)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "marketplace_marketplaceitempost"')]
+        self.assertEqual(len(inserts), 1)
+        post = MarketplaceItemPost.objects.get(pk=response.data[0]['id'])
+        self.assertAlmostEqual(post.latitude, 38.72, places=2)
+    """
+    - The `test_create_inserts_every_object_in_one_statement` method tests that the posts of a list are created with
+    a single `INSERT` into the posts table, returned with their ids, and geocoded as saved posts are.
+    """
+
+    def test_invalid_object_writes_nothing(self):
+        items = [self.item(0), self.item(1, price='cheap'), self.item(2)]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('price', response.data[1])
+        self.assertEqual(MarketplaceItemPost.objects.count(), 0)
+
+        response = self.client.post(self.url, self.item(0), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    """
+    - The `test_invalid_object_writes_nothing` method tests that one invalid post fails the whole request with the
+    errors listed per post, and that a body that is not a list is rejected.
+    """
+
+    def test_update_changes_the_listed_objects(self):
+        posts = [MarketplaceItemPost.objects.create(**{**self.item(i), 'author': self.user}) for i in range(3)]
+        before = posts[0].updated_on
+        items = [{'id': posts[0].pk, 'price': '5.00'}, {'id': posts[1].pk, 'location': 'Porto'}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+
+        for post in posts:
+            post.refresh_from_db()
+        self.assertEqual(str(posts[0].price), '5.00')
+        self.assertEqual(posts[0].location, 'Lisbon')
+        self.assertGreater(posts[0].updated_on, before)
+        self.assertAlmostEqual(posts[1].latitude, 41.16, places=2)
+        self.assertEqual(str(posts[2].price), '10.00')
+
+        response = self.client.patch(self.url, [{'id': posts[0].pk}, {'id': 0}, {'price': '1'}], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('id', response.data[1])
+        self.assertIn('id', response.data[2])
+    """
+    - The `test_update_changes_the_listed_objects` method tests that a partial update of a list writes only the
+    given fields with one `UPDATE`, bumps `updated_on`, geocodes a changed location, leaves other posts alone, and
+    reports unknown or missing ids per object.
+    """
+
+    def test_delete_removes_the_listed_objects(self):
+        posts = [MarketplaceItemPost.objects.create(**{**self.item(i), 'author': self.user}) for i in range(3)]
+        response = self.client.delete(self.url, [posts[0].pk, {'id': posts[1].pk}], content_type='application/json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual(list(MarketplaceItemPost.objects.values_list('pk', flat=True)), [posts[2].pk])
+
+        response = self.client.delete(self.url, [posts[2].pk, posts[2].pk], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(MarketplaceItemPost.objects.exists())
+    """
+    - The `test_delete_removes_the_listed_objects` method tests that the listed posts, by id or as objects, are
+    deleted, and that a post listed twice fails the request without deleting anything.
+    """
+
+    def test_requires_a_user_writing_their_own_posts(self):
+        self.client.logout()
+        response = self.client.post(self.url, [self.item(0)], content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Basic', response['WWW-Authenticate'])
+        self.assertEqual(self.client.delete(self.url, [0], content_type='application/json').status_code, 401)
+
+        auth = f"Basic {base64.b64encode(b'testuser:testpassword').decode()}"
+        items = [self.item(0), self.item(1)]
+        response = self.client.post(self.url, items, content_type='application/json', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(MarketplaceItemPost.objects.filter(author=self.user).count(), 2)
+
+        response = self.client.post(self.url, [self.item(2), self.item(3, author=self.other.pk)],
+                                    content_type='application/json', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(MarketplaceItemPost.objects.count(), 2)
+        tennis = {'birth_date': '1990-05-01', 'phone': '123', 'description': 'Singles?', 'current_date': '2024-01-01',
+                  'level': '3', 'language': '1'}
+        response = self.client.post(reverse('tennis-bulk-api'), [tennis], content_type='application/json',
+                                    HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 403)
+        own = MarketplaceItemPost.objects.first().pk
+        response = self.client.patch(self.url, [{'id': own, 'author': self.other.pk}], content_type='application/json',
+                                     HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='testuser', password='testpassword')
+        theirs = MarketplaceItemPost.objects.create(**{**self.item(4), 'author': self.other})
+        response = self.client.delete(self.url, [own, theirs.pk], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data[1])
+        self.assertEqual(MarketplaceItemPost.objects.count(), 3)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.patch(self.url, [{'id': own, 'author': self.other.pk}], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MarketplaceItemPost.objects.get(pk=own).author, self.other)
+    """
+    - The `test_requires_a_user_writing_their_own_posts` method tests that anonymous requests are refused with a
+    `401` asking for basic authentication, that a user authenticated with it creates posts as themselves, that
+    creating a post of another author or of none, or moving a post to another author, is a `403` that writes
+    nothing, that the posts of other users are unknown ids to them, and that staff users can give a post to anyone.
+    """
+
+    def test_tennis_posts_get_their_birth_year(self):
+        url = reverse('tennis-bulk-api')
+        item = {'author': self.user.pk, 'birth_date': '1990-05-01', 'phone': '123', 'description': 'Singles?',
+                'current_date': '2024-01-01', 'level': '3', 'language': '1'}
+        response = self.client.post(url, [item], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        post = TennisPost.objects.get(pk=response.data[0]['id'])
+        self.assertEqual(post.birth_year, 1990)
+
+        self.client.patch(url, [{'id': post.pk, 'birth_date': '1985-01-01'}], content_type='application/json')
+        post.refresh_from_db()
+        self.assertEqual(post.birth_year, 1985)
+    """
+    - The `test_tennis_posts_get_their_birth_year` method tests that tennis posts created or given a new birth date
+    through the bulk endpoint get their birth year, although they are not saved one by one.
+    """
+
+
+class DetailAPIConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.post = MarketplaceItemPost.objects.create(
+            author=cls.user, title='Bike', description='Good as new', price=10, location='Lisbon', category='books'
+        )
+        cls.url = reverse('marketplace-detail-api', kwargs={'pk': cls.post.pk})
+
+    def test_unchanged_object_is_not_sent_again(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.client.patch(self.url, {'price': '12.00'}, content_type='application/json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['price'], '12.00')
+    """
+    - The `test_unchanged_object_is_not_sent_again` method tests that the marketplace detail endpoint, validated by
+    its `updated_on` timestamp alone, answers a request with a current `ETag` or `Last-Modified` with a `304`, after
+    a single query, and sends the object again once it changed.
+    """
+
+    def test_same_day_edit_of_a_laika_post_changes_the_etag(self):
+        post = LaikaPost.objects.create(author=self.user, title='Rex', description='Good dog')
+        url = reverse('laika-detail-api', kwargs={'pk': post.pk})
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        LaikaPost.objects.filter(pk=post.pk).update(title='Max')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+        LaikaPost.objects.filter(pk=post.pk).update(title='Ma', description='xGood dog')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+    """
+    - The `test_same_day_edit_of_a_laika_post_changes_the_etag` method tests that the Laika detail endpoint, whose
+    `updated_at` is a date, hashes the post's fields into its `ETag`, so an edit on the same day is sent again, even
+    one that only moves text from a field to the next.
+    """
+
+    def test_tennis_post_etag_follows_its_edits_and_comments(self):
+        post = TennisPost.objects.create(author=self.user, phone='123', description='Singles?', level='3', language='1')
+        url = reverse('tennis-detail-api', kwargs={'pk': post.pk})
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        post.description = 'Doubles?'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        TennisComment.objects.create(post=post, author=self.user, text='Count me in', rank='4')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    """
+    - The `test_tennis_post_etag_follows_its_edits_and_comments` method tests that the tennis detail endpoint
+    sends no `Last-Modified` header, answers a current `ETag` with a `304` after a single query, and sends the post
+    again after an edit or a new comment, which only changes its counters.
+    """
+
+class ValuesSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        TennisPost.objects.create(
+            phone='123', description='Any level', level='2', language='1', user_gender='F', author=cls.user
+        )
+        TennisPost.objects.create(phone='456', description='Doubles', level='5', language='3', image='', club_name='Club')
+        MarketplaceItemPost.objects.create(
+            author=cls.user, title='Bike', description='Good as new', price='10.5', location='Lisbon',
+            category='books', image='market_img/a b.png'
+        )
+        MarketplaceItemPost.objects.create(author=cls.user, title='Lamp', description='Old', price=3, location='Porto')
+
+    def assert_same_output(self, url, model, serializer_class, ordering):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        request = Request(RequestFactory().get(url))
+        instances = model.objects.order_by(*ordering)
+        expected = serializer_class(instances, many=True, context={'request': request}).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+    def test_list_output_is_the_serializer_output(self):
+        self.assert_same_output(reverse('tennis-api'), TennisPost, TennisSerializer, ('-current_date', '-id'))
+        self.assert_same_output(
+            reverse('marketplace-api'), MarketplaceItemPost, MarketplaceSerializer, ('-created_on', '-id')
+        )
+    """
+    - The `test_list_output_is_the_serializer_output` method tests that the tennis and marketplace list pages, read
+    with `.values()`, render to the same JSON bytes as their serializers: absolute image URLs with escaped names,
+    empty and missing images, choices, empty fields, dates, timestamps and decimals.
+    """
+
+    def test_cursor_pages_of_values_rows(self):
+        response = self.client.get(reverse('marketplace-api'), {'page_size': 1})
+        second = self.client.get(response.data['next'])
+        self.assertEqual(
+            [response.data['results'][0]['title'], second.data['results'][0]['title']], ['Lamp', 'Bike']
+        )
+        self.assertIsNone(second.data['next'])
+    """
+    - The `test_cursor_pages_of_values_rows` method tests that the paginator builds its cursors from the dict rows.
+    """
+
+    def test_fields_that_are_not_columns_are_rejected(self):
+        class TitleLengthSerializer(serializers.ModelSerializer):
+            title_length = serializers.SerializerMethodField()
+
+            class Meta:
+                model = MarketplaceItemPost
+                fields = ('id', 'title_length')
+
+        with self.assertRaises(ImproperlyConfigured):
+            compile_serializer(TitleLengthSerializer)
+    """
+    - The `test_fields_that_are_not_columns_are_rejected` method tests that a serializer with a field that cannot be
+    read from a column is not compiled.
+    """
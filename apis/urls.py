@@ -6,7 +6,15 @@ from .views import (ParentingAPIView,
                     ParentingDetailAPIView,
                     LaikaDetailAPIView,
                     MarketplaceDetailAPIView,
-                    TennisDetailAPIView)
+                    TennisDetailAPIView,
+                    ParentingExportAPIView,
+                    LaikaExportAPIView,
+                    MarketplaceExportAPIView,
+                    TennisExportAPIView,
+                    ParentingBulkAPIView,
+                    LaikaBulkAPIView,
+                    MarketplaceBulkAPIView,
+                    TennisBulkAPIView)
 
 urlpatterns = [
     path('parenting/', ParentingAPIView.as_view(), name='parenting-api'),
@@ -17,6 +25,14 @@ urlpatterns = [
     path('laika/<int:pk>/', LaikaDetailAPIView.as_view(), name='laika-detail-api'),
     path('marketplace/<int:pk>/', MarketplaceDetailAPIView.as_view(), name='marketplace-detail-api'),
     path('tennis/<int:pk>/', TennisDetailAPIView.as_view(), name='tennis-detail-api'),
+    path('parenting/export/', ParentingExportAPIView.as_view(), name='parenting-export-api'),
+    path('laika/export/', LaikaExportAPIView.as_view(), name='laika-export-api'),
+    path('marketplace/export/', MarketplaceExportAPIView.as_view(), name='marketplace-export-api'),
+    path('tennis/export/', TennisExportAPIView.as_view(), name='tennis-export-api'),
+    path('parenting/bulk/', ParentingBulkAPIView.as_view(), name='parenting-bulk-api'),
+    path('laika/bulk/', LaikaBulkAPIView.as_view(), name='laika-bulk-api'),
+    path('marketplace/bulk/', MarketplaceBulkAPIView.as_view(), name='marketplace-bulk-api'),
+    path('tennis/bulk/', TennisBulkAPIView.as_view(), name='tennis-bulk-api'),
 ]
 
 
@@ -0,0 +1,158 @@
+from decimal import Decimal
+from functools import lru_cache
+
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField)
+URL_CACHE_SIZE = 1024
+
+
+def is_iso(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def datetime_converter(field):
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.decimal_places is None:
+        return field.to_representation
+    exponent = -field.decimal_places
+
+    def convert(value):
+        if type(value) is Decimal and value.as_tuple().exponent == exponent:
+            return f'{value:f}'
+        return field.to_representation(value)
+    return convert
+
+
+class CompiledSerializer:
+    def __init__(self, serializer_class):
+        model = serializer_class.Meta.model
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not model_field.concrete:
+                raise ImproperlyConfigured(f'{serializer_class.__name__}.{name} is not a column of {model.__name__}.')
+            self.fields.append((name, field.source, field, model_field))
+        self.columns = list(dict.fromkeys(column for _, column, _, _ in self.fields))
+
+    def values(self, queryset, *extra_columns):
+        return queryset.values(*dict.fromkeys([*self.columns, *extra_columns]))
+
+    def converter(self, field, model_field, request):
+        if isinstance(field, serializers.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return lambda name: name or None
+            url = model_field.storage.url
+            if request is not None:
+                storage_url, absolute = url, request.build_absolute_uri
+                url = lambda name: absolute(storage_url(name))
+            url = lru_cache(maxsize=URL_CACHE_SIZE)(url)
+            return lambda name: url(name) if name else None
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None if field.pk_field is None else field.pk_field.to_representation
+        if isinstance(field, serializers.RelatedField):
+            raise ImproperlyConfigured(f'{type(field).__name__} {field.field_name!r} cannot be read from a column.')
+        if isinstance(field, serializers.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: value if value == '' else choices.get(str(value), value)
+        if isinstance(field, IDENTITY_FIELDS):
+            return None
+        if isinstance(field, serializers.DateTimeField) and is_iso(field, api_settings.DATETIME_FORMAT):
+            return datetime_converter(field)
+        if isinstance(field, serializers.DateField) and is_iso(field, api_settings.DATE_FORMAT):
+            return lambda value: value.isoformat()
+        if isinstance(field, serializers.DecimalField):
+            return decimal_converter(field)
+        return field.to_representation
+
+    def serialize(self, rows, request=None):
+        converters = [
+            (name, column, self.converter(field, model_field, request))
+            for name, column, field, model_field in self.fields
+        ]
+        for row in rows:
+            data = {}
+            for name, column, convert in converters:
+                value = row[column]
+                data[name] = value if convert is None or value is None else convert(value)
+            yield data
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    return CompiledSerializer(serializer_class)
+
+
+class ValuesListMixin:
+    def list(self, request, *args, **kwargs):
+        compiled = compile_serializer(self.get_serializer_class())
+        ordering = [order.lstrip('-') for order in getattr(self, 'ordering', None) or ()]
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()), *ordering)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(compiled.serialize(page, request)))
+        return Response(list(compiled.serialize(queryset, request)))
+
+"""
+- This module is the read-only fast path of the `apis` serializers. A `ModelSerializer` builds a model instance per
+row and then, for every field of every row, looks the attribute up, checks it for `None` and calls the field's
+`to_representation`. For list pages and exports of thousands of rows that bookkeeping, not the database, is most of
+the time spent. The fast path reads the rows with `.values()` and turns each one into the same dict with a plan
+worked out once per serializer class.
+
+- `CompiledSerializer(serializer_class)` reads the readable fields of the serializer's `Meta.fields` and the model
+column each one comes from. A field that is not a column of the model (a method field, a dotted `source`, a nested
+serializer) cannot be read from `.values()`, so compiling that serializer raises `ImproperlyConfigured`.
+
+- `values(queryset, *extra_columns)` selects those columns, plus any the caller needs besides, such as the ordering
+columns the paginator builds its cursors from.
+
+- `converter(field, model_field, request)` returns the function that turns a column value into what the field's
+`to_representation` returns, or `None` when the value is already that:
+    - `CharField`s and `IntegerField`s come out of the database as `str` and `int` and are used as they are.
+    - `PrimaryKeyRelatedField`s (`author`) read the `author_id` column, which is the id DRF would return.
+    - `ChoiceField`s map the stored value through the field's choices, as DRF does.
+    - `FileField`s and `ImageField`s get the file's URL from the model field's storage, made absolute with the
+    request when there is one, and `None` for an empty name, exactly like DRF's `FileField`. The URLs of the last
+    `URL_CACHE_SIZE` names are remembered for the call, since many rows share the default image.
+    - ISO 8601 dates are written with `isoformat()`. ISO 8601 timestamps are moved to the field's time zone, which
+    `datetime_converter` looks up once per call instead of once per value, and written as DRF writes them, with `Z`
+    for UTC.
+    - Decimals read from a column with the field's number of decimal places are already quantized and are only
+    written as strings; `decimal_converter` leaves any other value to the field.
+    - Every other field (other formats, naive timestamps) is converted by the field's own
+    `to_representation`, so the output follows the DRF settings.
+
+- `serialize(rows, request=None)` yields the dict of each row, with the fields in the serializer's order and
+`None` left as `None` without calling a converter, as `Serializer.to_representation` does. The rendered JSON or
+CSV is byte for byte the one of the serializer.
+
+- `compile_serializer(serializer_class)` compiles a serializer class once per process.
+
+- `ValuesListMixin` makes a `ListAPIView` use the fast path. It is meant for read-only list endpoints; the
+`queryset` and `serializer_class` of the view keep their meaning and writes still go through the serializer.
+"""
@@ -7,11 +7,20 @@ from laika.models import Post as LaikaPost
 from marketplace.models import MarketplaceItemPost
 from tennis_app.models import Posts as TennisPost
 from .serializers import ParentingSerializer, LaikaSerializer, MarketplaceSerializer, TennisSerializer
+from .pagination import KeysetCursorPagination
+from dj_proj.mixins import ConditionalGetMixin, digest
+from .exports import ExportAPIView
+from .values import ValuesListMixin
+from .bulk import BulkAPIView
+from marketplace.geo import locate
+from tennis_app.ages import set_birth_year
 
 
-class ParentingAPIView(generics.ListAPIView):
+class ParentingAPIView(ValuesListMixin, generics.ListAPIView):
     queryset = Post.objects.all()
     serializer_class = ParentingSerializer
+    pagination_class = KeysetCursorPagination
+    ordering = ('-created_at', '-id')
 """
 - The `ParentingAPIView` class is a view class that inherits from `generics.ListAPIView`, which provides a 
 read-only endpoint for retrieving a list of objects.
@@ -19,12 +28,18 @@ read-only endpoint for retrieving a list of objects.
 will be returned by the view.
 - The `serializer_class` attribute is set to `ParentingSerializer`, which specifies the serializer class that 
 will be used to serialize the `Post` objects.
+- The `pagination_class` attribute is set to `KeysetCursorPagination` and `ordering` to `('-created_at', '-id')`, so the list 
+is returned one page at a time with opaque `next`/`previous` cursors positioned on `(created_at, id)`.
+- `ValuesListMixin` reads the page with `.values()` and serializes it with the compiled fast path of the
+serializer (see `apis/values.py`), which gives the same output several times faster.
 """
 
 
-class LaikaAPIView(generics.ListAPIView):
+class LaikaAPIView(ValuesListMixin, generics.ListAPIView):
     queryset = LaikaPost.objects.all()
     serializer_class = LaikaSerializer
+    pagination_class = KeysetCursorPagination
+    ordering = ('-created_at', '-id')
 """
 - The `LaikaAPIView` class is a view class that inherits from `generics.ListAPIView`, which provides a read-only 
 endpoint for retrieving a list of objects.
@@ -32,12 +47,18 @@ endpoint for retrieving a list of objects.
 objects that will be returned by the view.
 - The `serializer_class` attribute is set to `LaikaSerializer`, which specifies the serializer class that will 
 be used to serialize the `LaikaPost` objects.
+- The `pagination_class` attribute is set to `KeysetCursorPagination` and `ordering` to `('-created_at', '-id')`, so the list 
+is returned one page at a time with opaque `next`/`previous` cursors positioned on `(created_at, id)`.
+- `ValuesListMixin` reads the page with `.values()` and serializes it with the compiled fast path of the
+serializer (see `apis/values.py`), which gives the same output several times faster.
 """
 
 
-class MarketplaceAPIView(generics.ListAPIView):
+class MarketplaceAPIView(ValuesListMixin, generics.ListAPIView):
     queryset = MarketplaceItemPost.objects.all()
     serializer_class = MarketplaceSerializer
+    pagination_class = KeysetCursorPagination
+    ordering = ('-created_on', '-id')
 """
 - The `MarketplaceAPIView` class is a view class that inherits from `generics.ListAPIView`, which provides a 
 read-only endpoint for retrieving a list of objects.
@@ -45,12 +66,18 @@ read-only endpoint for retrieving a list of objects.
 `MarketplaceItemPost` objects that will be returned by the view.
 - The `serializer_class` attribute is set to `MarketplaceSerializer`, which specifies the serializer class that 
 will be used to serialize the `MarketplaceItemPost` objects.
+- The `pagination_class` attribute is set to `KeysetCursorPagination` and `ordering` to `('-created_on', '-id')`, so the list 
+is returned one page at a time with opaque `next`/`previous` cursors positioned on `(created_on, id)`.
+- `ValuesListMixin` reads the page with `.values()` and serializes it with the compiled fast path of the
+serializer (see `apis/values.py`), which gives the same output several times faster.
 """
 
 
-class TennisAPIView(generics.ListAPIView):
+class TennisAPIView(ValuesListMixin, generics.ListAPIView):
     queryset = TennisPost.objects.all()
     serializer_class = TennisSerializer
+    pagination_class = KeysetCursorPagination
+    ordering = ('-current_date', '-id')
 """
 - The `TennisAPIView` class is a view class that inherits from `generics.ListAPIView`, which provides a read-only 
 endpoint for retrieving a list of objects.
@@ -58,12 +85,17 @@ endpoint for retrieving a list of objects.
 objects that will be returned by the view.
 - The `serializer_class` attribute is set to `TennisSerializer`, which specifies the serializer class that will 
 be used to serialize the `TennisPost` objects.
+- The `pagination_class` attribute is set to `KeysetCursorPagination` and `ordering` to `('-current_date', '-id')`, so the list 
+is returned one page at a time with opaque `next`/`previous` cursors positioned on `(current_date, id)`.
+- `ValuesListMixin` reads the page with `.values()` and serializes it with the compiled fast path of the
+serializer (see `apis/values.py`), which gives the same output several times faster.
 """
 
 
-class ParentingDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ParentingDetailAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.all()
     serializer_class = ParentingSerializer
+    vary_on_user = False
 """
 - The `ParentingDetailAPIView` class is a view class that inherits from `generics.RetrieveUpdateDestroyAPIView`, 
 which provides a read, update, and delete endpoint for a single object.
@@ -71,12 +103,18 @@ which provides a read, update, and delete endpoint for a single object.
 will be used to retrieve the single object.
 - The `serializer_class` attribute is set to `ParentingSerializer`, which specifies the serializer class that 
 will be used to serialize the `Post` objects.
+- `ConditionalGetMixin` gives the `GET` responses an `ETag` and a `Last-Modified` header and answers requests that
+send them back with `304 Not Modified` while the object is unchanged.
 """
 
 
-class LaikaDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class LaikaDetailAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = LaikaPost.objects.all()
     serializer_class = LaikaSerializer
+    vary_on_user = False
+
+    def get_validator_fields(self):
+        return {'content': digest('title', 'description', 'image', 'author_id')}
 """
 - The `LaikaDetailAPIView` class is a view class that inherits from `generics.RetrieveUpdateDestroyAPIView`, 
 which provides a read, update, and delete endpoint for a single object.
@@ -84,12 +122,17 @@ which provides a read, update, and delete endpoint for a single object.
 objects that will be used to retrieve the single object.
 - The `serializer_class` attribute is set to `LaikaSerializer`, which specifies the serializer class that will 
 be used to serialize the `LaikaPost` objects.
+- `ConditionalGetMixin` gives the `GET` responses an `ETag` and answers requests that send it back with
+`304 Not Modified` while the object is unchanged. `updated_at` is a date, so the `ETag` also hashes the fields of
+the post and there is no `Last-Modified` header.
 """
 
 
-class MarketplaceDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class MarketplaceDetailAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = MarketplaceItemPost.objects.all()
     serializer_class = MarketplaceSerializer
+    last_modified_field = 'updated_on'
+    vary_on_user = False
 """
 - The `MarketplaceDetailAPIView` class is a view class that inherits from `generics.RetrieveUpdateDestroyAPIView`, 
 which provides a read, update, and delete endpoint for a single object.
@@ -97,12 +140,18 @@ which provides a read, update, and delete endpoint for a single object.
 `MarketplaceItemPost` objects that will be used to retrieve the single object.
 - The `serializer_class` attribute is set to `MarketplaceSerializer`, which specifies the serializer class that 
 will be used to serialize the `MarketplaceItemPost` objects.
+- `ConditionalGetMixin` gives the `GET` responses an `ETag` and a `Last-Modified` header and answers requests that
+send them back with `304 Not Modified` while the object is unchanged.
 """
 
 
-class TennisDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TennisDetailAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = TennisPost.objects.all()
     serializer_class = TennisSerializer
+    vary_on_user = False
+
+    def get_validator_fields(self):
+        return {'counters': digest('comment_count', 'rank_sum')}
 """
 - The `TennisDetailAPIView` class is a view class that inherits from `generics.RetrieveUpdateDestroyAPIView`, 
 which provides a read, update, and delete endpoint for a single object.
@@ -110,4 +159,95 @@ which provides a read, update, and delete endpoint for a single object.
 objects that will be used to retrieve the single object.
 - The `serializer_class` attribute is set to `TennisSerializer`, which specifies the serializer class that will 
 be used to serialize the `TennisPost` objects.
+- `ConditionalGetMixin` gives the `GET` responses an `ETag` and answers requests that send it back with
+`304 Not Modified` while the object is unchanged. The `comment_count` and `rank_sum` counters are updated without
+saving the post, so the `ETag` hashes them with `updated_at`, and there is no `Last-Modified` header, which could
+not tell a new comment apart.
+"""
+
+
+class ParentingExportAPIView(ExportAPIView):
+    queryset = Post.objects.all()
+    serializer_class = ParentingSerializer
+    since_field = 'updated_at'
+"""
+- The `ParentingExportAPIView` class streams every parenting post as NDJSON or CSV with the fields of
+`ParentingSerializer`, oldest change first. `?since=` keeps the posts updated after a timestamp.
+"""
+
+
+class LaikaExportAPIView(ExportAPIView):
+    queryset = LaikaPost.objects.all()
+    serializer_class = LaikaSerializer
+    since_field = 'updated_at'
+"""
+- The `LaikaExportAPIView` class streams every Laika post with the fields of `LaikaSerializer`. `updated_at` is a
+date, so `?since=` keeps the posts updated on or after its day.
+"""
+
+
+class MarketplaceExportAPIView(ExportAPIView):
+    queryset = MarketplaceItemPost.objects.all()
+    serializer_class = MarketplaceSerializer
+    since_field = 'updated_on'
+"""
+- The `MarketplaceExportAPIView` class streams every marketplace post with the fields of `MarketplaceSerializer`.
+`?since=` keeps the posts updated after a timestamp.
+"""
+
+
+class TennisExportAPIView(ExportAPIView):
+    queryset = TennisPost.objects.all()
+    serializer_class = TennisSerializer
+    since_field = 'updated_at'
+"""
+- The `TennisExportAPIView` class streams every tennis post with the fields of `TennisSerializer`. `?since=` keeps
+the posts updated after a timestamp.
+"""
+
+
+class ParentingBulkAPIView(BulkAPIView):
+    queryset = Post.objects.all()
+    serializer_class = ParentingSerializer
+"""
+- The `ParentingBulkAPIView` class creates (`POST`), updates (`PATCH`) and deletes (`DELETE`) lists of parenting
+posts in one transaction, validated by `ParentingSerializer`.
+"""
+
+
+class LaikaBulkAPIView(BulkAPIView):
+    queryset = LaikaPost.objects.all()
+    serializer_class = LaikaSerializer
+"""
+- The `LaikaBulkAPIView` class creates, updates and deletes lists of Laika posts, validated by `LaikaSerializer`.
+"""
+
+
+class MarketplaceBulkAPIView(BulkAPIView):
+    queryset = MarketplaceItemPost.objects.all()
+    serializer_class = MarketplaceSerializer
+
+    def prepare(self, instance, fields):
+        if fields is None or 'location' in fields:
+            locate(instance)
+            return fields and fields | {'latitude', 'longitude'}
+        return fields
+"""
+- The `MarketplaceBulkAPIView` class creates, updates and deletes lists of marketplace posts, validated by
+`MarketplaceSerializer`. `prepare` geocodes the posts whose location is set or changed, as saving a post does.
+"""
+
+
+class TennisBulkAPIView(BulkAPIView):
+    queryset = TennisPost.objects.all()
+    serializer_class = TennisSerializer
+
+    def prepare(self, instance, fields):
+        if fields is None or 'birth_date' in fields:
+            set_birth_year(instance)
+            return fields and fields | {'birth_year'}
+        return fields
+"""
+- The `TennisBulkAPIView` class creates, updates and deletes lists of tennis posts, validated by `TennisSerializer`.
+`prepare` sets the birth year of the posts whose birth date is set or changed, as saving a post does.
 """
@@ -1,4 +1,12 @@
+import hashlib
+from datetime import datetime
+
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import TextField, Value
+from django.db.models.functions import MD5, Concat
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 
 class AuthorOrStaffRequiredMixin(UserPassesTestMixin):
     def test_func(self):
@@ -23,4 +31,96 @@ class AuthorOnlyMixin(UserPassesTestMixin):
     def test_func(self):
         post = self.get_object()
         user = self.request.user
-        return post.author == user
\ No newline at end of file
+        return post.author == user
+
+
+FIELD_SEPARATOR = "\x1f"
+
+
+def digest(*fields):
+    parts = []
+    for field in fields:
+        parts += [field, Value(FIELD_SEPARATOR)]
+    return MD5(Concat(*parts, output_field=TextField()))
+
+
+class ConditionalGetMixin:
+    last_modified_field = "updated_at"
+    vary_on_user = True
+
+    def get_validator_fields(self):
+        return {}
+
+    def get_validators(self):
+        fields = self.get_validator_fields()
+        row = (
+            self.get_queryset()
+            .filter(pk=self.kwargs["pk"])
+            .annotate(**fields)
+            .values(self.last_modified_field, *fields)
+            .first()
+        )
+        if row is None:
+            return None, None
+        parts = [row[self.last_modified_field], *(row[name] for name in fields)]
+        if self.vary_on_user:
+            get_token(self.request)
+            parts += [self.request.user.pk, self.request.META["CSRF_COOKIE"]]
+        etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+        return etag, self.get_last_modified(row, fields)
+
+    def get_last_modified(self, row, fields):
+        if not isinstance(row[self.last_modified_field], datetime):
+            return None
+        if not all(row[name] is None or isinstance(row[name], datetime) for name in fields):
+            return None
+        timestamps = [value for value in row.values() if isinstance(value, datetime)]
+        return int(max(timestamps).timestamp())
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        if self.vary_on_user:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+"""
+The `ConditionalGetMixin` answers conditional `GET` requests of a detail view. Clients and caches that send back
+the `ETag` (`If-None-Match`) or `Last-Modified` (`If-Modified-Since`) of the copy they have get an empty
+`304 Not Modified` while it is current, instead of the whole page.
+
+- `last_modified_field` is the modification timestamp of the model. `get_validator_fields()` returns the
+annotations of anything else the page shows that can change without it, such as the comments of a post.
+`digest(*fields)` is the SQL `MD5` of some text columns, for pages whose timestamp is only a date and cannot tell
+two edits of the same day apart. Every column is followed by `FIELD_SEPARATOR` (the ASCII unit separator), so text
+moved from one column to the next (`"ab", "c"` and `"a", "bc"`) changes the digest.
+
+- `get_validators()` reads the timestamp and those annotations with one small query, without loading the row or
+rendering anything, and returns the `ETag` (a hash of the values) and the `Last-Modified` time from
+`get_last_modified()`. It returns `None` for a missing object, which the view then answers with its usual 404.
+`get_last_modified()` is the latest timestamp among the values, but only when every value is a timestamp: a count
+or a digest can change while every timestamp stays the same or moves back (deleting the newest comment lowers
+`Max(comments__updated_at)`), and `If-Modified-Since` would then validate a stale copy. Such pages, and models that
+only have dates, are validated by their `ETag` alone.
+
+- `vary_on_user` adds the logged in user and the CSRF cookie to the `ETag`, since pages show the user's buttons
+and carry CSRF tokens. The cookie is created with `get_token` before the page is rendered, so the first visit's
+`ETag` already includes it; the unmasked cookie value is hashed, since the tokens `get_token` returns differ on
+every call. Such responses are marked `Cache-Control: private, no-cache`: only the browser keeps them
+and it revalidates them on every visit. API responses are the same for everyone and are marked `no-cache`, so a
+shared cache may keep them and revalidate them.
+
+- `get()` answers with `304` when the validators match and renders the view otherwise, adding the `ETag` and
+`Last-Modified` (when there is one) headers either way. An `ETag` comparison takes precedence over
+`If-Modified-Since`, whose one second resolution cannot tell apart two changes within the same second.
+"""
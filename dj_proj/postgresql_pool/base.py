@@ -0,0 +1,146 @@
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base, creation
+from django.db.utils import OperationalError
+import psycopg2
+import psycopg2.extras
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+
+class ConnectionPool:
+
+    def __init__(self, conn_params, min_size, max_size, timeout):
+        self.conn_params = conn_params
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = [psycopg2.connect(**conn_params) for _ in range(min_size)]
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolError(f'No database connection became free within {self.timeout} seconds.')
+        try:
+            while True:
+                with self.lock:
+                    connection = self.idle.pop() if self.idle else None
+                if connection is None:
+                    return psycopg2.connect(**self.conn_params)
+                if self.is_usable(connection):
+                    return connection
+                connection.close()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection):
+        try:
+            if not connection.closed:
+                if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                with self.lock:
+                    self.idle.append(connection)
+        except psycopg2.Error:
+            connection.close()
+        finally:
+            self.slots.release()
+
+    def is_usable(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def closeall(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.connection.close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    pools = {}
+    pools_lock = threading.Lock()
+
+    def get_pool(self, conn_params):
+        key = (self.alias, os.getpid(), repr(sorted(conn_params.items())))
+        with self.pools_lock:
+            if key not in self.pools:
+                options = self.settings_dict.get('POOL', {})
+                min_size = options.get('MIN_SIZE', 1)
+                max_size = options.get('MAX_SIZE', 10)
+                if not 0 <= min_size <= max_size:
+                    raise ImproperlyConfigured('POOL MIN_SIZE must be between 0 and MAX_SIZE.')
+                self.pools[key] = ConnectionPool(conn_params, min_size, max_size, options.get('TIMEOUT', 10))
+            return self.pools[key]
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = base.IsolationLevel(
+                options.get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+            )
+        except ValueError:
+            raise ImproperlyConfigured(f"Invalid transaction isolation level {options['isolation_level']} specified.")
+        try:
+            connection = self.get_pool(conn_params).getconn()
+        except PoolError as error:
+            raise OperationalError(str(error)) from error
+        if 'isolation_level' in options:
+            connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def close_pools(self):
+        with self.pools_lock:
+            keys = [key for key in self.pools if key[0] == self.alias]
+            pools = [self.pools.pop(key) for key in keys]
+        for connection_pool in pools:
+            connection_pool.closeall()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool(self.get_connection_params()).putconn(self.connection)
+
+"""
+- This module is a database backend for PostgreSQL that keeps an in-process pool of connections. It is selected
+with `DB_CONN_MODE=pool` (see `DATABASES` in the settings) and is meant for ASGI/async workers, where requests
+run on changing threads and `CONN_MAX_AGE` would leave one idle connection behind per thread. Django opens and
+closes the connection of every request as usual (`CONN_MAX_AGE` is 0), but opening takes an open connection
+from the pool and closing hands it back.
+
+- `ConnectionPool` holds the idle connections of one process.
+    - `getconn()` hands out the most recently returned idle connection, or opens a new one while fewer than
+    `MAX_SIZE` are in use. When all are in use it waits up to `TIMEOUT` seconds for one to be returned and then
+    raises `PoolError`. An idle connection that no longer answers `SELECT 1` (e.g. after a database restart) is
+    dropped and the next one is tried.
+    - `putconn()` rolls back a transaction the request left open and keeps the connection for the next request;
+    broken connections are dropped.
+    - `MIN_SIZE` connections are opened when the pool is created, so the first requests do not wait either.
+
+- `DatabaseWrapper` is the Django backend. `get_pool()` creates one pool per database alias, process (so forked
+workers never share sockets) and connection parameters (so switching to the test database gets a fresh pool), sized
+by the `POOL` entry of the database settings (`MIN_SIZE`, `MAX_SIZE`, `TIMEOUT`). `get_new_connection()` takes a
+connection from the pool, raising Django's `OperationalError` like a failed connection when the pool timed out, and
+applies the same per-connection setup as the regular PostgreSQL backend (isolation level, JSON decoding), and
+`_close()` returns the connection to the pool instead of closing it. `close_pools()` closes every idle connection
+of the alias.
+
+- `DatabaseCreation` closes the pools before the test database is dropped, which PostgreSQL refuses while
+connections to it are open.
+"""
@@ -0,0 +1,48 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+
+SEARCH_CONFIG = 'simple'
+SEARCH_WEIGHTS = {
+    'title': 'A',
+    'description': 'B',
+}
+
+
+def prefix_search_query(search_words, weight=''):
+    terms = re.findall(r'\w+', search_words)
+    if not terms:
+        return None
+    raw_query = ' & '.join(f'{term}:*{weight}' for term in terms)
+    return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_posts(queryset, search_words, search_field=None):
+    query = prefix_search_query(search_words, SEARCH_WEIGHTS.get(search_field, ''))
+    if query is None:
+        return queryset
+    return (queryset
+            .filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F('search_vector'), query))
+            .order_by('-search_rank', *queryset.model._meta.ordering, 'pk'))
+
+"""
+- `SEARCH_CONFIG` is the PostgreSQL text search configuration used both by the database triggers that fill the
+`search_vector` columns and by the queries below. `simple` lower-cases words without stemming, which keeps
+prefix matching predictable for posts written in any language.
+
+- `SEARCH_WEIGHTS` maps each searchable field to the weight its words carry in `search_vector`: the title is
+stored with weight `A` and the description with weight `B`.
+
+- `prefix_search_query(search_words, weight='')` splits the user's input into words and returns a raw
+`SearchQuery` that matches posts containing every word as a prefix (`pare:* & tip:*`). Only word characters
+are kept, so user input can never produce an invalid `tsquery`. When a `weight` is given, each word only
+matches in the field stored with that weight. It returns `None` if the input has no words.
+
+- `search_posts(queryset, search_words, search_field=None)` filters a queryset of a model with a
+`search_vector` column using the GIN index on that column and orders the results by `ts_rank`, best match first,
+falling back to the model's default ordering for equally ranked posts.
+`search_field` may be `"title"` or `"description"` to restrict the match to that field; any other value
+searches both, with title matches ranking higher.
+"""
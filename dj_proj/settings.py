@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "get_app",
     "accounts",
@@ -58,6 +60,9 @@ INSTALLED_APPS = [
     'laika',
     'tennis_app',
     'apis',
+    'images',
+    'listcache',
+    'perf',
 ]
 """
 'accounts': This is a custom app specific to your project that likely handles user accounts and related 
@@ -69,6 +74,7 @@ your project's home page.
 
 
 MIDDLEWARE = [
+    "perf.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -103,20 +109,44 @@ WSGI_APPLICATION = "dj_proj.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+DB_CONN_MODE = os.getenv("DB_CONN_MODE", "per-request")
+if DB_CONN_MODE not in ("per-request", "persistent", "pool"):
+    raise ImproperlyConfigured("DB_CONN_MODE must be 'per-request', 'persistent' or 'pool'.")
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'dj_proj.postgresql_pool' if DB_CONN_MODE == "pool" else 'django.db.backends.postgresql',
         'NAME': os.getenv("DB_NAME", 'postgres'),
         'USER': os.getenv("DB_USER", 'postgres'),
         'PASSWORD': os.getenv("DB_PASSWORD", 'postgres'),
         'HOST': os.getenv("HOST", 'localhost'),
         'PORT': os.getenv("PORT", '5432'),
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 600)) if DB_CONN_MODE == "persistent" else 0,
+        'CONN_HEALTH_CHECKS': os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+        'POOL': {
+            'MIN_SIZE': int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            'MAX_SIZE': int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            'TIMEOUT': float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        },
     },
     # 'default': {
     #     'ENGINE': 'django.db.backends.sqlite3',
     #     'NAME': BASE_DIR / 'db.sqlite3',
     # }
 }
+"""
+DB_CONN_MODE: How database connections are reused, set from the environment:
+- `per-request` (default): a new connection for every request, the Django default.
+- `persistent`: every worker thread keeps its connection for `DB_CONN_MAX_AGE` seconds (600 by default) 
+instead of connecting on every request. With `DB_CONN_HEALTH_CHECKS` (on by default) a reused connection is 
+checked at the start of each request and replaced if the database dropped it. Every thread holds a connection, 
+so the database must allow as many connections as all the workers have threads.
+- `pool`: an in-process pool of `DB_POOL_MIN_SIZE` to `DB_POOL_MAX_SIZE` connections shared by all threads of 
+the process (see `dj_proj/postgresql_pool`), for ASGI/async workers. A request waits up to `DB_POOL_TIMEOUT` 
+seconds for a free connection.
+
+`python manage.py benchmark_db` compares the latency of the three modes.
+"""
 
 
 # Password validation
@@ -202,8 +232,168 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+IMAGE_DERIVATIVE_FIELDS = [
+    "get_app.Post.image",
+    "laika.Post.image",
+    "laika.LaikaProfileUser.image",
+    "marketplace.MarketplaceItemPost.image",
+    "tennis_app.Posts.image",
+]
+IMAGE_DERIVATIVE_WIDTHS = [160, 320, 640, 960, 1600]
+IMAGE_DERIVATIVE_FORMATS = ["avif", "webp", "jpeg"]
+"""
+IMAGE_DERIVATIVE_FIELDS: The image fields whose uploads are queued for resizing by the `images` app. Run 
+`python manage.py process_images` next to the web server to produce the copies; until they exist the original 
+image is served.
+
+IMAGE_DERIVATIVE_WIDTHS: The widths, in pixels, every queued image is resized to. Images narrower than a width 
+are not scaled up.
+
+IMAGE_DERIVATIVE_FORMATS: The formats written at every width. Formats the installed Pillow cannot encode (AVIF 
+without an AVIF plugin) are skipped, and JPEG is always written as the fallback.
+"""
+
+MARKETPLACE_PRICE_BUCKETS = [0, 10, 50, 100, 500, 1000]
+MARKETPLACE_FACET_LOCATIONS = 10
+MARKETPLACE_FUZZY_THRESHOLD = float(os.getenv("MARKETPLACE_FUZZY_THRESHOLD", 0.5))
+MARKETPLACE_GAZETTEER = BASE_DIR / "marketplace" / "data" / "gazetteer.csv"
+MARKETPLACE_NEAR_RADIUS_KM = 25
+"""
+MARKETPLACE_PRICE_BUCKETS: The edges of the price ranges counted on the marketplace search page. Each range 
+includes its lower edge and excludes the next one; prices over the last edge form the last range.
+
+MARKETPLACE_FACET_LOCATIONS: How many locations, those with the most matching posts first, the search page lists.
+
+MARKETPLACE_FUZZY_THRESHOLD: The lowest word similarity, from 0 to 1, at which a "Match similar spellings" search 
+matches a title or location. Lower values find more misspellings and more unrelated posts. The fuzzy search needs 
+the PostgreSQL `pg_trgm` extension; without it the search matches the exact text.
+
+MARKETPLACE_GAZETTEER: The CSV file of places (`name`, `alternate_names` separated by `|`, `country`, `latitude`, 
+`longitude`) marketplace locations are geocoded with. After adding places, run `python manage.py geocode_posts` 
+to place the posts that were not found before.
+
+MARKETPLACE_NEAR_RADIUS_KM: The radius, in kilometres, of a "near" search when none is given.
+"""
+
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "dj_proj"),
+    }
+}
+LIST_CACHE_ALIAS = "default"
+LIST_CACHE_TIMEOUT = int(os.getenv("LIST_CACHE_TIMEOUT", 300))
+LIST_CACHE_VIEWS = {
+    "post-list": ["get_app.Post", "auth.User"],
+    "laika-post-list": ["laika.Post", "laika.LaikaProfileUser", "auth.User", "images.ImageAsset"],
+    "marketplace_list": ["marketplace.MarketplaceItemPost", "auth.User", "images.ImageAsset"],
+    "tennis-post-list": ["tennis_app.Posts", "tennis_app.Comments", "auth.User"],
+}
+"""
+CACHES: The local-memory cache by default. Set `CACHE_BACKEND` and `CACHE_LOCATION` to use another Django cache 
+backend, e.g. `django.core.cache.backends.filebased.FileBasedCache` with a directory in development, or 
+`django.core.cache.backends.redis.RedisCache` with `redis://...` in production so every process shares one cache.
+
+LIST_CACHE_TIMEOUT: Seconds a rendered list page stays cached. Writes invalidate it earlier.
+
+LIST_CACHE_VIEWS: The cached list views, by URL name, and the models each list is rendered from. Saving or 
+deleting one of these models invalidates the cached lists of the views that name it. Run 
+`python manage.py list_cache_stats` to see the hit and miss counters. The tennis list names `tennis_app.Comments` 
+since its cards show the comment counters of the posts, which are updated without saving the posts.
+"""
+
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_AUTHENTICATION_METHOD = "username_email"
 LOGIN_URL = "account_login"
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "apis.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", 50)),
+}
+API_EXPORT_CHUNK_SIZE = int(os.getenv("API_EXPORT_CHUNK_SIZE", 2000))
+API_BULK_MAX_ITEMS = int(os.getenv("API_BULK_MAX_ITEMS", 5000))
+API_BULK_BATCH_SIZE = 1000
+"""
+REST_FRAMEWORK: The `apis` list endpoints are paginated with keyset cursors (see `apis/pagination.py`). 
+`PAGE_SIZE` is the default number of rows per page and can be changed with the `API_PAGE_SIZE` environment 
+variable; clients can request a different size per call with `?page_size=` up to the paginator's maximum.
+
+API_EXPORT_CHUNK_SIZE: Rows fetched from the database at a time by the `/apis/<resource>/export/` endpoints, which 
+stream whole tables as NDJSON or CSV. Larger chunks mean fewer round trips and more memory per export.
+
+API_BULK_MAX_ITEMS: The most objects one request to the `/apis/<resource>/bulk/` endpoints may create, update or 
+delete. API_BULK_BATCH_SIZE: Objects written per `INSERT`/`UPDATE` statement by those endpoints.
+"""
+
+
+TENNIS_MATCH_WEIGHTS = {"level": 3, "language": 2, "age": 1, "play_date": 2, "club": 1}
+TENNIS_MATCH_RESULTS = 20
+"""
+TENNIS_MATCH_WEIGHTS: How much each part of the partner match score counts: the level distance, the same 
+language, the age difference, the play date difference and the same club (see `tennis_app/matching.py`). A part 
+with weight 0 is left out. Only posts whose play date is within two weeks of the wanted one are candidates.
+
+TENNIS_MATCH_RESULTS: How many posts the partner match lists.
+"""
+
+HOME_FEED_PAGE_SIZE = 20
+"""
+HOME_FEED_PAGE_SIZE: How many posts a page of the home feed shows, the latest of every app merged (see 
+`home/feed.py`). Every page reads at most this many posts from each app.
+"""
+
+TENNIS_MESSAGE_LAYER = os.getenv("TENNIS_MESSAGE_LAYER", "tennis_app.messaging.InProcessChannelLayer")
+TENNIS_MESSAGE_POLL_TIMEOUT = float(os.getenv("TENNIS_MESSAGE_POLL_TIMEOUT", 25))
+"""
+TENNIS_MESSAGE_LAYER: The channel layer that wakes up the requests waiting for new tennis messages (see 
+`tennis_app/messaging.py`). The in-process layer only reaches requests served by the same process, so it suits 
+`runserver` and single-process ASGI servers; several processes need a layer backed by a shared broker.
+
+TENNIS_MESSAGE_POLL_TIMEOUT: Seconds a message poll waits for a new message before answering with none. Keep it 
+below the idle timeout of proxies in front of the server.
+"""
+
+PERF_PROFILING = os.getenv("PERF_PROFILING", "False") == "True"
+PERF_PROFILE_SAMPLE_RATE = float(os.getenv("PERF_PROFILE_SAMPLE_RATE", 0.01))
+PERF_SLOW_REQUEST_MS = float(os.getenv("PERF_SLOW_REQUEST_MS", 500))
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "True") == "True"
+PERF_SLOW_LOG = os.getenv("PERF_SLOW_LOG", BASE_DIR / "slow_requests.log")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "slow_requests": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": PERF_SLOW_LOG,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "delay": True,
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "perf.slow": {"handlers": ["slow_requests"], "level": "WARNING", "propagate": False},
+    },
+}
+"""
+PERF_PROFILING: Turns on the profiling middleware of the `perf` app (`perf/middleware.py`), which times requests, 
+counts their queries and logs the slow ones. Off by default.
+
+PERF_PROFILE_SAMPLE_RATE: The share of requests, from 0 to 1, whose queries and template rendering are profiled. 
+Every request is timed.
+
+PERF_SLOW_REQUEST_MS: Requests that take at least this many milliseconds are logged.
+
+PERF_SERVER_TIMING: Adds a `Server-Timing` header with the database, template and total time to profiled 
+responses. Turn it off where clients should not see it.
+
+PERF_SLOW_LOG: The file slow requests are written to, one JSON object per line. It is rotated at 10 MB, keeping 
+five old files. The file is only created when the first slow request is logged.
+"""
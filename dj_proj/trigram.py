@@ -0,0 +1,133 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import DatabaseError, transaction
+from django.db.migrations.operations.base import Operation
+from django.db.models import TextField
+from django.db.models.functions import Cast, Upper
+
+
+TRIGRAM_EXTENSION = 'pg_trgm'
+_installed = {}
+
+
+def trigram_installed(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = %s)", [TRIGRAM_EXTENSION])
+        return cursor.fetchone()[0]
+
+
+def trigram_available(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if not _installed.get(key):
+        _installed[key] = trigram_installed(connection)
+    return _installed[key]
+
+
+def set_word_similarity_threshold(connection, threshold):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(threshold)])
+
+
+def indexed_text(field_name):
+    return Upper(Cast(field_name, TextField()))
+
+
+def word_similar(queryset, field_name, term, score_name):
+    text = indexed_text(field_name)
+    return queryset.alias(**{f'{score_name}_text': text}).filter(
+        **{f'{score_name}_text__trigram_word_similar': term}
+    ).annotate(**{score_name: TrigramWordSimilarity(term, text)})
+
+
+def ensure_trigram_extension(schema_editor):
+    connection = schema_editor.connection
+    if trigram_installed(connection):
+        return True
+    if connection.vendor != 'postgresql':
+        return False
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute(f'CREATE EXTENSION IF NOT EXISTS {TRIGRAM_EXTENSION}')
+    except DatabaseError:
+        return False
+    return True
+
+
+class AddTrigramIndex(Operation):
+    reversible = True
+
+    def __init__(self, model_name, field_name, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {
+            'model_name': self.model_name,
+            'field_name': self.field_name,
+            'name': self.name,
+        }
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if not ensure_trigram_extension(schema_editor):
+            return
+        quote = schema_editor.quote_name
+        column = model._meta.get_field(self.field_name).column
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(self.name)} ON {quote(model._meta.db_table)} '
+            f'USING gin (UPPER({quote(column)}::text) gin_trgm_ops)'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}')
+
+    def describe(self):
+        return f'Create trigram index {self.name} on {self.model_name}.{self.field_name} if pg_trgm is available'
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
+
+"""
+- This module adds trigram indexes, which make `icontains` lookups (`WHERE UPPER(col) LIKE UPPER('%text%')`) use
+an index instead of reading the whole table. They need the `pg_trgm` extension, which ships with PostgreSQL's
+contrib package but is not installed on every server, so they are created only where it can be used.
+
+- `trigram_installed(connection)` tells whether `pg_trgm` is installed in the database.
+
+- `trigram_available(connection)` is `trigram_installed` remembered per database, so a search does not look the
+extension up on every request. Only a positive answer is remembered: a database where `pg_trgm` is installed later
+is picked up without a restart.
+
+- `set_word_similarity_threshold(connection, threshold)` sets `pg_trgm.word_similarity_threshold` for the
+connection, the lowest word similarity (0 to 1) at which the `%>` operator matches. It is set for the session
+rather than the transaction, since views run outside transactions; every search sets it again before its query.
+
+- `indexed_text(field_name)` is `UPPER(column::text)`, the expression the trigram indexes are built on. A query
+must compare this exact expression for PostgreSQL to use the index.
+
+- `word_similar(queryset, field_name, term, score_name)` keeps the rows where a part of the column is spelled
+similarly to `term` (`UPPER(column::text) %> term`, which the trigram index answers) and annotates the similarity
+as `score_name`. Trigrams ignore case, so comparing the upper-cased column finds the same rows. "Berln" matches
+"Berlin, Germany", because word similarity compares the term with the most similar part of the text rather than
+the whole text.
+
+- `ensure_trigram_extension(schema_editor)` installs `pg_trgm` if it is not installed yet and returns whether it
+is available. When the server does not ship it or the database user may not install it, it returns `False`
+instead of failing the migration.
+
+- `AddTrigramIndex(model_name, field_name, name)` is a migration operation that creates a GIN `gin_trgm_ops`
+index on `UPPER(column)`, the exact expression Django compares in `icontains` lookups on PostgreSQL. Without
+`pg_trgm` it does nothing, and the lookups keep working with a sequential scan. The index is not part of the
+model state (Django's `GinIndex` would make the migration fail without the extension), so it is not listed in the
+model's `Meta.indexes`. To add the indexes after installing `pg_trgm`, migrate the app back before the migration
+and forward again; the operation is idempotent.
+"""
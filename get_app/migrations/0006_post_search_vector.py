@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION get_app_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER get_app_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON get_app_post
+    FOR EACH ROW EXECUTE FUNCTION get_app_post_search_vector_update();
+
+UPDATE get_app_post SET search_vector =
+    setweight(to_tsvector('pg_catalog.simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.simple', coalesce(description, '')), 'B');
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS get_app_post_search_vector_trigger ON get_app_post;
+DROP FUNCTION IF EXISTS get_app_post_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('get_app', '0005_post_get_app_post_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='get_app_post_search_idx'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+    ]
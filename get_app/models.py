@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 '''
 from django.db import models
@@ -20,6 +22,13 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to='images/',null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='get_app_post_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='get_app_post_search_idx'),
+        ]
     
     def __str__(self) -> str:
         return self.title
@@ -54,6 +63,13 @@ the post, defined using `models.DateTimeField(auto_now=True)`.
 `models.ImageField(upload_to='images/', null=True, blank=True)`. It specifies that the uploaded 
 images will be stored in the 'images/' directory.
 
+- `search_vector` is a `tsvector` column holding the words of the title (weight A) and the description 
+(weight B). It is maintained by a database trigger on every insert and update, including bulk writes, and is 
+never edited directly.
+
+- `Meta.indexes` adds a composite index on (`created_at`, `id`), the keyset the `apis` list endpoint 
+pages on, and a GIN index on `search_vector` used by the post list search.
+
 - `__str__` is a method that returns a string representation of the post. In this case, it returns 
 the title of the post.
 
@@ -1,6 +1,8 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.http import http_date
 from datetime import datetime, timedelta
 from .models import Post, Comment
 
@@ -96,6 +98,58 @@ class PostListViewTest(TestCase):
     """
 
 
+class PostFullTextSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.sleep = Post.objects.create(author=cls.user, title='Sleep training', description='Bedtime routines for toddlers')
+        cls.food = Post.objects.create(author=cls.user, title='Picky eaters', description='Getting toddlers to sleep after dinner')
+        cls.other = Post.objects.create(author=cls.user, title='Playground', description='Swings and slides')
+    """
+    The `setUpTestData` method creates a user and three posts, two of which mention sleep.
+    """
+
+    def search(self, **params):
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('post-list'), params)
+        return list(response.context['posts'])
+    """
+    The `search` helper logs in and returns the posts listed for the given query parameters.
+    """
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.search(search_words='slee', search_field='title'), [self.sleep])
+        self.assertEqual(self.search(search_words='toddl bedt', search_field='description'), [self.sleep])
+    """
+    The `test_search_matches_word_prefixes` method tests that each search word matches as a prefix and that all 
+    words have to match.
+    """
+
+    def test_search_ranks_title_matches_first(self):
+        self.assertEqual(self.search(search_words='sleep'), [self.sleep, self.food])
+    """
+    The `test_search_ranks_title_matches_first` method tests that, without a `search_field`, both fields are 
+    searched and a match in the title ranks above a match in the description.
+    """
+
+    def test_search_vector_follows_updates(self):
+        self.other.title = 'Sleepover ideas'
+        self.other.save()
+        self.assertIn(self.other, self.search(search_words='sleepover', search_field='title'))
+    """
+    The `test_search_vector_follows_updates` method tests that the search vector is refreshed when a post is 
+    edited.
+    """
+
+    def test_search_ignores_query_syntax(self):
+        posts = self.search(search_words="!:*&| '", search_field='title')
+        self.assertCountEqual(posts, [self.sleep, self.food, self.other])
+    """
+    The `test_search_ignores_query_syntax` method tests that input without any words does not break the query 
+    and leaves the list unfiltered.
+    """
+
+
 class PostCreateViewTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -353,3 +407,132 @@ class PostDetailViewTestCase(TestCase):
 
 
 
+
+    def test_view_groups_nested_replies(self):
+        self.client.login(username='testuser', password='testpassword')
+        comment = Comment.objects.create(post=self.post, content='Test comment', author=self.user)
+        reply = Comment.objects.create(post=self.post, content='Test reply', author=self.user, parent_comment=comment)
+        nested = Comment.objects.create(post=self.post, content='Nested reply', author=self.user, parent_comment=reply)
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk}))
+        replies = {data['comment']: data['replies'] for data in response.context['comments']}
+        self.assertEqual(replies[comment], [reply])
+        self.assertEqual(replies[reply], [nested])
+        self.assertEqual(replies[nested], [])
+    """
+    - The `test_view_groups_nested_replies` method tests that every comment in the context carries its own direct 
+    replies, down to a reply of a reply.
+    """
+
+
+class PostDetailViewQueryCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.post = Post.objects.create(title='Test Post', description='This is a test post', author=cls.user)
+        cls.authors = [User.objects.create_user(username=f'commenter{i}', password='testpassword') for i in range(5)]
+    """
+    The `setUpTestData` method creates the post author, a post and five other users who write the comments.
+    """
+
+    def add_comments(self, count):
+        for i in range(count):
+            author = self.authors[i % len(self.authors)]
+            comment = Comment.objects.create(post=self.post, content=f'Comment {i}', author=author)
+            reply = Comment.objects.create(post=self.post, content=f'Reply {i}', author=author, parent_comment=comment)
+            Comment.objects.create(post=self.post, content=f'Nested reply {i}', author=self.user, parent_comment=reply)
+    """
+    The `add_comments` helper creates `count` comments, each with a reply and a reply to that reply, spread over 
+    several authors.
+    """
+
+    def test_view_query_count_is_constant(self):
+        self.client.login(username='testuser', password='testpassword')
+        url = reverse('post-detail', kwargs={'pk': self.post.pk})
+
+        self.add_comments(3)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+        self.add_comments(100)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['comments']), 309)
+    """
+    - The `test_view_query_count_is_constant` method pins the number of queries the post detail page runs: the 
+    session, the logged in user, the `ETag` of the page, the post with its author and the whole comment tree with 
+    authors.
+    - The count stays at 5 whether the post has 9 or 309 comments and replies.
+    """
+
+
+class PostDetailConditionalGetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.other = User.objects.create_user(username='otheruser', password='testpassword')
+        cls.post = Post.objects.create(title='Test Post', description='This is a test post', author=cls.user)
+        cls.url = reverse('post-detail', kwargs={'pk': cls.post.pk})
+
+    def setUp(self):
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_unchanged_page_is_not_sent_again(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+    """
+    - The `test_unchanged_page_is_not_sent_again` method tests that a visit sending back the `ETag` of the page gets 
+    an empty `304` after the session, the user and the one validator query, without loading the post or comments.
+    """
+
+    def test_changes_to_the_post_or_comments_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        comment = Comment.objects.create(post=self.post, content='A comment', author=self.other)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A comment')
+
+        etag = response['ETag']
+        comment.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        self.post.title = 'New title'
+        self.post.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    """
+    - The `test_changes_to_the_post_or_comments_change_the_etag` method tests that adding or deleting a comment and 
+    editing the post make the page be sent again.
+    """
+
+    def test_etag_depends_on_the_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.login(username='otheruser', password='testpassword')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    """
+    - The `test_etag_depends_on_the_user` method tests that another user does not get the first user's copy 
+    validated, since the page shows each user their own buttons.
+    """
+
+    def test_if_modified_since_does_not_validate_a_deleted_comment(self):
+        Comment.objects.create(post=self.post, content='Older comment', author=self.other)
+        newest = Comment.objects.create(post=self.post, content='Newest comment', author=self.other)
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        newest.delete()
+        since = http_date(timezone.now().timestamp() + 60)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Newest comment')
+        self.assertEqual(self.client.get(reverse('post-detail', kwargs={'pk': 0})).status_code, 404)
+    """
+    - The `test_if_modified_since_does_not_validate_a_deleted_comment` method tests that the page, whose validators 
+    include the number of comments, sends no `Last-Modified`, so a client that only sends `If-Modified-Since`, even
+    a date after every change, gets the page again once the newest comment was deleted, and that a missing post is
+    still a 404.
+    """
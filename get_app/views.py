@@ -5,11 +5,14 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils.decorators import method_decorator
-from dj_proj.mixins import AuthorOrStaffRequiredMixin
+from dj_proj.mixins import AuthorOrStaffRequiredMixin, ConditionalGetMixin
+from django.db.models import Count, Max
+from dj_proj.search import search_posts
+from listcache.mixins import ListCacheMixin
 
 
 @method_decorator(login_required, name='dispatch')      
-class PostListView(ListView):
+class PostListView(ListCacheMixin, ListView):
     model = Post
     template_name = "get_app/post_list.html"
     context_object_name = "posts"
@@ -21,10 +24,7 @@ class PostListView(ListView):
         search_date = self.request.GET.get("search_date")
         
         if search_words:
-            if search_field == "title":
-                queryset = queryset.filter(title__icontains = search_words)
-            elif search_field == "description":
-                queryset = queryset.filter(description__icontains = search_words)
+            queryset = search_posts(queryset, search_words, search_field)
         
         if search_date:
             queryset = queryset.filter(created_at__gte = search_date)
@@ -42,6 +42,9 @@ ensures that only authenticated users can access the view.
 - `PostListView` is a class-based view that inherits from `ListView`. It represents a view that 
 lists all the posts.
 
+- `ListCacheMixin` caches the rendered list of posts per query string until a post or a user changes (see 
+`LIST_CACHE_VIEWS`), so repeated visits neither query the posts nor render them again.
+
 - `model = Post` specifies the model associated with the view, in this case, the `Post` model.
 
 - `template_name = "post_list.html"` specifies the template to use for rendering the view.
@@ -53,6 +56,10 @@ list of posts.
 first calls the `get_queryset()` method of the parent class to get the default queryset. It then 
 filters the queryset based on the `search_words`, `search_field`, and `search_date` parameters obtained 
 from the request. If no search parameters are provided, it returns all the posts.
+
+- `search_words` is matched with `search_posts()` against the indexed full-text `search_vector` of the post. 
+Every word is matched as a prefix, `search_field` restricts the match to the title or the description, and 
+the results are ordered by relevance.
 """
     
 
@@ -179,25 +186,37 @@ redirects to the "post-list" URL.
 
     
 @method_decorator(login_required, name='dispatch')
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     model = Post
     template_name = "get_app/post_detail.html"
     context_object_name = "post"
     
+    def get_queryset(self):
+        return super().get_queryset().select_related('author')
+
+    def get_validator_fields(self):
+        return {'comments_changed': Max('comments__updated_at'), 'comment_count': Count('comments')}
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
-        comments = post.comments.all()
+        post = self.object
+        comments = post.comments.select_related('author')
         context['comments'] = self.get_comments_with_replies(comments)
         context['imageURL'] = post.imageURL
         return context
 
     def get_comments_with_replies(self, comments):
+        comments = list(comments.order_by('-created_at', '-id'))
+        replies = {comment.id: [] for comment in comments}
+        for comment in reversed(comments):
+            if comment.parent_comment_id in replies:
+                replies[comment.parent_comment_id].append(comment)
+        
         comments_with_replies = []
-        for comment in comments.order_by('-created_at'):
+        for comment in comments:
             comment_data = {
                 'comment': comment,
-                'replies': comment.reply.all()
+                'replies': replies[comment.id]
             }
             comments_with_replies.append(comment_data)
         return comments_with_replies
@@ -250,12 +269,23 @@ displaying the details of a post.
 - `context_object_name = "post"` specifies the name of the variable that will be used to access the 
 post object in the template.
 
+- `ConditionalGetMixin` answers repeated visits with `304 Not Modified` while the page is unchanged (see 
+`dj_proj/mixins.py`). `get_validator_fields` adds the latest change and the number of the post's comments to the 
+post's `updated_at`, so adding, editing or deleting a comment also changes the page's `ETag`.
+
+- `get_queryset()` joins the post's author with `select_related`, so the author shown on the page does not 
+cost an extra query.
+
 - `get_context_data(self, **kwargs)` is a method that adds additional context data to be used in the 
-template. It retrieves the comments associated with the post and organizes them into a list of dictionaries 
-containing the comment and its replies. It also adds the `imageURL` attribute of the post to the context.
+template. It retrieves the comments associated with the post (reusing `self.object` instead of loading the 
+post a second time) and organizes them into a list of dictionaries containing the comment and its replies. 
+It also adds the `imageURL` attribute of the post to the context.
 
 - `get_comments_with_replies(self, comments)` is a helper method that takes a queryset of comments and returns 
-a list of dictionaries, each containing a comment and its replies.
+a list of dictionaries, each containing a comment and its replies, newest comment first. Every comment of the 
+post, replies included, is loaded together with its author in a single query and the replies are grouped under 
+their `parent_comment` in memory (oldest reply first), so the page costs the same number of queries for any 
+number of comments and any nesting depth.
 
 - `post(self, request, *args, **kwargs)` is a method that is called when the view receives a POST request. 
 It handles the creation of new comments and replies, as well as the deletion of comments and replies. It 
@@ -0,0 +1,170 @@
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime, time
+from itertools import islice
+from operator import attrgetter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+
+DEFAULT_PAGE_SIZE = 20
+EXHAUSTED = 'end'
+
+
+class FeedSource:
+    def __init__(self, name, label, model, time_field, title_field, url_name):
+        self.name = name
+        self.label = label
+        self.model = model
+        self.time_field = time_field
+        self.title_field = title_field
+        self.url_name = url_name
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def rows(self, position, size):
+        queryset = (
+            self.get_model()._default_manager
+            .select_related('author')
+            .only('id', self.time_field, self.title_field, 'author__username')
+            .order_by(f'-{self.time_field}', '-id')
+        )
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.time_field}__lte': value}),
+                Q(**{f'{self.time_field}__lt': value}) | Q(**{self.time_field: value, 'id__lt': pk}),
+            )
+        return [FeedItem(self, post) for post in queryset[:size]]
+
+    def encode(self, position):
+        value, pk = position
+        return [value.isoformat(), pk]
+
+    def decode(self, position):
+        value, pk = position
+        if not isinstance(pk, int) or isinstance(pk, bool):
+            raise ValueError
+        return self.get_model()._meta.get_field(self.time_field).to_python(value), pk
+
+
+class FeedItem:
+    def __init__(self, source, post):
+        self.source = source
+        self.post = post
+        self.position = (getattr(post, source.time_field), post.pk)
+        self.moment = moment(self.position[0])
+        self.key = (self.moment, source.name, post.pk)
+
+    @property
+    def title(self):
+        return getattr(self.post, self.source.title_field)
+
+    @property
+    def author(self):
+        return self.post.author
+
+    @property
+    def url(self):
+        return reverse(self.source.url_name, kwargs={'pk': self.post.pk})
+
+
+SOURCES = [
+    FeedSource('parenting', 'Parenting', 'get_app.Post', 'created_at', 'title', 'post-detail'),
+    FeedSource('laika', 'Laika', 'laika.Post', 'created_at', 'title', 'laika-post-detail'),
+    FeedSource('marketplace', 'Marketplace', 'marketplace.MarketplaceItemPost', 'created_on', 'title',
+               'marketplace_detail'),
+    FeedSource('sport', 'Sport', 'tennis_app.Posts', 'current_date', 'description', 'tennis-post-detail'),
+]
+
+
+def moment(value):
+    if isinstance(value, datetime):
+        return value
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def get_page_size():
+    return getattr(settings, 'HOME_FEED_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+
+
+def encode_cursor(positions):
+    data = json.dumps(positions, separators=(',', ':')).encode()
+    return urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sources=SOURCES):
+    try:
+        positions = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(positions, dict):
+            raise ValueError
+        decoded = {}
+        for source in sources:
+            position = positions.get(source.name)
+            if position is None or position == EXHAUSTED:
+                decoded[source.name] = position
+            else:
+                decoded[source.name] = source.decode(position)
+        return decoded
+    except (TypeError, ValueError, ValidationError, Base64Error, UnicodeDecodeError):
+        raise ValueError('Invalid feed cursor.')
+
+
+def page(cursor=None, size=None, sources=SOURCES):
+    size = size or get_page_size()
+    positions = decode_cursor(cursor, sources) if cursor else {}
+    fetched = {
+        source.name: source.rows(positions.get(source.name), size)
+        for source in sources
+        if positions.get(source.name) != EXHAUSTED
+    }
+    merged = heapq.merge(*fetched.values(), key=attrgetter('key'), reverse=True)
+    items = list(islice(merged, size))
+
+    following = {}
+    for source in sources:
+        position = positions.get(source.name)
+        rows = fetched.get(source.name, [])
+        taken = [item for item in items if item.source is source]
+        if taken:
+            position = taken[-1].position
+        if position == EXHAUSTED or (len(rows) < size and len(taken) == len(rows)):
+            following[source.name] = EXHAUSTED
+        elif position is not None:
+            following[source.name] = source.encode(position)
+    if all(following.get(source.name) == EXHAUSTED for source in sources):
+        return items, None
+    return items, encode_cursor(following)
+
+"""
+- This module builds the feed of the home page: the latest posts of the parenting, Laika, marketplace and sport
+apps, newest first, one page at a time.
+
+- `FeedSource` describes a post table of the feed: its model, the field it is sorted on, the field shown as its
+title and the URL name of its detail page. `SOURCES` lists the four. `rows(position, size)` reads the `size` newest
+posts of the table older than `position` (a `(timestamp, id)` pair), with their author, through the table's
+composite (timestamp, `id`) index. The extra `timestamp <= position` condition is the start of the index scan;
+without it PostgreSQL reads the index from the newest post and filters out every post shown before, more on every
+page.
+
+- `page(cursor, size)` returns one page of `size` (`HOME_FEED_PAGE_SIZE`) `FeedItem`s and the cursor of the next
+page, `None` after the last one. It reads at most `size` posts from each table and merges them with `heapq.merge`,
+a k-way merge on (moment, source, id), so no table is read further than the page needs and no `UNION` is built
+over tables with different columns. Laika and sport posts are dated without a time; their moment is the start of
+that day in the current time zone.
+
+- The cursor holds, for every table, the position of the last post of it shown, or `"end"` once every post of it
+was shown, as URL-safe base64 JSON. The next page continues each table from its own position, so a post is never
+shown twice or skipped when posts are added between pages, and tables that are done are not queried again.
+`decode_cursor` raises `ValueError` for a cursor it did not write.
+
+- `FeedItem` wraps a post for the template: its `source`, `title`, `author`, `moment` and detail `url`.
+"""
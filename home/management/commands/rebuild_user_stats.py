@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from home.models import UserStats
+from home.stats import DEFAULT_BATCH_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the post and comment counts of every user shown on the home page."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Users updated per statement.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        rebuilt = rebuild(get_user_model().objects.all(), UserStats.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(f"Rebuilt the stats of {rebuilt} users.")
+
+"""
+- `rebuild_user_stats` is a management command that recomputes the `UserStats` row of every user from the posts and
+comments of every app, and creates the missing rows, e.g. `python manage.py rebuild_user_stats`. The rows are kept
+up to date as posts and comments are written, so it is only needed after rows were written without the model
+(fixtures, raw SQL, `QuerySet.update()` of an author) or to check for drift. Each batch of `--batch-size` users is
+one `UPDATE` with the counts computed by the database, in its own transaction.
+"""
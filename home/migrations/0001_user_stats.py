@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:49
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+COUNTED = {
+    'get_app.Post': 'parenting_posts',
+    'get_app.Comment': 'parenting_comments',
+    'laika.Post': 'laika_posts',
+    'marketplace.MarketplaceItemPost': 'marketplace_posts',
+    'tennis_app.Posts': 'tennis_posts',
+    'tennis_app.Comments': 'tennis_comments',
+}
+
+
+def count_existing_rows(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserStats = apps.get_model('home', 'UserStats')
+    user_ids = User.objects.using(alias).values_list('pk', flat=True).iterator()
+    UserStats.objects.using(alias).bulk_create((UserStats(user_id=pk) for pk in user_ids), batch_size=5000)
+    counts = {}
+    for label, field in COUNTED.items():
+        values = (
+            apps.get_model(label)._default_manager.using(alias).filter(author=OuterRef('user_id'))
+            .order_by().values('author').annotate(value=Count('pk')).values('value')
+        )
+        counts[field] = Coalesce(Subquery(values, output_field=IntegerField()), 0)
+    UserStats.objects.using(alias).update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('get_app', '0006_post_search_vector'),
+        ('laika', '0011_search_indexes'),
+        ('marketplace', '0007_post_coordinates'),
+        ('tennis_app', '0011_post_birth_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('parenting_posts', models.PositiveIntegerField(default=0)),
+                ('parenting_comments', models.PositiveIntegerField(default=0)),
+                ('laika_posts', models.PositiveIntegerField(default=0)),
+                ('marketplace_posts', models.PositiveIntegerField(default=0)),
+                ('tennis_posts', models.PositiveIntegerField(default=0)),
+                ('tennis_comments', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
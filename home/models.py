@@ -1,3 +1,26 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class UserStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    parenting_posts = models.PositiveIntegerField(default=0)
+    parenting_comments = models.PositiveIntegerField(default=0)
+    laika_posts = models.PositiveIntegerField(default=0)
+    marketplace_posts = models.PositiveIntegerField(default=0)
+    tennis_posts = models.PositiveIntegerField(default=0)
+    tennis_comments = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats of {self.user_id}'
+
+"""
+- `UserStats` holds how many posts and comments a user wrote in every app, one row per user keyed by the user's id,
+so the home page shows them with a single primary key lookup instead of a `COUNT(*)` per table:
+    - `parenting_posts` and `parenting_comments`: posts and comments of the parenting app (`get_app`);
+    - `laika_posts`: Laika posts;
+    - `marketplace_posts`: marketplace listings;
+    - `tennis_posts` and `tennis_comments`: sport posts and comments.
+The counts are kept up to date as posts and comments are written (see `stats.py`). Deleting a user deletes their
+row.
+"""
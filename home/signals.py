@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .models import UserStats
+from .stats import COUNTED, count
+
+
+def create_user_stats(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        UserStats.objects.using(using).bulk_create([UserStats(user_id=instance.pk)], ignore_conflicts=True)
+
+
+def remember_author(sender, instance, **kwargs):
+    instance._stats_author = instance.__dict__.get('author_id')
+
+
+def count_saved(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    author = instance.author_id
+    if created:
+        count(sender, author, 1, using)
+    elif author != instance._stats_author:
+        count(sender, instance._stats_author, -1, using)
+        count(sender, author, 1, using)
+    instance._stats_author = author
+
+
+def uncount_deleted(sender, instance, using=None, **kwargs):
+    count(sender, instance._stats_author, -1, using)
+
+
+def connect_user_stats():
+    post_save.connect(create_user_stats, sender=get_user_model(), dispatch_uid="home_create_user_stats")
+    for label in COUNTED:
+        model = apps.get_model(label)
+        post_init.connect(remember_author, sender=model, dispatch_uid=f"home_remember_author_{label}")
+        post_save.connect(count_saved, sender=model, dispatch_uid=f"home_count_saved_{label}")
+        post_delete.connect(uncount_deleted, sender=model, dispatch_uid=f"home_uncount_deleted_{label}")
+
+"""
+- The `UserStats` of a user (see `stats.py`) follow every counted post and comment saved or deleted through the
+model:
+    - `create_user_stats()` gives a new user an empty row;
+    - `remember_author()` records the author a post or comment was loaded or last saved with;
+    - `count_saved()` counts a new post or comment for its author, and moves one whose author changed from the old
+    author to the new one;
+    - `uncount_deleted()` removes a deleted one, also when it goes with its post or author.
+Fixture loading (`raw` saves) is skipped; run `python manage.py rebuild_user_stats` after loading posts or users.
+
+- `connect_user_stats()` is called from `HomeConfig.ready()` and connects the receivers to the user model and to
+every model of `COUNTED`.
+"""
@@ -0,0 +1,90 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+DEFAULT_BATCH_SIZE = 5000
+COUNTED = {
+    'get_app.Post': 'parenting_posts',
+    'get_app.Comment': 'parenting_comments',
+    'laika.Post': 'laika_posts',
+    'marketplace.MarketplaceItemPost': 'marketplace_posts',
+    'tennis_app.Posts': 'tennis_posts',
+    'tennis_app.Comments': 'tennis_comments',
+}
+
+
+def per_user(model):
+    values = (
+        model._default_manager.filter(author=OuterRef('user_id'))
+        .order_by().values('author').annotate(value=Count('pk')).values('value')
+    )
+    return Coalesce(Subquery(values, output_field=IntegerField()), 0)
+
+
+def rebuild(users, stats, batch_size=DEFAULT_BATCH_SIZE):
+    counts = {field: per_user(apps.get_model(label)) for label, field in COUNTED.items()}
+    ids = users.order_by('pk').values_list('pk', flat=True)
+    rebuilt, last = 0, None
+    while True:
+        batch = list((ids if last is None else ids.filter(pk__gt=last))[:batch_size])
+        if not batch:
+            return rebuilt
+        with transaction.atomic(using=stats.db):
+            stats.bulk_create([stats.model(user_id=pk) for pk in batch], ignore_conflicts=True)
+            rebuilt += stats.filter(user_id__in=batch).update(**counts)
+        last = batch[-1]
+
+
+def refresh(user_ids, using='default'):
+    from home.models import UserStats
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return 0
+    users = get_user_model()._default_manager.using(using).filter(pk__in=user_ids)
+    return rebuild(users, UserStats.objects.using(using))
+
+
+def count(model, user_id, sign, using='default'):
+    from home.models import UserStats
+    field = COUNTED[model._meta.label]
+    if user_id is None:
+        return
+    updated = UserStats.objects.using(using).filter(pk=user_id).update(**{field: Greatest(F(field) + sign, Value(0))})
+    if not updated and sign > 0:
+        refresh([user_id], using)
+
+
+def refresh_authors(model, user_ids, using='default'):
+    if model._meta.label in COUNTED:
+        refresh(user_ids, using)
+
+
+def for_user(user):
+    from home.models import UserStats
+    stats = UserStats.objects.filter(pk=user.pk).first()
+    if stats is None:
+        refresh([user.pk])
+        stats = UserStats.objects.get(pk=user.pk)
+    return stats
+
+"""
+- This module keeps the `UserStats` row of every user: how many posts and comments they wrote in each app. `COUNTED`
+maps every counted model, whose `author` is the user, to its column.
+
+- `count(model, user_id, sign)` adds (`sign=1`) or removes (`sign=-1`) one row of `model` to the counts of a user
+with a single `UPDATE ... SET laika_posts = laika_posts + 1` on the user's row, so concurrent writes are all
+counted. It is called by the signal receivers in `signals.py`. A user without a row (created without the model,
+as `seed` does) gets one with counts computed from scratch when they add a row; a removal never creates one, so the
+rows deleted with a user do not bring theirs back. Counts never go below zero.
+
+- `rebuild(users, stats, batch_size)` recomputes the rows of the users of a queryset from the counted tables,
+creating the missing ones, `batch_size` users per `UPDATE` and transaction. It is used by the `rebuild_user_stats`
+and `seed` commands. The migration that adds the table fills it in with the same queries on its historical models,
+without importing this module. `refresh(user_ids)` rebuilds the rows of a few users, and `refresh_authors(model,
+user_ids)` does so when `model` is counted, for writes that send no signals (the bulk API).
+
+- `for_user(user)` is the row of a user, read by primary key, and built first if it is missing.
+"""
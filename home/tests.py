@@ -1,3 +1,227 @@
+from datetime import timedelta
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from get_app.models import Comment as ParentingComment, Post as ParentingPost
+from home import feed
+from home.models import UserStats
+from laika.models import Post as LaikaPost
+from marketplace.models import MarketplaceItemPost
+from tennis_app.models import Comments as TennisComment, Posts as TennisPost
+
+
+class HomeFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        now = timezone.now()
+        for day in (1, 4, 7):
+            post = ParentingPost.objects.create(author=cls.user, title=f'Parenting {day}', description='Sleep tips')
+            ParentingPost.objects.filter(pk=post.pk).update(created_at=now - timedelta(days=day))
+        for day in (2, 2, 8):
+            post = LaikaPost.objects.create(author=cls.user, title=f'Laika {day}', description='Lost dog')
+            LaikaPost.objects.filter(pk=post.pk).update(created_at=(now - timedelta(days=day)).date())
+        for day in (3, 5):
+            post = MarketplaceItemPost.objects.create(
+                author=cls.user, title=f'Marketplace {day}', description='Good as new', price=10,
+            )
+            MarketplaceItemPost.objects.filter(pk=post.pk).update(created_on=now - timedelta(days=day))
+        TennisPost.objects.create(
+            author=cls.user, birth_date='1990-01-01', phone='123456789', description='Sport 6', level='3',
+            language='1', current_date=(now - timedelta(days=6)).date(),
+        )
+
+    def walk(self, size):
+        titles, cursor = [], None
+        while True:
+            items, cursor = feed.page(cursor, size)
+            titles += [item.title for item in items]
+            if cursor is None:
+                return titles
+
+    def test_pages_merge_every_app_newest_first(self):
+        expected = ['Parenting 1', 'Laika 2', 'Laika 2', 'Marketplace 3', 'Parenting 4', 'Marketplace 5', 'Sport 6',
+                    'Parenting 7', 'Laika 8']
+        self.assertEqual(self.walk(3), expected)
+        self.assertEqual(self.walk(4), expected)
+        self.assertEqual(self.walk(20), expected)
+        items, _ = feed.page(size=2)
+        self.assertGreater(items[0].moment, items[1].moment)
+        self.assertEqual(items[1].url, reverse('laika-post-detail', kwargs={'pk': items[1].post.pk}))
+    """
+    - The `test_pages_merge_every_app_newest_first` method tests that paging through the feed lists the posts of
+    the four apps once each, newest first, whatever the page size, with Laika and sport posts dated without a time
+    placed at the start of their day, and that the last page has no cursor.
+    """
+
+    def test_pages_read_at_most_a_page_from_each_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            _, cursor = feed.page(size=2)
+        self.assertEqual(len(queries), 4)
+        self.assertTrue(all(query['sql'].endswith('LIMIT 2') for query in queries))
+
+        _, cursor = feed.page(cursor, size=10)
+        self.assertIsNone(cursor)
+        items, cursor = feed.page(size=8)
+        with CaptureQueriesContext(connection) as queries:
+            items, cursor = feed.page(cursor, size=8)
+        self.assertEqual([item.title for item in items], ['Laika 8'])
+        self.assertEqual(len(queries), 1)
+    """
+    - The `test_pages_read_at_most_a_page_from_each_table` method tests that a page runs one query per app, each
+    limited to the page size, and that the apps whose posts were all shown are not queried again, so the last page
+    here only reads Laika posts.
+    """
+
+    def test_new_posts_do_not_shift_the_next_page(self):
+        items, cursor = feed.page(size=4)
+        ParentingPost.objects.create(author=self.user, title='Parenting 0', description='New')
+        following, _ = feed.page(cursor, size=4)
+        self.assertEqual([item.title for item in following], ['Parenting 4', 'Marketplace 5', 'Sport 6', 'Parenting 7'])
+    """
+    - The `test_new_posts_do_not_shift_the_next_page` method tests that a post created after a page was shown
+    neither appears on nor moves the posts of the next page, as an offset would.
+    """
+
+    def test_home_page_and_feed_pages(self):
+        self.client.login(username='testuser', password='testpassword')
+        with self.settings(HOME_FEED_PAGE_SIZE=5):
+            response = self.client.get(reverse('home'))
+            self.assertContains(response, 'Parenting 1')
+            self.assertNotContains(response, 'Sport 6')
+            cursor = response.context['next_cursor']
+
+            response = self.client.get(reverse('home-feed'), {'cursor': cursor})
+            self.assertTemplateUsed(response, 'home/feed_items.html')
+            self.assertContains(response, 'Sport 6')
+            self.assertNotContains(response, 'home-feed-more')
+
+        self.assertEqual(self.client.get(reverse('home-feed'), {'cursor': 'not-a-cursor'}).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('home-feed')).status_code, 302)
+    """
+    - The `test_home_page_and_feed_pages` method tests that the home page shows the first `HOME_FEED_PAGE_SIZE`
+    posts, that the feed URL renders the next page from its cursor, without a marker after the last page, that an
+    invalid cursor is a `404` and that the feed requires a login.
+    """
+
+
+class UserStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.other = User.objects.create_user(username='other', password='testpassword')
+
+    def stats(self, user=None):
+        return UserStats.objects.values(
+            'parenting_posts', 'parenting_comments', 'laika_posts', 'marketplace_posts', 'tennis_posts',
+            'tennis_comments',
+        ).get(pk=(user or self.user).pk)
+
+    def tennis_post(self, author):
+        return TennisPost.objects.create(
+            author=author, birth_date='1990-01-01', phone='123456789', description='Singles?', level='3', language='1',
+        )
+
+    def write_everything(self):
+        parenting = ParentingPost.objects.create(author=self.user, title='Sleep', description='Tips')
+        ParentingComment.objects.create(post=parenting, author=self.user, content='Thanks')
+        ParentingComment.objects.create(post=parenting, author=self.other, content='Same here')
+        LaikaPost.objects.create(author=self.user, title='Rex', description='Good dog')
+        MarketplaceItemPost.objects.create(author=self.user, title='Bike', description='Good as new', price=10)
+        tennis = self.tennis_post(self.user)
+        TennisComment.objects.create(post=tennis, author=self.user, text='Great', rank='5')
+        return parenting, tennis
+
+    def test_counts_follow_posts_and_comments(self):
+        self.assertEqual(set(self.stats().values()), {0})
+        parenting, tennis = self.write_everything()
+        self.assertEqual(self.stats(), {
+            'parenting_posts': 1, 'parenting_comments': 1, 'laika_posts': 1, 'marketplace_posts': 1,
+            'tennis_posts': 1, 'tennis_comments': 1,
+        })
+        self.assertEqual(self.stats(self.other)['parenting_comments'], 1)
+
+        parenting.delete()
+        tennis.author = self.other
+        tennis.save()
+        self.tennis_post(None)
+        stats = self.stats()
+        self.assertEqual((stats['parenting_posts'], stats['parenting_comments'], stats['tennis_posts']), (0, 0, 0))
+        self.assertEqual(stats['tennis_comments'], 1)
+        self.assertEqual(self.stats(self.other)['parenting_comments'], 0)
+        self.assertEqual(self.stats(self.other)['tennis_posts'], 1)
+    """
+    - The `test_counts_follow_posts_and_comments` method tests that a new user starts with zero counts, that posts,
+    listings and comments of every app are counted for their author, that deleting a post uncounts its comments
+    too, whoever wrote them, that a post given to another author moves to their counts, and that a post without
+    an author is not counted.
+    """
+
+    def test_missing_rows_and_rebuild_command(self):
+        self.write_everything()
+        UserStats.objects.all().delete()
+        LaikaPost.objects.create(author=self.user, title='Max', description='Another dog')
+        self.assertEqual(self.stats()['laika_posts'], 2)
+        self.assertEqual(self.stats()['tennis_posts'], 1)
+
+        UserStats.objects.filter(pk=self.user.pk).update(laika_posts=7, tennis_comments=0)
+        out = StringIO()
+        call_command('rebuild_user_stats', '--batch-size', '1', stdout=out)
+        self.assertIn('Rebuilt the stats of 2 users.', out.getvalue())
+        self.assertEqual((self.stats()['laika_posts'], self.stats()['tennis_comments']), (2, 1))
+        self.assertEqual(self.stats(self.other)['parenting_comments'], 1)
+    """
+    - The `test_missing_rows_and_rebuild_command` method tests that a user whose row is missing gets one, with
+    every count computed, when they write something, and that `rebuild_user_stats` fixes drifted counts and
+    creates the missing rows, one user per batch here.
+    """
+
+    def test_deleting_a_user_deletes_their_row(self):
+        self.write_everything()
+        self.other.delete()
+        self.user.delete()
+        self.assertFalse(UserStats.objects.exists())
+    """
+    - The `test_deleting_a_user_deletes_their_row` method tests that a user with posts and comments can be deleted,
+    and that the posts and comments deleted with them do not bring their row back.
+    """
+
+    def test_bulk_created_posts_are_counted(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.login(username='testuser', password='testpassword')
+        item = {'author': self.user.pk, 'title': 'Book', 'description': 'Good as new', 'price': '10.00'}
+        response = self.client.post(reverse('marketplace-bulk-api'), [item, item], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stats()['marketplace_posts'], 2)
+
+        items = [{'id': response.data[0]['id'], 'author': self.other.pk}]
+        self.client.patch(reverse('marketplace-bulk-api'), items, content_type='application/json')
+        self.assertEqual(self.stats()['marketplace_posts'], 1)
+        self.assertEqual(self.stats(self.other)['marketplace_posts'], 1)
+    """
+    - The `test_bulk_created_posts_are_counted` method tests that listings created or given another author through
+    the bulk API, which sends no signals, are counted too, by a staff user who can give them to another author.
+    """
 
-# Create your tests here.
+    def test_home_page_reads_the_stats_with_one_query(self):
+        self.write_everything()
+        self.client.login(username='testuser', password='testpassword')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Your listings: 1')
+        counted = [query['sql'] for query in queries if 'COUNT(' in query['sql'] or 'home_userstats' in query['sql']]
+        self.assertEqual(len(counted), 1)
+        self.assertIn('"home_userstats"."user_id" = ', counted[0])
+    """
+    - The `test_home_page_reads_the_stats_with_one_query` method tests that the home page shows the counts of the
+    user, read with a single primary key lookup of their row and no `COUNT`.
+    """
@@ -1,17 +1,18 @@
 from django.urls import path
-from .views import home_page
+from .views import feed_page, home_page
 
 urlpatterns = [
     path('', home_page, name='home'),
+    path('feed/', feed_page, name='home-feed'),
 ]
 
 """
 - `from django.urls import path` imports the `path` function from Django's `urls` module. The `path` function 
 is used to define URL patterns for your Django project.
 
-- `from .views import home_page` imports the `home_page` view function from the local `views` module. This 
-assumes that there is a `views.py` file in the same directory as this code and that `home_page` is a view 
-function defined in that file.
+- `from .views import feed_page, home_page` imports the `feed_page` and `home_page` view functions from the 
+local `views` module. This assumes that there is a `views.py` file in the same directory as this code and that 
+they are view functions defined in that file.
 
 - `urlpatterns` is a list that holds the URL patterns for your Django project. Each URL pattern is defined as 
 an element in this list.
@@ -20,4 +21,7 @@ an element in this list.
 URL pattern matches the root URL (`''`). When a user visits the root URL of your project, the `home_page` view 
 function will be called. The `name` parameter is used to provide a unique name for this URL pattern, which can 
 be used to reference it in other parts of your Django project.
-"""
\ No newline at end of file
+
+- `path('feed/', feed_page, name='home-feed')` serves the following pages of the home feed, which the home page 
+loads as it is scrolled.
+"""
@@ -1,10 +1,24 @@
+from django.http import Http404
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
+from . import feed, stats
+
 
 @login_required
 def home_page(request):
-    return render(request, "home/home.html")
+    items, next_cursor = feed.page()
+    context = {"feed": items, "next_cursor": next_cursor, "stats": stats.for_user(request.user)}
+    return render(request, "home/home.html", context)
+
+
+@login_required
+def feed_page(request):
+    try:
+        items, next_cursor = feed.page(request.GET.get("cursor"))
+    except ValueError:
+        raise Http404("Invalid feed cursor.")
+    return render(request, "home/feed_items.html", {"feed": items, "next_cursor": next_cursor})
 
 """
 - `from django.shortcuts import render` imports the `render` function from Django's `shortcuts` module. 
@@ -22,6 +36,11 @@ the login page before being able to access the view.
 - `def home_page(request):` defines the `home_page` view function, which takes a `request` object as a 
 parameter. This function is responsible for processing the request and returning the appropriate response.
 
-- `return render(request, "home/home.html")` uses the `render` function to render the `home/home.html` 
-template with the provided `request` object. The rendered template is then returned as the response.
+- `home_page` renders the `home/home.html` template with the first page of the feed of the latest posts of every 
+app (see `feed.py`), the cursor of the next one, and the number of posts, comments and listings the user wrote, 
+read from their `UserStats` row with one primary key lookup (see `stats.py`).
+
+- `feed_page` renders the page of the feed after `?cursor=` with `home/feed_items.html`, the fragment the home page 
+appends as it is scrolled, ending with a marker that holds the URL of the following page. An invalid cursor is a 
+`404`.
 """
@@ -0,0 +1,243 @@
+import hashlib
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageAsset
+
+
+DEFAULT_WIDTHS = [160, 320, 640, 960, 1600]
+DEFAULT_FORMATS = ['avif', 'webp', 'jpeg']
+FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif', {'quality': 60}),
+    'webp': ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+FALLBACK_FORMAT = 'jpeg'
+STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+
+def get_widths():
+    return sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS))
+
+
+def get_formats():
+    Image.init()
+    formats = [fmt for fmt in getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', DEFAULT_FORMATS)
+               if fmt in FORMATS and FORMATS[fmt][0] in Image.SAVE]
+    if FALLBACK_FORMAT not in formats:
+        formats.append(FALLBACK_FORMAT)
+    return formats
+
+
+def asset_widths(asset):
+    return sorted({min(width, asset.width) for width in get_widths()})
+
+
+def content_hash(name):
+    digest = hashlib.sha256()
+    with default_storage.open(name, 'rb') as file:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_name(hash, width, fmt=FALLBACK_FORMAT):
+    return f'derivatives/{hash[:2]}/{hash}/{width}w.{FORMATS[fmt][1]}'
+
+
+def has_format(asset, fmt):
+    return asset is not None and asset.is_ready and fmt in asset.format_list
+
+
+def derivative_url(asset, width, fmt=FALLBACK_FORMAT):
+    if not has_format(asset, fmt):
+        return None
+    widths = asset_widths(asset)
+    width = next((candidate for candidate in widths if candidate >= int(width)), widths[-1])
+    return default_storage.url(derivative_name(asset.content_hash, width, fmt))
+
+
+def srcset(asset, fmt=FALLBACK_FORMAT):
+    if not has_format(asset, fmt):
+        return ''
+    return ', '.join(f'{default_storage.url(derivative_name(asset.content_hash, width, fmt))} {width}w'
+                     for width in asset_widths(asset))
+
+
+def enqueue(name):
+    if not name or not default_storage.exists(name):
+        return None
+    defaults = {
+        'content_hash': '',
+        'status': ImageAsset.PENDING,
+        'attempts': 0,
+        'error': '',
+    }
+    asset, _ = ImageAsset.objects.update_or_create(name=name, defaults=defaults)
+    return asset
+
+
+def resolve(obj, path):
+    for attr in path.split('.'):
+        try:
+            obj = getattr(obj, attr)
+        except ObjectDoesNotExist:
+            return None
+        if obj is None:
+            return None
+    return obj
+
+
+def prefetch_assets(objects, path):
+    objects = list(objects)
+    files = [resolve(obj, path) for obj in objects]
+    names = {file.name for file in files if file}
+    assets = {asset.name: asset for asset in ImageAsset.objects.filter(name__in=names)}
+    for file in files:
+        if file:
+            file._image_asset = assets.get(file.name)
+    return objects
+
+
+def get_asset(field_file):
+    if not field_file:
+        return None
+    if not hasattr(field_file, '_image_asset'):
+        field_file._image_asset = ImageAsset.objects.filter(name=field_file.name).first()
+    return field_file._image_asset
+
+
+def image_url(field_file, width, placeholder=''):
+    if not field_file:
+        return placeholder
+    return derivative_url(get_asset(field_file), width) or field_file.url
+
+
+def claim_next():
+    with transaction.atomic():
+        asset = (ImageAsset.objects
+                 .select_for_update(skip_locked=True)
+                 .filter(status=ImageAsset.PENDING)
+                 .order_by('created_at')
+                 .first())
+        if asset is None:
+            return None
+        asset.status = ImageAsset.PROCESSING
+        asset.attempts += 1
+        asset.save(update_fields=['status', 'attempts', 'updated_at'])
+    return asset
+
+
+def requeue_stale():
+    return (ImageAsset.objects
+            .filter(status=ImageAsset.PROCESSING, updated_at__lt=timezone.now() - STALE_AFTER)
+            .update(status=ImageAsset.PENDING))
+
+
+def render(image, width, fmt=FALLBACK_FORMAT):
+    pil_format, _, _, options = FORMATS[fmt]
+    if width < image.width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+    if fmt == FALLBACK_FORMAT and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate(asset):
+    with default_storage.open(asset.name, 'rb') as original:
+        image = Image.open(original)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    asset.width, asset.height = image.size
+    formats = get_formats()
+
+    for fmt in formats:
+        for width in asset_widths(asset):
+            name = derivative_name(asset.content_hash, width, fmt)
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(render(image, width, fmt)))
+    asset.formats = ','.join(formats)
+
+
+def reuse(asset):
+    processed = (ImageAsset.objects
+                 .filter(content_hash=asset.content_hash, status=ImageAsset.READY)
+                 .exclude(pk=asset.pk)
+                 .first())
+    if processed is None:
+        return False
+    asset.width, asset.height, asset.formats = processed.width, processed.height, processed.formats
+    return True
+
+
+def process(asset):
+    try:
+        if not asset.content_hash:
+            asset.content_hash = content_hash(asset.name)
+        if not reuse(asset):
+            generate(asset)
+    except Exception as error:
+        asset.status = ImageAsset.PENDING if asset.attempts < MAX_ATTEMPTS else ImageAsset.FAILED
+        asset.error = f'{type(error).__name__}: {error}'
+    else:
+        asset.status = ImageAsset.READY
+        asset.error = ''
+    asset.save(update_fields=['content_hash', 'status', 'error', 'width', 'height', 'formats', 'updated_at'])
+    return asset
+
+"""
+- This module is the image derivative service shared by every `ImageField` listed in the
+`IMAGE_DERIVATIVE_FIELDS` setting. Uploading an image only records it in the `ImageAsset` queue; the resized
+copies are produced later by the `process_images` workers, so no request ever waits on PIL.
+
+- `get_widths()` returns the fixed widths, in pixels, every image is resized to. It defaults to
+`DEFAULT_WIDTHS` and can be changed with the `IMAGE_DERIVATIVE_WIDTHS` setting. `asset_widths(asset)` caps
+them at the width of the original, so small images are never scaled up and get one copy at their own width.
+
+- `get_formats()` returns the formats written at every width (`IMAGE_DERIVATIVE_FORMATS`), keeping only the
+ones the installed Pillow can encode. AVIF needs a Pillow build or plugin with an AVIF encoder and is skipped
+without one; JPEG is always produced because every browser can show it.
+
+- `content_hash(name)` returns the SHA-256 digest of a stored file, read in chunks. Only the workers call it.
+
+- `derivative_name(hash, width, fmt)` returns the storage path of one derivative, e.g.
+`derivatives/ab/<hash>/320w.webp`. Derivatives live next to the originals in media storage and are addressed
+by the content hash of the original, so the same picture uploaded twice is only resized once.
+
+- `derivative_url(asset, width, fmt)` returns the URL of the smallest derivative at least `width` pixels wide
+(or the largest one), and `srcset(asset, fmt)` returns a `srcset` value listing every width of a format. Both
+return nothing until the asset is ready or when the format was not produced.
+
+- `enqueue(name)` queues a freshly uploaded image, given by its storage path, without reading it, so a request
+that saves a large upload only writes one row. Missing files are ignored.
+
+- `prefetch_assets(objects, path)` loads the assets of the images of a whole list of objects with one query and
+caches each on its `FieldFile`, so a list page does not run one query per card. `path` may follow relations,
+e.g. `"author.lpu.image"`; objects where a relation is missing are skipped.
+
+- `image_url(field_file, width, placeholder='')` returns the URL of a JPEG derivative when it is ready, the URL
+of the original until then, and `placeholder` when there is no image at all.
+
+- `claim_next()` takes the oldest pending job with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of
+workers can share the queue without handing out the same job twice. `requeue_stale()` puts jobs back in
+the queue when their worker died while processing them.
+
+- `generate(asset)` opens the original once, applies its EXIF orientation, records its size and writes every
+width in every format with `render()`. `process(asset)` hashes the original when it was not hashed yet and,
+when an asset with the same content is already ready, takes its size and formats (`reuse()`) instead of
+running `generate()`, so the same picture uploaded twice is only resized once. It records the outcome; a job
+that fails is retried until it has been tried `MAX_ATTEMPTS` times and is then marked failed.
+"""
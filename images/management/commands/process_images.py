@@ -0,0 +1,79 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from images import derivatives
+from images.models import ImageAsset
+from images.signals import get_image_fields
+
+
+class Command(BaseCommand):
+    help = "Run a pool of workers that turns queued uploads into resized image derivatives."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker threads (default: number of CPUs).')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for new uploads.')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds an idle worker waits before looking at the queue again.')
+        parser.add_argument('--enqueue-missing', action='store_true',
+                            help='Queue every stored image that has not been queued yet before starting.')
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            self.stdout.write(f"Queued {self.enqueue_missing()} existing images.")
+
+        derivatives.requeue_stale()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            workers = [pool.submit(self.work, options['once'], options['poll_interval'])
+                       for _ in range(options['workers'])]
+            processed = sum(worker.result() for worker in workers)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} images."))
+
+    def work(self, once, poll_interval):
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                asset = derivatives.claim_next()
+                if asset is None:
+                    if once:
+                        return processed
+                    time.sleep(poll_interval)
+                    derivatives.requeue_stale()
+                    continue
+                asset = derivatives.process(asset)
+                processed += 1
+                self.stdout.write(f"{asset.name}: {asset.status}")
+        finally:
+            connection.close()
+
+    def enqueue_missing(self):
+        queued = 0
+        for model, field_names in get_image_fields().items():
+            for field_name in field_names:
+                names = (model.objects
+                         .exclude(**{f'{field_name}__isnull': True})
+                         .exclude(**{field_name: ''})
+                         .values_list(field_name, flat=True)
+                         .distinct())
+                known = set(ImageAsset.objects.values_list('name', flat=True))
+                for name in names.iterator():
+                    if name not in known:
+                        known.add(name)
+                        queued += derivatives.enqueue(name) is not None
+        return queued
+
+"""
+- `process_images` is a management command that runs the image derivative workers:
+`python manage.py process_images --workers 4`. Each worker thread has its own database connection, claims
+jobs from the `ImageAsset` queue one at a time and writes the resized copies next to the originals in media
+storage. Workers wait for new uploads until the command is stopped, or exit as soon as the queue is empty when
+`--once` is given (useful from cron or in development).
+
+- `--enqueue-missing` queues images that were uploaded before the pipeline existed.
+"""
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+def requeue_ready_assets(apps, schema_editor):
+    ImageAsset = apps.get_model('images', 'ImageAsset')
+    ImageAsset.objects.filter(status='ready').update(status='pending', attempts=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='formats',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(requeue_ready_assets, migrations.RunPython.noop),
+    ]
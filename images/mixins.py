@@ -0,0 +1,21 @@
+from .derivatives import prefetch_assets
+
+
+class ImageAssetPrefetchMixin:
+    image_paths = ['image']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        for path in self.image_paths:
+            prefetch_assets(context['object_list'], path)
+        return context
+
+
+"""
+The `ImageAssetPrefetchMixin` is a mixin for list views whose template renders images with the `derivative` 
+filter or the `responsive_image` tag.
+
+`image_paths` lists the images shown for every object, as attribute paths from the object (`"image"`, or 
+`"author.lpu.image"` for an image on a related object). `get_context_data` loads the derivative assets of all 
+of them with one query per path, so rendering the page does not query the asset table once per card.
+"""
@@ -0,0 +1,71 @@
+from django.db import models
+from django.db.models import Q
+
+
+class ImageAsset(models.Model):
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    formats = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], condition=Q(status='pending'), name='images_asset_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+    @property
+    def is_ready(self):
+        return self.status == self.READY
+
+    @property
+    def format_list(self):
+        return self.formats.split(',') if self.formats else []
+
+"""
+- `ImageAsset` is a Django model that inherits from `models.Model`. Each row stands for one uploaded original
+image and doubles as the job in the local, database-backed queue of the image derivative pipeline.
+
+- `name` is the storage path of the original image, exactly as it is stored in the `ImageField` that
+references it. It is unique, so an image is queued at most once.
+
+- `content_hash` is the SHA-256 hex digest of the original file, computed by the worker that processes it and
+empty while the job waits in the queue. Derivatives are stored under this hash, so identical uploads share one
+set of derivatives and are never processed twice.
+
+- `status` is the state of the job: `pending` rows are waiting for a worker, `processing` rows have been
+claimed by one, `ready` rows have all their derivatives on disk and `failed` rows could not be processed
+(`error` holds the reason and `attempts` counts the tries).
+
+- `width` and `height` store the size of the original in pixels once a worker has opened it, and `formats`
+holds the comma separated formats its derivatives were written in (e.g. `"webp,jpeg"`). Together they tell the
+template tags which derivative files exist without touching the storage.
+
+- `created_at` and `updated_at` store when the job was queued and last changed. The partial index
+`images_asset_pending_idx` covers only pending rows, so workers find the oldest job without scanning
+finished ones.
+
+- `is_ready` is a property that returns `True` once the derivatives of the image can be served.
+
+- `format_list` is a property that returns `formats` as a list.
+"""
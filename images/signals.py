@@ -0,0 +1,59 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_init, post_save
+
+from .derivatives import enqueue
+
+
+DEFAULT_IMAGE_FIELDS = [
+    'tennis_app.Posts.image',
+]
+
+
+def get_image_fields():
+    fields = {}
+    for path in getattr(settings, 'IMAGE_DERIVATIVE_FIELDS', DEFAULT_IMAGE_FIELDS):
+        app_label, model_name, field_name = path.split('.')
+        model = apps.get_model(app_label, model_name)
+        fields.setdefault(model, []).append(field_name)
+    return fields
+
+
+def remember_image_names(sender, instance, **kwargs):
+    instance._original_image_names = {
+        field_name: instance.__dict__.get(field_name) and str(instance.__dict__[field_name])
+        for field_name in sender._image_derivative_fields
+    }
+
+
+def enqueue_new_images(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    original_names = getattr(instance, '_original_image_names', {})
+    for field_name in sender._image_derivative_fields:
+        field_file = getattr(instance, field_name)
+        if field_file and (created or field_file.name != original_names.get(field_name)):
+            enqueue(field_file.name)
+    remember_image_names(sender, instance)
+
+
+def connect_image_fields():
+    for model, field_names in get_image_fields().items():
+        model._image_derivative_fields = field_names
+        post_init.connect(remember_image_names, sender=model, dispatch_uid=f'images_init_{model._meta.label}')
+        post_save.connect(enqueue_new_images, sender=model, dispatch_uid=f'images_save_{model._meta.label}')
+
+"""
+- `get_image_fields()` reads the `IMAGE_DERIVATIVE_FIELDS` setting, a list of `"app_label.Model.field"` paths,
+and returns the image fields to watch grouped by model.
+
+- `remember_image_names()` is connected to `post_init` and records the file name each watched field had when
+the object was loaded, so a later save can tell whether a new image was uploaded.
+
+- `enqueue_new_images()` is connected to `post_save` and queues an image for the derivative workers only when
+the object is new or the file name changed. Saving an object without touching its image does not queue or
+re-encode anything. Fixture loading (`raw` saves) is skipped.
+
+- `connect_image_fields()` is called from `ImagesConfig.ready()` and connects both receivers to every model
+listed in the setting.
+"""
@@ -0,0 +1,54 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+from images.derivatives import FALLBACK_FORMAT, FORMATS, derivative_url, get_asset, image_url, srcset
+
+register = template.Library()
+
+
+@register.filter
+def derivative(field_file, width):
+    return image_url(field_file, width)
+
+
+@register.simple_tag
+def responsive_image(field_file, width=640, sizes=None, **attrs):
+    if not field_file:
+        return ''
+    attrs.setdefault('alt', '')
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    sizes = sizes or f'{width}px'
+
+    asset = get_asset(field_file)
+    fallback = derivative_url(asset, width)
+    if fallback is None:
+        return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt][2], srcset(asset, fmt), sizes) for fmt in asset.format_list if fmt != FALLBACK_FORMAT),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, fallback, srcset(asset), sizes, flatatt(attrs),
+    )
+
+"""
+- `derivative` is a template filter that returns the URL of the JPEG derivative of an image that is at least the
+given width, e.g. `{{ post.image|derivative:320 }}`. Until the workers have produced the copies it returns the
+URL of the original, and it returns an empty string when there is no image.
+
+- `responsive_image` is a template tag that renders an image as a `<picture>` element, e.g.
+`{% responsive_image post.image 100 alt=post.title class="thumbnail" %}`.
+    - `width` is the width, in CSS pixels, the image is displayed at. It picks the `src` of the fallback `<img>`
+    and is used as `sizes` unless a `sizes` value such as `"(max-width: 600px) 100vw, 800px"` is given.
+    - There is one `<source>` with a `srcset` per modern format that was produced (AVIF, WebP), and the `<img>`
+    carries the JPEG `srcset`, so the browser downloads the smallest file that is sharp enough for the screen
+    and the first format it supports.
+    - Any other keyword becomes an attribute of the `<img>`; images load lazily unless `loading` is given.
+    - Until the derivatives are ready it renders a plain `<img>` of the original, and it renders nothing when
+    there is no image.
+
+- Use `prefetch_assets()` in list views so neither tag queries the database once per row.
+"""
@@ -0,0 +1,206 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from images import derivatives
+from images.models import ImageAsset
+from laika.models import LaikaProfileUser
+from laika.models import Post as LaikaPost
+from tennis_app.models import Posts
+
+
+def make_upload(name='court.jpg', size=(2000, 1000), color='green'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+    """
+    The `setUp` method points `MEDIA_ROOT` at a temporary directory, so the uploads and derivatives written by the
+    tests never touch the real media folder, and creates a test user.
+    """
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+    def create_post(self, image):
+        return Posts.objects.create(
+            user_gender='M',
+            birth_date='1990-01-01',
+            phone='123456789',
+            description='Looking for a partner',
+            level='3',
+            language='1',
+            author=self.user,
+            image=image,
+        )
+    """
+    The `create_post` helper creates a tennis post with the given uploaded image.
+    """
+
+
+class ImageDerivativePipelineTest(TemporaryMediaMixin, TestCase):
+
+    def test_upload_is_queued_not_resized(self):
+        post = self.create_post(make_upload())
+        asset = ImageAsset.objects.get(name=post.image.name)
+        self.assertEqual(asset.status, ImageAsset.PENDING)
+        self.assertEqual(asset.content_hash, '')
+        with Image.open(post.image.path) as original:
+            self.assertEqual(original.size, (2000, 1000))
+    """
+    - The `test_upload_is_queued_not_resized` method tests that saving a post with a new image only queues it.
+    - The stored original keeps its full size and is not even read to be hashed; nothing is resized during the
+    request.
+    """
+
+    def test_save_without_new_image_does_not_queue(self):
+        post = self.create_post(make_upload())
+        ImageAsset.objects.all().delete()
+        post = Posts.objects.get(pk=post.pk)
+        post.description = 'Updated description'
+        post.save()
+        self.assertFalse(ImageAsset.objects.exists())
+    """
+    - The `test_save_without_new_image_does_not_queue` method tests that saving a post whose image did not change
+    does not queue the image again.
+    """
+
+    def test_identical_content_is_processed_once(self):
+        first = self.create_post(make_upload('first.jpg'))
+        first_asset = derivatives.process(derivatives.claim_next())
+        derivative = derivatives.derivative_name(first_asset.content_hash, 320)
+        default_storage.delete(derivative)
+
+        second = self.create_post(make_upload('second.jpg'))
+        asset = derivatives.process(derivatives.claim_next())
+        self.assertEqual(asset.name, second.image.name)
+        self.assertEqual(asset.status, ImageAsset.READY)
+        self.assertEqual(asset.content_hash, first_asset.content_hash)
+        self.assertEqual((asset.width, asset.formats), (first_asset.width, first_asset.formats))
+        self.assertFalse(default_storage.exists(derivative))
+        self.assertEqual(ImageAsset.objects.get(name=first.image.name).content_hash, asset.content_hash)
+    """
+    - The `test_identical_content_is_processed_once` method tests that a second upload with the same content is
+    hashed by the worker, which then marks it ready with the size and formats of the first one without resizing
+    it again: a derivative removed in between is not written back.
+    """
+
+    def test_filter_serves_original_until_ready(self):
+        post = self.create_post(make_upload())
+        template = Template('{% load images %}{{ post.image|derivative:300 }}')
+        self.assertEqual(template.render(Context({'post': Posts.objects.get(pk=post.pk)})), post.image.url)
+
+        derivatives.process(derivatives.claim_next())
+        asset = ImageAsset.objects.get(name=post.image.name)
+        self.assertEqual(
+            template.render(Context({'post': Posts.objects.get(pk=post.pk)})),
+            default_storage.url(derivatives.derivative_name(asset.content_hash, 320)),
+        )
+    """
+    - The `test_filter_serves_original_until_ready` method tests that the `derivative` filter returns the original
+    image while the job is pending and, once it has been processed, the smallest JPEG at least as wide as asked.
+    """
+
+    def test_responsive_image_renders_srcset_per_format(self):
+        post = self.create_post(make_upload())
+        template = Template('{% load images %}{% responsive_image post.image 100 alt="Court" class="thumbnail" %}')
+        self.assertHTMLEqual(
+            template.render(Context({'post': Posts.objects.get(pk=post.pk)})),
+            f'<img src="{post.image.url}" alt="Court" class="thumbnail" loading="lazy" decoding="async">',
+        )
+
+        derivatives.process(derivatives.claim_next())
+        asset = ImageAsset.objects.get(name=post.image.name)
+        html = template.render(Context({'post': Posts.objects.get(pk=post.pk)}))
+        self.assertIn('<picture>', html)
+        self.assertIn(f'src="{derivatives.derivative_url(asset, 100)}"', html)
+        self.assertIn('sizes="100px"', html)
+        for fmt in asset.format_list:
+            self.assertIn(derivatives.srcset(asset, fmt), html)
+        for width in derivatives.get_widths():
+            self.assertIn(f' {width}w', html)
+        self.assertEqual(html.count('<source'), len(asset.format_list) - 1)
+    """
+    - The `test_responsive_image_renders_srcset_per_format` method tests the `responsive_image` tag: a plain `<img>`
+    of the original while the job is pending, then a `<picture>` with one `<source>` per modern format and a JPEG
+    `srcset` listing every configured width on the `<img>`.
+    """
+
+    def test_responsive_image_without_image_renders_nothing(self):
+        template = Template('{% load images %}{% responsive_image post.image 100 %}')
+        self.assertEqual(template.render(Context({'post': Posts(image='')})), '')
+    """
+    - The `test_responsive_image_without_image_renders_nothing` method tests that the tag renders nothing for an
+    empty image field.
+    """
+
+    def test_prefetch_assets_avoids_per_row_queries(self):
+        for i in range(3):
+            self.create_post(make_upload(f'court{i}.jpg', color=(i, 100, 0)))
+        posts = derivatives.prefetch_assets(Posts.objects.all(), 'image')
+        with self.assertNumQueries(0):
+            for post in posts:
+                derivatives.image_url(post.image, 320)
+    """
+    - The `test_prefetch_assets_avoids_per_row_queries` method tests that after `prefetch_assets()` the image URLs
+    of a list are resolved without further queries.
+    """
+
+    def test_prefetch_assets_follows_relations(self):
+        other = User.objects.create_user(username='noprofile', password='testpassword')
+        LaikaProfileUser.objects.create(laika_user=self.user, image=make_upload('avatar.jpg', size=(400, 400)))
+        for author in (self.user, other):
+            LaikaPost.objects.create(title='Walk', description='Park', author=author)
+
+        posts = derivatives.prefetch_assets(LaikaPost.objects.select_related('author__lpu'), 'author.lpu.image')
+        with self.assertNumQueries(0):
+            urls = [derivatives.image_url(derivatives.resolve(post, 'author.lpu.image'), 160) for post in posts]
+        self.assertCountEqual(urls, [self.user.lpu.image.url, ''])
+    """
+    - The `test_prefetch_assets_follows_relations` method tests that `prefetch_assets()` follows a dotted path to an
+    image on a related object and skips objects where the relation is missing (an author without a profile).
+    """
+
+
+class ImageDerivativeWorkerTest(TemporaryMediaMixin, TransactionTestCase):
+    @override_settings(IMAGE_DERIVATIVE_WIDTHS=[320, 1280, 2400])
+    def test_worker_produces_every_width_and_format(self):
+        post = self.create_post(make_upload())
+        call_command('process_images', once=True, workers=2, stdout=StringIO())
+        asset = ImageAsset.objects.get(name=post.image.name)
+        self.assertEqual(asset.status, ImageAsset.READY)
+        self.assertEqual((asset.width, asset.height), (2000, 1000))
+        self.assertEqual(asset.format_list, derivatives.get_formats())
+        self.assertIn('webp', asset.format_list)
+        self.assertEqual(derivatives.asset_widths(asset), [320, 1280, 2000])
+        for fmt in asset.format_list:
+            for width in derivatives.asset_widths(asset):
+                with default_storage.open(derivatives.derivative_name(asset.content_hash, width, fmt)) as file:
+                    with Image.open(file) as image:
+                        self.assertEqual(image.format, derivatives.FORMATS[fmt][0])
+                        self.assertEqual(image.size, (width, width // 2))
+    """
+    - The `test_worker_produces_every_width_and_format` method tests that the `process_images` workers write every
+    configured width in every available format, record the size of the original, and cap the widths at the
+    original's width instead of scaling up.
+    - It is a `TransactionTestCase` because the worker threads use their own database connections and have to see
+    the queued job.
+    """
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laika', '0008_alter_laikaprofileuser_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='laika_post_created_id_idx'),
+        ),
+    ]
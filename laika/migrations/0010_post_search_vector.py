@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION laika_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER laika_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON laika_post
+    FOR EACH ROW EXECUTE FUNCTION laika_post_search_vector_update();
+
+UPDATE laika_post SET search_vector =
+    setweight(to_tsvector('pg_catalog.simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.simple', coalesce(description, '')), 'B');
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS laika_post_search_vector_trigger ON laika_post;
+DROP FUNCTION IF EXISTS laika_post_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laika', '0009_post_laika_post_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='laika_post_search_idx'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+    ]
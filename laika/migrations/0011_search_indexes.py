@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laika', '0010_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-updated_at', 'id'], name='laika_post_updated_id_idx'),
+        ),
+    ]
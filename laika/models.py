@@ -1,11 +1,24 @@
 from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 
 class LaikaProfileUser(models.Model):
     
+    DEFAULT_IMAGE = 'laika_img/laika_logo_400.png'
+
     laika_user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="lpu")
-    image = models.ImageField(upload_to='laika_img/', default='laika_img/laika_logo_400.png', null=True, blank=True)
+    image = models.ImageField(upload_to='laika_img/', default=DEFAULT_IMAGE, null=True, blank=True)
+
+    @classmethod
+    def avatar_for(cls, user):
+        try:
+            image = user.lpu.image
+        except cls.DoesNotExist:
+            image = None
+        return image or cls(image=cls.DEFAULT_IMAGE).image
 
 """
 - `class LaikaProfileUser(models.Model):` defines a `LaikaProfileUser` class that inherits from `models.Model`. 
@@ -18,13 +31,19 @@ This field defines a foreign key relationship where each `LaikaProfileUser` inst
 (it will delete the associated `LaikaProfileUser` instance as well). The `related_name` parameter specifies the 
 reverse relation name from the `User` model back to the `LaikaProfileUser` model.
 
-- `image = models.ImageField(upload_to='laika_img/', default='laika_img/laika_logo_400.png', null=True, 
-blank=True)` creates an `image` field of type `ImageField`. This field allows users to upload an image file for 
-their Laika profile. The `upload_to` parameter specifies the directory where the uploaded images will be stored. 
+- `DEFAULT_IMAGE` is the storage path of the default avatar, used both as the default of `image` and as the 
+fallback avatar of users without a profile.
+
+- `image = models.ImageField(upload_to='laika_img/', default=DEFAULT_IMAGE, null=True, blank=True)` creates an 
+`image` field of type `ImageField`. This field allows users to upload an image file for their Laika profile. The `upload_to` parameter specifies the directory where the uploaded images will be stored. 
 The `default` parameter specifies the default image to use if no image is uploaded. The `null=True` parameter 
 allows the field to be nullable in the database. The `blank=True` parameter allows the field to be left blank in 
 forms.
 
+- `avatar_for(user)` is a class method that returns the avatar image of a user: the image of their profile, or the 
+default avatar when they have no profile or no image. It uses `user.lpu`, so when the users were loaded with 
+`select_related('author__lpu')` it does not query the database, even for users without a profile.
+
 By defining this model, you can create instances of `LaikaProfileUser` that are associated with specific `User` 
 instances and store additional information such as profile images.
 """
@@ -80,12 +99,22 @@ class Post(models.Model):
     description = models.TextField()
     created_at = models.DateField(auto_now_add=True)
     updated_at = models.DateField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='laika_post_created_id_idx'),
+            models.Index(fields=['-updated_at', 'id'], name='laika_post_updated_id_idx'),
+            GinIndex(fields=['search_vector'], name='laika_post_search_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title}: {self.author}'
+
+    @cached_property
+    def author_avatar(self):
+        return LaikaProfileUser.avatar_for(self.author)
     
 """
 - `class Post(models.Model):` defines a `Post` class that inherits from `models.Model`. This class represents a 
@@ -116,15 +145,27 @@ sets the current date when a new `Post` instance is created.
 - `updated_at = models.DateField(auto_now=True)` creates a date field named `updated_at` that automatically 
 updates to the current date whenever a `Post` instance is saved.
 
+- `search_vector = SearchVectorField(null=True, editable=False)` creates a `tsvector` column holding the words 
+of the title (weight A) and the description (weight B). It is maintained by a database trigger on every insert 
+and update, including bulk writes, and is never edited directly.
+
 - `class Meta:` defines the inner class `Meta` that provides metadata for the `Post` model.
 
 - `ordering = ['-updated_at']` specifies the default ordering of `Post` instances based on the `updated_at` 
 field in descending order.
 
+- `indexes` adds a composite index on (`created_at`, `id`), the keyset the `apis` list endpoint pages on, a 
+composite index on (`updated_at` descending, `id`) matching the order of the post list, and a GIN index on 
+`search_vector` used by the post list search.
+
 - `def __str__(self):` defines a `__str__` method for the `Post` class. This method returns a string 
 representation of the `Post` instance, which is used for display purposes. It returns a string that combines the 
 `title` and `author` attributes.
 
+- `author_avatar` is a cached property that returns the avatar image of the author (see 
+`LaikaProfileUser.avatar_for`). It is cached on the post, so the image derivatives prefetched for it in the post 
+list are reused when the template renders it.
+
 By defining this model, you can create instances of `Post` that are associated with specific `User` instances 
 and store information about the posts, such as their titles, descriptions, images, and creation/update timestamps.
 """
\ No newline at end of file
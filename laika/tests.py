@@ -1,10 +1,12 @@
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 from datetime import date
 from .models import Post
 from .models import LaikaProfileUser, Pet
 from .custom_form import ProfileForm, PetForm
+from .views import PostListView
 
 
 class PostListViewTestCase(TestCase):
@@ -464,3 +466,132 @@ class LaikaProfileViewTest(TestCase):
 
 
 
+
+
+class PostFullTextSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.walk = Post.objects.create(title='Morning walks', description='Long walks with a puppy', author=cls.user)
+        cls.food = Post.objects.create(title='Puppy food', description='What to feed after a walk', author=cls.user)
+    """
+    The `setUpTestData` method creates a user and two posts that both mention walks.
+    """
+
+    def test_view_search_matches_prefixes_and_ranks_title_first(self):
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('laika-post-list'), {'search_words': 'walk'})
+        self.assertEqual(list(response.context['posts']), [self.walk, self.food])
+        response = self.client.get(reverse('laika-post-list'), {'search_words': 'pup', 'search_field': 'title'})
+        self.assertEqual(list(response.context['posts']), [self.food])
+    """
+    - The `test_view_search_matches_prefixes_and_ranks_title_first` method tests the full-text search of the post 
+    list.
+    - Searching "walk" without a `search_field` matches both posts, with the title match ranked first.
+    - Searching the prefix "pup" in the title only matches the post whose title contains "Puppy".
+    """
+
+
+class PostListAuthorPrefetchTestCase(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='viewer', password='testpassword')
+        self.client.login(username='viewer', password='testpassword')
+
+    def create_posts(self, count):
+        for i in range(count):
+            author = User.objects.create_user(username=f'author{User.objects.count()}', password='testpassword')
+            if i % 2:
+                LaikaProfileUser.objects.create(laika_user=author)
+            Post.objects.create(title=f'Walk {i}', description='In the park', author=author)
+    """
+    The `create_posts` helper creates `count` posts, each by a new author. Every other author has a 
+    `LaikaProfileUser`, the others have no profile at all.
+    """
+
+    def test_list_query_count_is_constant(self):
+        url = reverse('laika-post-list')
+
+        self.create_posts(4)
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+        self.create_posts(40)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), 44)
+    """
+    - The `test_list_query_count_is_constant` method pins the number of queries the post list runs: the session, 
+    the logged in user, the posts joined with their authors and profiles, and the avatar image derivatives.
+    - The count stays at 4 whether the list has 4 or 44 posts.
+    """
+
+    def test_author_without_profile_gets_default_avatar(self):
+        self.create_posts(1)
+        response = self.client.get(reverse('laika-post-list'))
+        post = response.context['posts'][0]
+        self.assertEqual(post.author_avatar.name, LaikaProfileUser.DEFAULT_IMAGE)
+        self.assertContains(response, post.author_avatar.url)
+    """
+    - The `test_author_without_profile_gets_default_avatar` method tests that a post whose author has no 
+    `LaikaProfileUser` still shows the default avatar.
+    """
+
+
+class PostIndexUsageTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for i in range(20):
+            Post.objects.create(title=f'Post {i}', description='A walk in the park', author=cls.user)
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+    """
+    The `explain` helper returns the plan PostgreSQL picks for a queryset. Sequential scans are switched off for the 
+    current transaction, since on a table of a few rows the planner would read the whole table whatever indexes 
+    exist; with them off it shows which index matches the query.
+    """
+
+    def test_post_list_order_uses_index(self):
+        request = RequestFactory().get(reverse('laika-post-list'))
+        view = PostListView()
+        view.setup(request)
+        plan = self.explain(view.get_queryset())
+        self.assertIn('laika_post_updated_id_idx', plan)
+        self.assertNotIn('Sort', plan)
+    """
+    - The `test_post_list_order_uses_index` method tests that the post list reads the posts in the order of 
+    `laika_post_updated_id_idx` instead of sorting them.
+    """
+
+
+class PostDetailConditionalGetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.pet = Pet.objects.create(owner=cls.user, pet_name='Rex', species='Dog')
+        cls.post = Post.objects.create(title='Test Post', description='This is a test post', author=cls.user)
+        cls.url = reverse('laika-post-detail', kwargs={'pk': cls.post.pk})
+
+    def test_editing_the_pet_changes_the_etag(self):
+        self.client.login(username='testuser', password='testpassword')
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.pet.pet_name = 'Max'
+        self.pet.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Max')
+
+        etag = response['ETag']
+        self.post.title = 'New title'
+        self.post.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    """
+    - The `test_editing_the_pet_changes_the_etag` method tests that the post page is validated while nothing 
+    changed and is sent again once the author's pet, which the page shows, is edited.
+    - Editing the post on the same day changes the `ETag` as well, although `updated_at` keeps its value.
+    """
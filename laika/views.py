@@ -4,15 +4,20 @@ from .models import Post, LaikaProfileUser, Pet
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
-from dj_proj.mixins import AuthorOrStaffRequiredMixin
+from dj_proj.mixins import AuthorOrStaffRequiredMixin, ConditionalGetMixin, digest
+from django.db.models import F, OuterRef, Subquery
+from dj_proj.search import search_posts
+from images.mixins import ImageAssetPrefetchMixin
+from listcache.mixins import ListCacheMixin
 from .custom_form import ProfileForm, PetForm
 
 
 @method_decorator(login_required, name = 'dispatch')
-class PostListView(ListView):
+class PostListView(ListCacheMixin, ImageAssetPrefetchMixin, ListView):
     model = Post
     template_name = 'laika/post_list.html'
     context_object_name = 'posts'
+    image_paths = ['author_avatar']
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -21,10 +26,7 @@ class PostListView(ListView):
         search_date = self.request.GET.get("search_date")
         
         if search_words:
-            if search_field == "title":
-                queryset = queryset.filter(title__icontains = search_words)
-            elif search_field == "description":
-                queryset = queryset.filter(description__icontains = search_words)
+            queryset = search_posts(queryset, search_words, search_field)
         
         if search_date:
             queryset = queryset.filter(created_at__gte = search_date)
@@ -32,15 +34,24 @@ class PostListView(ListView):
         if not search_words and not search_date:
             queryset = self.model.objects.all()
         
-        return queryset
+        if not search_words:
+            queryset = queryset.order_by(*self.model._meta.ordering, 'pk')
+        
+        return queryset.select_related('author__lpu')
     
 """
 - `@method_decorator(login_required, name='dispatch')` is a decorator that applies the `login_required` decorator 
 to the `dispatch` method of the `PostListView` class. This decorator ensures that only authenticated users can 
 access the view.
 
-- `class PostListView(ListView):` defines a class-based view that inherits from the `ListView` class provided by 
-Django. This view is responsible for displaying a list of posts.
+- `class PostListView(ListCacheMixin, ImageAssetPrefetchMixin, ListView):` defines a class-based view that 
+inherits from the `ListView` class provided by Django. This view is responsible for displaying a list of posts.
+
+- `ListCacheMixin` caches the rendered list of posts per query string until a post, a profile, a user or an 
+image derivative changes (see `LIST_CACHE_VIEWS`).
+
+- `image_paths = ['author_avatar']` tells `ImageAssetPrefetchMixin` to load the image derivatives of every 
+author's avatar with one query, so the list shows small avatar copies instead of the full size uploads.
 
 - `model = Post` specifies the model that the view should use for querying the database. It is the `Post` model.
 
@@ -68,7 +79,17 @@ GET request.
 - The following `if` statements check if the `search_words` and `search_date` parameters have values and apply 
 corresponding filters to the queryset. If no search parameters are provided, the default queryset is returned.
 
-- Finally, the modified queryset is returned.
+- `search_words` is matched with `search_posts()` against the indexed full-text `search_vector` of the post. 
+Every word is matched as a prefix, `search_field` restricts the match to the title or the description, and 
+the results are ordered by relevance.
+
+- Without search words the posts are ordered by the model's default ordering with the primary key as tie 
+breaker, since `updated_at` is a date and many posts share it. Search results are already ordered that way after 
+their relevance.
+
+- Finally, the modified queryset is returned with `select_related('author__lpu')`, which loads every post's 
+author and the author's `LaikaProfileUser` in the same query (a left join, so authors without a profile are 
+kept). The template reads the author name, join date and avatar of every row without further queries.
 
 By using this view, you can display a list of posts with optional search functionality based on the provided 
 parameters in the GET request.
@@ -147,10 +168,23 @@ additional processing before saving the form.
 
 
 @method_decorator(login_required, name = 'dispatch')
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     model = Post
     template_name = "laika/post_detail.html"
     context_object_name = "post"
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('author__lpu')
+
+    def get_validator_fields(self):
+        first_pet = Pet.objects.filter(owner=OuterRef('author')).order_by('pk').annotate(
+            digest=digest('pet_name', 'species', 'species_type', 'description')
+        )
+        return {
+            'content': digest('title', 'description', 'image'),
+            'avatar': F('author__lpu__image'),
+            'pet': Subquery(first_pet.values('digest')[:1]),
+        }
     
 """
 - `@method_decorator(login_required, name='dispatch')` is a decorator that applies the `login_required` decorator 
@@ -168,6 +202,14 @@ the `post_detail.html` template located in the `laika` directory.
 - `context_object_name = "post"` specifies the name of the variable that will be used to access the `Post` object 
 in the template. It will be available as `post`.
 
+- `def get_queryset(self):` loads the post together with its author and the author's `LaikaProfileUser` in one 
+join, so rendering the author's avatar does not run extra queries.
+
+- `ConditionalGetMixin` answers repeated visits with `304 Not Modified` while the post is unchanged (see 
+`dj_proj/mixins.py`). `updated_at` is only a date, so `get_validator_fields` adds a digest of the post's 
+title, description and image, and what the page shows besides the post: the author's avatar and a digest of the 
+author's first pet. Editing any of them changes the page's `ETag`.
+
 By using this view, you can display the details of a specific `Post` object, such as its title, description, and 
 other fields.
 """
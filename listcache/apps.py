@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ListcacheConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'listcache'
+
+    def ready(self):
+        from . import signals
+        signals.connect_list_models()
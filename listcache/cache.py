@@ -0,0 +1,125 @@
+import hashlib
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_VIEWS = {}
+IGNORED_QUERY_PARAMS = {'csrfmiddlewaretoken'}
+
+
+def get_cache():
+    return caches[getattr(settings, 'LIST_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'LIST_CACHE_TIMEOUT', 300)
+
+
+def get_views():
+    return getattr(settings, 'LIST_CACHE_VIEWS', DEFAULT_VIEWS)
+
+
+def normalize_query(query):
+    return urlencode(sorted(
+        (key, value)
+        for key, values in query.lists() if key not in IGNORED_QUERY_PARAMS
+        for value in values if value != ''
+    ))
+
+
+def token_key(label):
+    return f'listcache:token:{label.lower()}'
+
+
+def get_tokens(labels):
+    cache = get_cache()
+    keys = [token_key(label) for label in labels]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, uuid4().hex, None)
+            tokens[key] = cache.get(key)
+    return [tokens[key] for key in keys]
+
+
+def invalidate(label):
+    get_cache().set(token_key(label), uuid4().hex, None)
+
+
+def make_key(name, query):
+    tokens = get_tokens(get_views().get(name, []))
+    digest = hashlib.md5(':'.join([*tokens, normalize_query(query)]).encode()).hexdigest()
+    return f'listcache:page:{name}:{digest}'
+
+
+def stats_key(name, outcome):
+    return f'listcache:stats:{name}:{outcome}'
+
+
+def record(name, hit):
+    cache = get_cache()
+    key = stats_key(name, 'hits' if hit else 'misses')
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def stats():
+    cache = get_cache()
+    counters = cache.get_many([stats_key(name, outcome) for name in get_views() for outcome in ('hits', 'misses')])
+    return {
+        name: {
+            'hits': counters.get(stats_key(name, 'hits'), 0),
+            'misses': counters.get(stats_key(name, 'misses'), 0),
+        }
+        for name in get_views()
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([stats_key(name, outcome) for name in get_views() for outcome in ('hits', 'misses')])
+
+
+class CachedList:
+
+    def __init__(self, name, query):
+        self.name = name
+        self.key = make_key(name, query)
+        self.content = get_cache().get(self.key)
+        self.hit = self.content is not None
+        record(name, self.hit)
+
+    def store(self, content):
+        self.content = content
+        get_cache().set(self.key, content, get_timeout())
+
+"""
+- This module is the response cache of the list pages. What is cached is the rendered list of a page (the part of
+the template between `{% cachedlist %}` and `{% endcachedlist %}`), not the whole response: the rest of the page
+shows the logged in user and carries CSRF tokens, while the list itself is the same for everyone and is where the
+queries and the rendering time go. It uses the Django cache named by `LIST_CACHE_ALIAS`, so it works with the
+local-memory or file backend in development and with any shared backend (Redis, Memcached) in production.
+
+- `get_views()` returns the `LIST_CACHE_VIEWS` setting, which maps the URL name of every cached view to the models
+(`"app_label.Model"`) its list is rendered from.
+
+- `normalize_query(query)` turns a `QueryDict` into a canonical query string: parameters are sorted, empty values
+and the CSRF token some search forms send along are dropped, so `?b=2&a=1` and `?a=1&b=2&c=` share an entry.
+
+- Invalidation is done with one token per model. `make_key(name, query)` combines the tokens of the models of the
+view with the normalized query string, and `invalidate(label)` replaces the token of a model with a new random
+one. Every entry rendered from that model is then unreachable at once and simply expires, without the cache having
+to list or delete keys. A token that was evicted is recreated at random as well, so an old entry can never be
+served again.
+
+- `record(name, hit)` counts hits and misses per view in the cache itself, so with a shared backend the counters
+add up over all processes. `stats()` returns them and `reset_stats()` sets them back to zero.
+
+- `CachedList` looks a list up for one request: `hit` tells whether a rendered list was found, `content` holds
+it, and `store(content)` saves the list rendered on a miss for `LIST_CACHE_TIMEOUT` seconds.
+"""
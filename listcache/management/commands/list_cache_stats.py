@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from listcache import cache
+
+
+class Command(BaseCommand):
+    help = "Show the hit and miss counters of the list page cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Set the counters back to zero afterwards.')
+
+    def handle(self, *args, **options):
+        for name, counters in cache.stats().items():
+            total = counters['hits'] + counters['misses']
+            ratio = counters['hits'] / total if total else 0
+            self.stdout.write(f"{name}: {counters['hits']} hits, {counters['misses']} misses ({ratio:.0%} hit rate)")
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write("Counters reset.")
+
+"""
+- `list_cache_stats` is a management command that prints the hit and miss counters of every cached list view,
+e.g. `python manage.py list_cache_stats`. `--reset` sets them back to zero after printing. With a shared cache
+backend the counters cover every web process.
+"""
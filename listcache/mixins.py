@@ -0,0 +1,29 @@
+from .cache import CachedList
+
+
+class ListCacheMixin:
+    cached_list = None
+
+    def get(self, request, *args, **kwargs):
+        self.cached_list = CachedList(request.resolver_match.url_name, request.GET)
+        response = super().get(request, *args, **kwargs)
+        response['X-List-Cache'] = 'hit' if self.cached_list.hit else 'miss'
+        return response
+
+    def get_queryset(self):
+        if self.cached_list is not None and self.cached_list.hit:
+            return self.model._default_manager.none()
+        return super().get_queryset()
+
+
+"""
+The `ListCacheMixin` is a mixin for the list views whose list is cached (see `listcache.cache`). It has to come 
+first in the bases of the view.
+
+`get` looks the list up under the URL name of the view and the query string of the request before the view runs, 
+and reports the outcome in the `X-List-Cache` response header (`hit` or `miss`).
+
+On a hit `get_queryset` returns an empty queryset without running the view's own filtering, so no posts are 
+loaded; the `{% cachedlist %}` tag of the template then outputs the stored list. On a miss the view runs as usual 
+and the tag stores the list it renders.
+"""
@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import get_views, invalidate
+
+
+IGNORED_UPDATE_FIELDS = {'last_login'}
+
+
+def invalidate_lists(sender, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and set(update_fields) <= IGNORED_UPDATE_FIELDS):
+        return
+    label = sender._meta.label
+    invalidate(label)
+    transaction.on_commit(lambda: invalidate(label))
+
+
+def connect_list_models():
+    labels = {label for models in get_views().values() for label in models}
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(invalidate_lists, sender=model, dispatch_uid=f'listcache_save_{label}')
+        post_delete.connect(invalidate_lists, sender=model, dispatch_uid=f'listcache_delete_{label}')
+
+"""
+- `invalidate_lists()` is connected to `post_save` and `post_delete` of every model a cached list depends on and
+invalidates the cached lists rendered from that model. It invalidates right away, and once more when the
+transaction commits: a list rendered by another request between the write and the commit still shows the old
+rows and would otherwise stay cached.
+
+- Saves that only touch fields in `IGNORED_UPDATE_FIELDS` do not invalidate anything. Django updates
+`last_login` on every login, and no list shows it. Fixture loading (`raw` saves) is skipped as well.
+
+- `connect_list_models()` is called from `ListcacheConfig.ready()` and connects the receiver to every model named
+in `LIST_CACHE_VIEWS`.
+"""
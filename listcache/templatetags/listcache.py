@@ -0,0 +1,31 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+class CachedListNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        cached_list = getattr(context.get('view'), 'cached_list', None)
+        if cached_list is None:
+            return self.nodelist.render(context)
+        if not cached_list.hit:
+            cached_list.store(self.nodelist.render(context))
+        return mark_safe(cached_list.content)
+
+
+@register.tag
+def cachedlist(parser, token):
+    nodelist = parser.parse(('endcachedlist',))
+    parser.delete_first_token()
+    return CachedListNode(nodelist)
+
+"""
+- `cachedlist` is a template tag that marks the part of a list template that is cached by `ListCacheMixin`:
+`{% cachedlist %}{% for post in posts %}...{% endfor %}{% endcachedlist %}`. On a hit it outputs the stored list
+and on a miss it renders its content and stores it. In views without the mixin it just renders its content.
+The part inside must not depend on the logged in user, since the stored list is shared by everybody.
+"""
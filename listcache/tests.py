@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from get_app.models import Post
+from listcache import cache
+from marketplace.models import MarketplaceItemPost
+
+
+class ListCacheTest(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.post = Post.objects.create(title='First Post', description='A post', author=self.user)
+        self.client.login(username='testuser', password='testpassword')
+        self.url = reverse('post-list')
+    """
+    The `setUp` method clears the cache, so no list cached by another test is served, creates a user with one
+    parenting post and logs the user in.
+    """
+
+    def test_second_request_is_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'miss')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'hit')
+        self.assertContains(response, 'First Post')
+        self.assertContains(response, 'Hello <strong>testuser</strong>', html=False)
+    """
+    - The `test_second_request_is_served_from_cache` method tests that the second visit is a hit that only loads the
+    session and the user, and still shows the posts and the page of the logged in user.
+    """
+
+    def test_cached_list_is_shared_between_users(self):
+        self.client.get(self.url)
+        User.objects.create_user(username='otheruser', password='testpassword')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'miss')
+
+        self.client.login(username='otheruser', password='testpassword')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'hit')
+        self.assertContains(response, 'Hello <strong>otheruser</strong>', html=False)
+        self.assertNotContains(response, 'Hello <strong>testuser</strong>', html=False)
+    """
+    - The `test_cached_list_is_shared_between_users` method tests that only the list is cached: another user gets the
+    cached list inside their own page.
+    - Creating the second user invalidates the list, since it shows user names; logging in does not.
+    """
+
+    def test_query_string_is_normalized(self):
+        self.client.get(self.url, {'search_words': 'first', 'search_field': 'title', 'search_date': ''})
+        response = self.client.get(
+            f'{self.url}?csrfmiddlewaretoken=abc&search_field=title&search_words=first'
+        )
+        self.assertEqual(response['X-List-Cache'], 'hit')
+
+        response = self.client.get(self.url, {'search_words': 'other', 'search_field': 'title'})
+        self.assertEqual(response['X-List-Cache'], 'miss')
+    """
+    - The `test_query_string_is_normalized` method tests that the order of the parameters, empty values and the CSRF
+    token do not change the cache key, while a different search does.
+    """
+
+    def test_writes_invalidate_the_list(self):
+        self.client.get(self.url)
+        Post.objects.create(title='Second Post', description='Another post', author=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'miss')
+        self.assertContains(response, 'Second Post')
+
+        self.post.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'miss')
+        self.assertNotContains(response, 'First Post')
+    """
+    - The `test_writes_invalidate_the_list` method tests that creating and deleting a post invalidate the cached
+    list right away.
+    """
+
+    def test_unrelated_writes_keep_the_list(self):
+        self.client.get(self.url)
+        MarketplaceItemPost.objects.create(
+            author=self.user, title='Bike', description='A bike', category='vehicles', price=100, location='Town'
+        )
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-List-Cache'], 'hit')
+    """
+    - The `test_unrelated_writes_keep_the_list` method tests that writes to a model the list does not show (a
+    marketplace post) and the `last_login` update of a login keep the cached list.
+    """
+
+    def test_stats_count_hits_and_misses(self):
+        for _ in range(3):
+            self.client.get(self.url)
+        self.assertEqual(cache.stats()['post-list'], {'hits': 2, 'misses': 1})
+
+        out = StringIO()
+        call_command('list_cache_stats', reset=True, stdout=out)
+        self.assertIn('post-list: 2 hits, 1 misses (67% hit rate)', out.getvalue())
+        self.assertEqual(cache.stats()['post-list'], {'hits': 0, 'misses': 0})
+    """
+    - The `test_stats_count_hits_and_misses` method tests the hit and miss counters and the `list_cache_stats`
+    command that prints and resets them.
+    """
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MarketplaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'marketplace'
+
+    def ready(self):
+        from . import signals
+        signals.connect_geocoder()
@@ -0,0 +1,154 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.http import QueryDict
+
+from .models import MarketplaceItemPost
+
+
+DEFAULT_PRICE_BUCKETS = [0, 10, 50, 100, 500, 1000]
+DEFAULT_LOCATION_LIMIT = 10
+CENT = Decimal("0.01")
+
+# GROUPING(category, price_bucket, location) sets a bit for every column a row is NOT grouped by.
+CATEGORY_SET = 0b011
+PRICE_SET = 0b101
+LOCATION_SET = 0b110
+TOTAL_SET = 0b111
+
+
+def get_price_buckets():
+    return [Decimal(str(edge)) for edge in getattr(settings, "MARKETPLACE_PRICE_BUCKETS", DEFAULT_PRICE_BUCKETS)]
+
+
+def get_location_limit():
+    return getattr(settings, "MARKETPLACE_FACET_LOCATIONS", DEFAULT_LOCATION_LIMIT)
+
+
+def price_bucket_expression(edges):
+    whens = [When(price__lt=edge, then=Value(index)) for index, edge in enumerate(edges)]
+    return Case(*whens, default=Value(len(edges)), output_field=IntegerField())
+
+
+def facet_sql(queryset, edges):
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=price_bucket_expression(edges))
+        .values("category", "price_bucket", "location")
+    )
+    sql, params = rows.query.sql_with_params()
+    return (
+        "SELECT category, price_bucket, location, GROUPING(category, price_bucket, location), COUNT(*) "
+        f"FROM ({sql}) AS facet_rows "
+        "GROUP BY GROUPING SETS ((category), (price_bucket), (location), ())"
+    ), params
+
+
+def with_param(query, **params):
+    query = query.copy()
+    for name, value in params.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = str(value)
+    query.pop("page", None)
+    return query.urlencode()
+
+
+def price_label(low, high):
+    if low is None:
+        return f"Under {high}"
+    if high is None:
+        return f"{low} and over"
+    return f"{low} to {high}"
+
+
+def facet_counts(queryset, query=None):
+    edges = get_price_buckets()
+    sql, params = facet_sql(queryset, edges)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    total = 0
+    categories, prices, locations = {}, {}, {}
+    for category, bucket, location, grouping, count in rows:
+        if grouping == CATEGORY_SET:
+            categories[category] = count
+        elif grouping == PRICE_SET:
+            prices[bucket] = count
+        elif grouping == LOCATION_SET:
+            locations[location] = count
+        elif grouping == TOTAL_SET:
+            total = count
+
+    query = query if query is not None else QueryDict()
+    labels = dict(MarketplaceItemPost.category_choices)
+    category_facets = [
+        {"value": value, "label": label, "count": categories[value], "query": with_param(query, category=value)}
+        for value, label in MarketplaceItemPost.category_choices
+        if categories.get(value)
+    ]
+    category_facets += [
+        {"value": value, "label": value, "count": count, "query": None}
+        for value, count in categories.items()
+        if value not in labels and value is not None
+    ]
+
+    bounds = [None] + edges + [None]
+    price_facets = []
+    for bucket in sorted(prices):
+        low, high = bounds[bucket], bounds[bucket + 1]
+        price_facets.append({
+            "low": low,
+            "high": high,
+            "label": price_label(low, high),
+            "count": prices[bucket],
+            "query": with_param(query, min_price=low, max_price=high - CENT if high is not None else None),
+        })
+
+    located = sorted(((value, count) for value, count in locations.items() if value), key=lambda item: (-item[1], item[0]))
+    location_facets = [
+        {"value": value, "label": value, "count": count, "query": with_param(query, location=value)}
+        for value, count in located[:get_location_limit()]
+    ]
+
+    return {
+        "total": total,
+        "categories": category_facets,
+        "prices": price_facets,
+        "locations": location_facets,
+    }
+
+"""
+- This module counts the facets of a marketplace search: how many of the matching posts are in each category,
+in each price range and at each location. The counts are computed by the database with one query, whatever the
+number of categories, ranges or locations.
+
+- `get_price_buckets()` returns the price edges from the `MARKETPLACE_PRICE_BUCKETS` setting. The edges
+`[0, 10, 50]` give the ranges "under 0", "0 to 10", "10 to 50" and "50 and over"; a range includes its lower edge
+and excludes its upper one.
+
+- `get_location_limit()` returns how many locations are listed, from the `MARKETPLACE_FACET_LOCATIONS` setting.
+
+- `price_bucket_expression(edges)` is the SQL `CASE` that gives the number of the range a price is in.
+
+- `facet_sql(queryset, edges)` wraps the filtered search query in a query that groups its rows by `GROUPING SETS`:
+once by category, once by price range, once by location and once over all rows for the total. PostgreSQL reads the
+matching rows a single time for all four groupings. `GROUPING(...)` tells the groupings apart, since a `NULL`
+category or location is a value of its own.
+
+- `with_param(query, **params)` returns the query string of the current search with some parameters set, or
+removed when the value is `None`, so a facet links to the current search narrowed to it. The page number is dropped,
+since the narrowed search has fewer pages.
+
+- `facet_counts(queryset, query=None)` runs the facet query for the search `queryset`, whose links keep the other
+parameters of the `query` `QueryDict` (usually `request.GET`), and returns the total and
+the `categories`, `prices` and `locations` facets, each a list of dicts with a `label`, a `count` and the `query`
+string of the narrowed search. Only facets with matching posts are listed; categories keep the order of the model
+choices, prices go from cheap to expensive and locations from the most to the least posts, up to the limit.
+Categories that are not among the model choices (older rows) are counted but not linked, since the search form
+would reject them.
+"""
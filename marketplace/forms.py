@@ -1,5 +1,6 @@
 from random import choices
 from django import forms
+from .geo import geocode
 from .models import MarketplaceItemPost
 import datetime
 
@@ -57,6 +58,7 @@ class SearchForm(forms.Form):
     min_price = forms.DecimalField(label="Minimum price", required=False)
     max_price = forms.DecimalField(label="Maximum price", required=False)
     location = forms.CharField(label="Item location", max_length=255, required=False)
+    fuzzy = forms.BooleanField(label="Match similar spellings", required=False)
     init_post_date = forms.DateField(
         label="Inital date to search from",
         required=False,
@@ -71,6 +73,23 @@ class SearchForm(forms.Form):
             years=range(2000, datetime.datetime.now().year + 1)
         ),
     )
+    near = forms.CharField(label="Near", max_length=255, required=False)
+    radius = forms.FloatField(label="Within (km)", min_value=0.1, max_value=20000, required=False)
+    latitude = forms.FloatField(min_value=-90, max_value=90, required=False, widget=forms.HiddenInput)
+    longitude = forms.FloatField(min_value=-180, max_value=180, required=False, widget=forms.HiddenInput)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        latitude, longitude = cleaned_data.get("latitude"), cleaned_data.get("longitude")
+        near = cleaned_data.get("near")
+        cleaned_data["centre"] = None
+        if latitude is not None and longitude is not None:
+            cleaned_data["centre"] = (latitude, longitude)
+        elif near:
+            cleaned_data["centre"] = geocode(near)
+            if cleaned_data["centre"] is None:
+                self.add_error("near", "This place is not known. Try the nearest city.")
+        return cleaned_data
 
 """
 `class SearchForm(forms.Form)`: This line defines a new form class called `SearchForm` that inherits from 
@@ -101,6 +120,10 @@ represents the maximum price for the search. It has a label "Maximum price" and
 the search input for the item location. It has a label "Item location" and a maximum length of 255 characters. 
 It is not required.
 
+`fuzzy = forms.BooleanField(...)`: This line defines a `BooleanField` named `fuzzy` in the form. When it is 
+checked, the title and location are matched by similar spelling instead of by the exact text, so "Berln" finds 
+posts in "Berlin", and the results are sorted by how similar they are. It is not required.
+
 `init_post_date = forms.DateField(...)`: This line defines a `DateField` named `init_post_date` in the form. It 
 represents the initial date to search from. It has a label "Initial date to search from" and is not required. It 
 uses a `SelectDateWidget` to provide a widget for selecting the date.
@@ -109,6 +132,18 @@ uses a `SelectDateWidget` to provide a widget for selecting the date.
 represents the final date to search up to. It has a label "Final date to search up to" and is not required. It 
 uses a `SelectDateWidget` to provide a widget for selecting the date.
 
+`near = forms.CharField(...)` and `radius = forms.FloatField(...)`: These lines define the "near" search: only 
+posts within `radius` kilometres of the place named in `near` are found, the closest first. The place is looked up 
+in the bundled gazetteer (see `marketplace/geo.py`). They are not required; the radius defaults to the 
+`MARKETPLACE_NEAR_RADIUS_KM` setting.
+
+`latitude` and `longitude`: These hidden fields hold the position of the browser when the user searches near 
+their own location ("Near me"). They take precedence over `near`.
+
+`def clean(self):`: This method adds `centre`, the `(latitude, longitude)` to search around, to the cleaned data: 
+the position of the browser, the coordinates of the `near` place, or `None` when neither was given. A `near` place 
+that is not in the gazetteer is reported as an error on the field.
+
 By using this form, you can create a search form in your Django views or templates that allows users to specify 
 search criteria for filtering `MarketplaceItemPost` objects.
 """
\ No newline at end of file
@@ -0,0 +1,131 @@
+import csv
+import math
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize(name):
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(name.casefold().replace(".", " ").split())
+
+
+@lru_cache(maxsize=4)
+def load_gazetteer(path):
+    places = {}
+    with open(path, newline="", encoding="utf-8") as gazetteer:
+        for row in csv.DictReader(gazetteer):
+            point = (float(row["latitude"]), float(row["longitude"]))
+            for name in [row["name"], *row["alternate_names"].split("|")]:
+                if name:
+                    places.setdefault(normalize(name), point)
+    return places
+
+
+def geocode(location):
+    if not location:
+        return None
+    places = load_gazetteer(str(settings.MARKETPLACE_GAZETTEER))
+    for candidate in [location, *location.split(",")]:
+        point = places.get(normalize(candidate))
+        if point:
+            return point
+    return None
+
+
+def locate(post):
+    point = geocode(post.location) or (None, None)
+    changed = (post.latitude, post.longitude) != point
+    post.latitude, post.longitude = point
+    return changed
+
+
+def locate_all(posts, batch_size=1000):
+    changed = [post for post in posts.only("pk", "location", "latitude", "longitude").iterator(batch_size) if locate(post)]
+    posts.model._base_manager.using(posts.db).bulk_update(changed, ["latitude", "longitude"], batch_size=batch_size)
+    return len(changed)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angle)
+    max_lat = latitude + math.degrees(angle)
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), [(-180, 180)]
+    spread = math.sin(angle) / math.cos(math.radians(latitude))
+    if spread >= 1:
+        return min_lat, max_lat, [(-180, 180)]
+    delta = math.degrees(math.asin(spread))
+    west, east = longitude - delta, longitude + delta
+    if west < -180:
+        return min_lat, max_lat, [(west + 360, 180), (-180, east)]
+    if east > 180:
+        return min_lat, max_lat, [(west, 180), (-180, east - 360)]
+    return min_lat, max_lat, [(west, east)]
+
+
+def within_box(latitude, longitude, radius_km):
+    min_lat, max_lat, longitudes = bounding_box(latitude, longitude, radius_km)
+    spans = Q()
+    for west, east in longitudes:
+        spans |= Q(longitude__gte=west, longitude__lte=east)
+    return Q(latitude__gte=min_lat, latitude__lte=max_lat) & spans
+
+
+def distance_km(latitude, longitude):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    half_lat = Sin((Radians(F("latitude")) - Value(lat)) / Value(2.0))
+    half_lon = Sin((Radians(F("longitude")) - Value(lon)) / Value(2.0))
+    chord = Power(half_lat, 2) + Value(math.cos(lat)) * Cos(Radians(F("latitude"))) * Power(half_lon, 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(chord, Value(1.0))), output_field=FloatField())
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    return (
+        queryset.filter(within_box(latitude, longitude, radius_km))
+        .annotate(distance=distance_km(latitude, longitude))
+        .filter(distance__lte=radius_km)
+    )
+
+
+"""
+- This module places marketplace posts on the map and finds the posts within a distance of a point. Locations are
+free text, so they are geocoded offline against the gazetteer file bundled with the app
+(`marketplace/data/gazetteer.csv`, one row per place with its alternate names and coordinates); no geocoding
+service is called.
+
+- `normalize(name)` lowercases a place name and drops accents, dots and extra spaces, so "München", "munchen" and
+"MUENCHEN" are looked up alike when the gazetteer lists both spellings.
+
+- `load_gazetteer(path)` reads the gazetteer into a dict of normalized names and alternate names to
+`(latitude, longitude)`. It is read once per process. When two places share a name, the first row wins.
+
+- `geocode(location)` returns the `(latitude, longitude)` of a location, or `None` when it is not in the gazetteer.
+The whole text is looked up first, then each comma separated part, so "Berlin, Germany" and "Kreuzberg, Berlin"
+are found.
+
+- `locate(post)` sets the coordinates of a post from its location, or clears them when the location is not found,
+and returns whether they changed. `locate_all(posts)` does it for every post of a queryset and saves the changed
+ones in batches, returning how many changed. The migration that adds the coordinates geocodes the existing posts
+with its own copy of this lookup and the bundled gazetteer, so it does not change with this module or the setting.
+
+- `bounding_box(latitude, longitude, radius_km)` returns the latitude range and the longitude ranges of the
+smallest box around the circle. The longitude range widens towards the poles; it is split in two when the box
+crosses the 180th meridian, and covers every longitude when the circle contains a pole.
+
+- `within_box(latitude, longitude, radius_km)` is the `Q` filter on the box. It only compares the `latitude` and
+`longitude` columns with constants, so the database answers it from the `market_post_lat_lon_idx` index and
+reads only the rows in the box, however many posts there are.
+
+- `distance_km(latitude, longitude)` is the SQL expression of the haversine distance, in kilometres, from the
+point to the post. `nearby(queryset, latitude, longitude, radius_km)` first narrows the posts to the box and then
+computes the exact distance for the rows in it, in the same query, keeping those inside the circle. The distance
+is annotated as `distance`, so the posts can be sorted by it.
+"""
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.geo import locate_all
+from marketplace.models import MarketplaceItemPost
+
+
+class Command(BaseCommand):
+    help = "Fill in the coordinates of marketplace posts from their location and the bundled gazetteer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Geocode every post, not only those without coordinates.')
+
+    def handle(self, *args, **options):
+        posts = MarketplaceItemPost.objects.exclude(location__isnull=True).exclude(location="")
+        if not options['all']:
+            posts = posts.filter(latitude__isnull=True)
+        changed = locate_all(posts.order_by('pk'))
+        self.stdout.write(f"Geocoded {changed} posts.")
+
+"""
+- `geocode_posts` is a management command that fills in the `latitude` and `longitude` of the marketplace posts
+that have a location but no coordinates, e.g. `python manage.py geocode_posts`. Posts get their coordinates when
+they are saved, so it is only needed for posts written without the model (raw SQL, fixtures) or after places were
+added to the gazetteer. `--all` geocodes every post again, e.g. after coordinates in the gazetteer were corrected.
+"""
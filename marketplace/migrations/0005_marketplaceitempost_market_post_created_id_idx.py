@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0004_alter_marketplaceitempost_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marketplaceitempost',
+            index=models.Index(fields=['created_on', 'id'], name='market_post_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+from dj_proj.trigram import AddTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_marketplaceitempost_market_post_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marketplaceitempost',
+            index=models.Index(fields=['category', '-created_on'], name='market_post_cat_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplaceitempost',
+            index=models.Index(fields=['price'], name='market_post_price_idx'),
+        ),
+        AddTrigramIndex(
+            model_name='marketplaceitempost',
+            field_name='title',
+            name='market_post_title_trgm_idx',
+        ),
+        AddTrigramIndex(
+            model_name='marketplaceitempost',
+            field_name='location',
+            name='market_post_location_trgm_idx',
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:21
+
+import csv
+import unicodedata
+from pathlib import Path
+
+from django.db import migrations, models
+
+
+GAZETTEER = Path(__file__).resolve().parent.parent / 'data' / 'gazetteer.csv'
+
+
+def normalize(name):
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    return ' '.join(name.casefold().replace('.', ' ').split())
+
+
+def load_places():
+    places = {}
+    with open(GAZETTEER, newline='', encoding='utf-8') as gazetteer:
+        for row in csv.DictReader(gazetteer):
+            point = (float(row['latitude']), float(row['longitude']))
+            for name in [row['name'], *row['alternate_names'].split('|')]:
+                if name:
+                    places.setdefault(normalize(name), point)
+    return places
+
+
+def geocode_existing_posts(apps, schema_editor):
+    if not GAZETTEER.exists():
+        return
+    MarketplaceItemPost = apps.get_model('marketplace', 'MarketplaceItemPost')
+    posts = MarketplaceItemPost.objects.using(schema_editor.connection.alias).exclude(location__isnull=True)
+    places = load_places()
+    located = []
+    for post in posts.only('pk', 'location').order_by('pk').iterator(1000):
+        for candidate in [post.location, *post.location.split(',')]:
+            point = places.get(normalize(candidate))
+            if point:
+                post.latitude, post.longitude = point
+                located.append(post)
+                break
+    posts.bulk_update(located, ['latitude', 'longitude'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marketplaceitempost',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='marketplaceitempost',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='marketplaceitempost',
+            index=models.Index(fields=['latitude', 'longitude'], name='market_post_lat_lon_idx'),
+        ),
+        migrations.RunPython(geocode_existing_posts, migrations.RunPython.noop),
+    ]
@@ -37,6 +37,17 @@ class MarketplaceItemPost(models.Model):
         null=True,
         blank=True,
     )
+    # filled in from `location` when the post is saved
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_on", "id"], name="market_post_created_id_idx"),
+            models.Index(fields=["category", "-created_on"], name="market_post_cat_created_idx"),
+            models.Index(fields=["price"], name="market_post_price_idx"),
+            models.Index(fields=["latitude", "longitude"], name="market_post_lat_lon_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -93,6 +104,18 @@ of the marketplace item post. It has a maximum length of 100 characters. It is o
 associated with the marketplace item post. It allows users to upload an image file. The images will be stored in 
 the "market_img/" directory. It is optional, as indicated by `null=True` and `blank=True`.
 
+`latitude = models.FloatField(...)` and `longitude = models.FloatField(...)`: These lines define the coordinates 
+of the place named in `location`, in degrees. They are not edited by users: they are filled in from the bundled 
+gazetteer whenever the post is saved (see `marketplace/geo.py` and `marketplace/signals.py`), and stay empty when 
+the location is empty or not in the gazetteer. The "near" search uses them.
+
+`class Meta:`: The `indexes` option adds a composite index on (`created_on`, `id`), the keyset the `apis` list 
+endpoint pages on, a composite index on (`category`, `created_on` descending) for the newest posts of a category 
+in the search, an index on `price` for the price range of the search, and an index on (`latitude`, `longitude`) 
+for the bounding box of the "near" search. The `title` and `location` searches 
+(`icontains`) use trigram indexes created by migration `0006` where `pg_trgm` is available (see 
+`dj_proj/trigram.py`).
+
 `def __str__(self) -> str:`: This method defines how the `MarketplaceItemPost` object should be represented as a 
 string. In this case, it returns the `title` of the object.
 
@@ -0,0 +1,23 @@
+from django.db.models.signals import pre_save
+
+from .geo import locate
+from .models import MarketplaceItemPost
+
+
+def locate_post(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "location" not in update_fields):
+        return
+    locate(instance)
+
+
+def connect_geocoder():
+    pre_save.connect(locate_post, sender=MarketplaceItemPost, dispatch_uid="marketplace_locate_post")
+
+"""
+- `locate_post()` is connected to `pre_save` and fills in the `latitude` and `longitude` of a marketplace post
+from its `location` with the bundled gazetteer, so they always match the location the post is saved with. The
+lookup is a dict access in memory; no query or network call is made. Fixture loading (`raw` saves) and saves that
+only write other fields (`update_fields` without `location`) are skipped.
+
+- `connect_geocoder()` is called from `MarketplaceConfig.ready()` and connects the receiver.
+"""
@@ -1,10 +1,17 @@
+from io import StringIO
+from unittest import mock
 from urllib import response
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 
 from marketplace.models import MarketplaceItemPost
 from django.contrib.auth.models import User
+from marketplace.facets import facet_counts
 from marketplace.forms import CreateMarketplacePostForm
+from marketplace.views import MarketplaceSearchResultsView
+from dj_proj.trigram import trigram_installed
 
 # Create your tests here.
 
@@ -438,3 +445,256 @@ class MarketplaceMyPostsViewTestCase(TestCase):
     - The `assertNotContains` method is used to check that the response does not contain the expected content 
     ('Test Post').
     """
+
+
+class MarketplaceSearchIndexUsageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        categories = ['technology', 'vehicles', 'furniture', 'books']
+        for i in range(40):
+            MarketplaceItemPost.objects.create(
+                author=cls.user,
+                title=f'Item {i}',
+                description='Good as new',
+                price=i * 10,
+                location=f'Town {i % 5}',
+                category=categories[i % len(categories)],
+            )
+
+    def search_plan(self, **params):
+        view = MarketplaceSearchResultsView()
+        view.setup(RequestFactory().get(reverse('marketplace_search'), params))
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return view.get_queryset().explain()
+    """
+    The `search_plan` helper runs the query `MarketplaceSearchResultsView` builds for the given search parameters 
+    through `EXPLAIN`. Sequential scans are switched off for the current transaction, since on a table of a few 
+    rows the planner would read the whole table whatever indexes exist.
+    """
+
+    def test_category_search_uses_category_index(self):
+        plan = self.search_plan(category='vehicles')
+        self.assertIn('market_post_cat_created_idx', plan)
+        self.assertNotIn('Sort', plan)
+    """
+    - The `test_category_search_uses_category_index` method tests that a category search reads the newest posts of 
+    the category straight from `market_post_cat_created_idx`, without sorting.
+    """
+
+    def test_price_range_uses_price_index(self):
+        plan = self.search_plan(min_price='50', max_price='120')
+        self.assertIn('market_post_price_idx', plan)
+    """
+    - The `test_price_range_uses_price_index` method tests that a price range search uses `market_post_price_idx`.
+    """
+
+    def test_text_search_uses_trigram_indexes(self):
+        if not trigram_installed(connection):
+            self.skipTest('pg_trgm is not installed')
+        self.assertIn('market_post_title_trgm_idx', self.search_plan(title='item 1'))
+        self.assertIn('market_post_location_trgm_idx', self.search_plan(location='town'))
+    """
+    - The `test_text_search_uses_trigram_indexes` method tests that the `title` and `location` searches use the 
+    trigram indexes. It is skipped where the `pg_trgm` extension is not available.
+    """
+
+
+class MarketplaceSearchFacetsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        items = [
+            ('Bike', 'vehicles', 120, 'Lisbon'),
+            ('Car', 'vehicles', 5000, 'Porto'),
+            ('Phone', 'technology', 80, 'Lisbon'),
+            ('Laptop', 'technology', 600, 'Lisbon'),
+            ('Novel', 'books', 8, None),
+        ]
+        for title, category, price, location in items:
+            MarketplaceItemPost.objects.create(
+                author=cls.user, title=title, description='Good as new', category=category, price=price, location=location
+            )
+
+    def test_counts_every_facet_with_one_query(self):
+        with self.assertNumQueries(1):
+            facets = facet_counts(MarketplaceItemPost.objects.all())
+        self.assertEqual(facets['total'], 5)
+        self.assertEqual(
+            [(facet['value'], facet['count']) for facet in facets['categories']],
+            [('technology', 2), ('vehicles', 2), ('books', 1)],
+        )
+        self.assertEqual(
+            [(facet['label'], facet['count']) for facet in facets['prices']],
+            [('0 to 10', 1), ('50 to 100', 1), ('100 to 500', 1), ('500 to 1000', 1), ('1000 and over', 1)],
+        )
+        self.assertEqual([(facet['value'], facet['count']) for facet in facets['locations']], [('Lisbon', 3), ('Porto', 1)])
+    """
+    - The `test_counts_every_facet_with_one_query` method tests that the category, price range and location counts 
+    and the total are computed by a single query, in the order they are listed, and that posts without a location 
+    are counted in the total but not listed as a location.
+    """
+
+    def test_search_page_counts_the_filtered_posts(self):
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('marketplace_search'), {'location': 'lisbon', 'page': '2'})
+        facets = response.context['facets']
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual([facet['value'] for facet in facets['categories']], ['technology', 'vehicles'])
+        self.assertEqual(facets['categories'][0]['query'], 'location=lisbon&category=technology')
+        self.assertEqual(facets['prices'][0]['query'], 'location=lisbon&min_price=50&max_price=99.99')
+        self.assertContains(response, '<a href="?location=lisbon&amp;category=technology">Technology</a>', html=False)
+
+        response = self.client.get(reverse('marketplace_search'), {'category': 'vehicles', 'min_price': '100', 'max_price': '999.99'})
+        self.assertEqual(response.context['facets']['total'], 1)
+        self.assertContains(response, 'Bike')
+        self.assertNotContains(response, 'Car')
+    """
+    - The `test_search_page_counts_the_filtered_posts` method tests that the search page counts only the posts 
+    matching its filters, and that each facet links to the current search narrowed to it, without the page number. 
+    Following the link of a price range finds exactly the posts counted in it.
+    """
+
+
+class MarketplaceFuzzySearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for title, location in [('Mountain bike', 'Berlin'), ('Road bike', 'Berlin, Germany'), ('Desk', 'Munich')]:
+            MarketplaceItemPost.objects.create(
+                author=cls.user, title=title, description='Good as new', category='vehicles', price=100, location=location
+            )
+
+    def search(self, **params):
+        view = MarketplaceSearchResultsView()
+        view.setup(RequestFactory().get(reverse('marketplace_search'), params))
+        return view.get_queryset()
+    """
+    The `search` helper returns the query `MarketplaceSearchResultsView` builds for the given search parameters.
+    """
+
+    def test_fuzzy_search_compares_the_indexed_expression(self):
+        with mock.patch('marketplace.views.trigram_available', return_value=True):
+            posts = self.search(location='Berln', category='vehicles', fuzzy='on')
+        sql = str(posts.query)
+        self.assertIn('UPPER(("marketplace_marketplaceitempost"."location")::text) %> Berln', sql)
+        self.assertIn('"category" = vehicles', sql)
+        self.assertNotIn('LIKE', sql)
+        self.assertEqual(posts.query.order_by, ('-similarity', '-created_on'))
+    """
+    - The `test_fuzzy_search_compares_the_indexed_expression` method tests that a fuzzy location search compares 
+    `UPPER(location::text)`, the expression of the trigram index, with the `%>` operator instead of `LIKE`, keeps 
+    the other filters and sorts by similarity.
+    """
+
+    def test_fuzzy_search_finds_misspellings(self):
+        if not trigram_installed(connection):
+            self.skipTest('pg_trgm is not installed')
+        posts = list(self.search(location='Berln', fuzzy='on'))
+        self.assertEqual({post.title for post in posts}, {'Mountain bike', 'Road bike'})
+        self.assertEqual(posts[0].location, 'Berlin')
+        self.assertGreaterEqual(posts[0].similarity, posts[1].similarity)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn('market_post_title_trgm_idx', self.search(title='bkie', fuzzy='on').explain())
+    """
+    - The `test_fuzzy_search_finds_misspellings` method tests that "Berln" finds the posts in Berlin, the closest 
+    spelling first, and that a fuzzy title search uses the trigram index of `title`. It is skipped where the 
+    `pg_trgm` extension is not available.
+    """
+
+    def test_fuzzy_box_is_ignored_without_trigram_extension(self):
+        with mock.patch('marketplace.views.trigram_available', return_value=False):
+            posts = self.search(location='berlin', fuzzy='on')
+            self.assertEqual({post.title for post in posts}, {'Mountain bike', 'Road bike'})
+            self.assertFalse(self.search(location='Berln', fuzzy='on').exists())
+    """
+    - The `test_fuzzy_box_is_ignored_without_trigram_extension` method tests that without `pg_trgm` a fuzzy search 
+    falls back to matching the exact text instead of failing.
+    """
+
+
+class MarketplaceNearSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        for title, location in [
+            ('Bike', 'Lisbon'),
+            ('Sofa', 'Porto'),
+            ('Lamp', 'Coimbra'),
+            ('Desk', 'Kreuzberg, Berlin'),
+            ('Chair', 'Somewhere unknown'),
+            ('Kayak', 'Suva'),
+        ]:
+            MarketplaceItemPost.objects.create(
+                author=cls.user, title=title, description='Good as new', category='furniture', price=50, location=location
+            )
+
+    def search(self, **params):
+        view = MarketplaceSearchResultsView()
+        view.setup(RequestFactory().get(reverse('marketplace_search'), params))
+        return view.get_queryset()
+    """
+    The `search` helper returns the query `MarketplaceSearchResultsView` builds for the given search parameters.
+    """
+
+    def test_saving_a_post_geocodes_its_location(self):
+        desk = MarketplaceItemPost.objects.get(title='Desk')
+        self.assertAlmostEqual(desk.latitude, 52.52, places=2)
+        self.assertAlmostEqual(desk.longitude, 13.405, places=2)
+        self.assertIsNone(MarketplaceItemPost.objects.get(title='Chair').latitude)
+
+        desk.location = 'München'
+        desk.save()
+        desk.refresh_from_db()
+        self.assertAlmostEqual(desk.latitude, 48.14, places=2)
+    """
+    - The `test_saving_a_post_geocodes_its_location` method tests that a post gets the coordinates of its location 
+    from the gazetteer when it is saved, also when the city is one part of the location, that an unknown location 
+    has no coordinates, and that changing the location moves the post.
+    """
+
+    def test_near_search_keeps_posts_within_the_radius(self):
+        posts = list(self.search(near='Lisboa', radius='300'))
+        self.assertEqual([post.title for post in posts], ['Bike', 'Lamp', 'Sofa'])
+        self.assertAlmostEqual(posts[0].distance, 0, places=3)
+        self.assertAlmostEqual(posts[2].distance, 274, delta=2)
+
+        self.assertEqual([post.title for post in self.search(latitude='41.15', longitude='-8.61', radius='120')], ['Sofa', 'Lamp'])
+        self.assertEqual([post.title for post in self.search(latitude='-17', longitude='-179.5', radius='300')], ['Kayak'])
+    """
+    - The `test_near_search_keeps_posts_within_the_radius` method tests that a "near" search keeps the posts within 
+    the radius, the closest first, from a place name or from the position of the browser, and that a circle 
+    crossing the 180th meridian finds the posts on the other side.
+    """
+
+    def test_near_search_uses_the_coordinates_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn('market_post_lat_lon_idx', self.search(near='Berlin', radius='10').explain())
+    """
+    - The `test_near_search_uses_the_coordinates_index` method tests that the bounding box of a "near" search is 
+    answered by the `latitude`/`longitude` index.
+    """
+
+    def test_unknown_place_is_reported(self):
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('marketplace_search'), {'near': 'Atlantis'})
+        self.assertContains(response, 'This place is not known.')
+    """
+    - The `test_unknown_place_is_reported` method tests that a place missing from the gazetteer is reported on the 
+    search form.
+    """
+
+    def test_geocode_posts_command_fills_in_missing_coordinates(self):
+        MarketplaceItemPost.objects.update(latitude=None, longitude=None)
+        out = StringIO()
+        call_command('geocode_posts', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Geocoded 5 posts.')
+        self.assertEqual(MarketplaceItemPost.objects.filter(latitude__isnull=True).count(), 1)
+    """
+    - The `test_geocode_posts_command_fills_in_missing_coordinates` method tests that `geocode_posts` places the 
+    posts written without coordinates.
+    """
@@ -17,15 +17,23 @@ from django.views.generic import (
 from django.contrib.auth.mixins import UserPassesTestMixin
 from .models import MarketplaceItemPost
 from .forms import CreateMarketplacePostForm, SearchForm
+from .facets import facet_counts
+from .geo import nearby
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import get_object_or_404
-from dj_proj.mixins import AuthorOrStaffRequiredMixin, AuthorOnlyMixin
+from dj_proj.mixins import AuthorOrStaffRequiredMixin, AuthorOnlyMixin, ConditionalGetMixin
+from images.mixins import ImageAssetPrefetchMixin
+from listcache.mixins import ListCacheMixin
 from django.urls import reverse
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from dj_proj.trigram import set_word_similarity_threshold, trigram_available, word_similar
 
 
 @method_decorator(login_required, name="dispatch")
-class MarketplaceListView(ListView):
+class MarketplaceListView(ListCacheMixin, ImageAssetPrefetchMixin, ListView):
     model = MarketplaceItemPost
     template_name = "marketplace/marketplace_list.html"
     context_object_name = "marketposts"
@@ -36,10 +44,14 @@ class MarketplaceListView(ListView):
    - This decorator is used to apply the `login_required` decorator to the `dispatch` method of the view.
    - `login_required` is a decorator provided by Django that ensures the user must be logged in to access the view.
 
-2. `class MarketplaceListView(ListView):`:
+2. `class MarketplaceListView(ListCacheMixin, ImageAssetPrefetchMixin, ListView):`:
+   - `ListCacheMixin` caches the rendered list of posts until a post, a user or an image derivative changes 
+   (see `LIST_CACHE_VIEWS`), so repeated visits neither query the posts nor render them again.
    - This line defines a class named `MarketplaceListView` that inherits from the `ListView` class.
    - By inheriting from `ListView`, the `MarketplaceListView` class inherits the functionality and attributes of 
    the `ListView` class.
+   - `ImageAssetPrefetchMixin` loads the image derivatives of all listed posts with one query, so the 
+   thumbnails are served as small resized copies without one query per post.
 
 3. `model = MarketplaceItemPost`:
    - This line defines the model that the `MarketplaceListView` view will operate on.
@@ -60,10 +72,11 @@ class MarketplaceListView(ListView):
 
 
 @method_decorator(login_required, name="dispatch")
-class MarketplaceDetailView(DetailView):
+class MarketplaceDetailView(ConditionalGetMixin, DetailView):
     model = MarketplaceItemPost
     template_name = "marketplace/marketplace_detail.html"
     context_object_name = "marketpost"
+    last_modified_field = "updated_on"
 
 """
 1. `@method_decorator(login_required, name="dispatch")`:
@@ -86,6 +99,10 @@ class MarketplaceDetailView(DetailView):
 5. `context_object_name = "marketpost"`:
    - This line sets the name of the variable that will be used to access the object in the template.
    - The object will be available as the `marketpost` variable in the template.
+
+6. `ConditionalGetMixin` and `last_modified_field = "updated_on"`:
+   - Repeated visits are answered with `304 Not Modified` while `updated_on` is unchanged, without loading or 
+   rendering the post (see `dj_proj/mixins.py`).
 """
 
 
@@ -220,7 +237,7 @@ class MarketplaceDeleteView(AuthorOrStaffRequiredMixin, DeleteView):
 
 
 @method_decorator(login_required, name="dispatch")
-class MarketplaceSearchResultsView(ListView):
+class MarketplaceSearchResultsView(ImageAssetPrefetchMixin, ListView):
     model = MarketplaceItemPost
     template_name = "marketplace/marketplace_search_results.html"
     context_object_name = "posts"
@@ -239,31 +256,52 @@ class MarketplaceSearchResultsView(ListView):
             location = form.cleaned_data.get("location")
             init_post_date = form.cleaned_data.get("init_post_date")
             final_post_date = form.cleaned_data.get("final_post_date")
-            print(self.request.GET)
+            fuzzy = form.cleaned_data.get("fuzzy") and trigram_available(connections[posts.db])
+            centre = form.cleaned_data.get("centre")
+            radius = form.cleaned_data.get("radius") or settings.MARKETPLACE_NEAR_RADIUS_KM
 
             # now we filter
 
-            if title:
+            if title and not fuzzy:
                   posts = posts.filter(title__icontains=title)
             if user:
-                  posts = posts.filter(user__username__icontains=user)
+                  posts = posts.filter(author__username__icontains=user)
             if category != "":
                   posts = posts.filter(category=category)
             if min_price is not None:
                   posts = posts.filter(price__gte=min_price)
             if max_price is not None:
                   posts = posts.filter(price__lte=max_price)
-            if location:
+            if location and not fuzzy:
                   posts = posts.filter(location__icontains=location)
             if init_post_date:
-                  posts = posts.filter(created_at__date__gte=init_post_date)
+                  posts = posts.filter(created_on__date__gte=init_post_date)
             if final_post_date:
-                  posts = posts.filter(created_at__date__lte=final_post_date)
+                  posts = posts.filter(created_on__date__lte=final_post_date)
+            if centre:
+                  posts = nearby(posts, *centre, radius)
+            if fuzzy and (title or location):
+                  return self.fuzzy_search(posts, title, location)
+            if centre:
+                  return posts.order_by("distance", "-created_on")
          return posts.order_by('-created_on')
 
+    def fuzzy_search(self, posts, title, location):
+        set_word_similarity_threshold(connections[posts.db], settings.MARKETPLACE_FUZZY_THRESHOLD)
+        scores = []
+        if title:
+            posts = word_similar(posts, "title", title, "title_similarity")
+            scores.append(F("title_similarity"))
+        if location:
+            posts = word_similar(posts, "location", location, "location_similarity")
+            scores.append(F("location_similarity"))
+        posts = posts.annotate(similarity=sum(scores[1:], scores[0]))
+        return posts.order_by("-similarity", "-created_on")
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = SearchForm(self.request.GET)
+        context["facets"] = facet_counts(self.object_list, self.request.GET)
         return context
 
 """
@@ -271,10 +309,12 @@ class MarketplaceSearchResultsView(ListView):
    - This decorator is used to apply the `login_required` decorator to the `dispatch` method of the view.
    - `login_required` is a decorator provided by Django that ensures the user must be logged in to access the view.
 
-2. `class MarketplaceSearchResultsView(ListView):`:
+2. `class MarketplaceSearchResultsView(ImageAssetPrefetchMixin, ListView):`:
    - This line defines a class named `MarketplaceSearchResultsView` that inherits from the `ListView` class.
    - By inheriting from `ListView`, the `MarketplaceSearchResultsView` class inherits the functionality and 
    attributes of the `ListView` class.
+   - `ImageAssetPrefetchMixin` loads the image derivatives of all listed posts with one query, so the 
+   thumbnails are served as small resized copies without one query per post.
 
 3. `model = MarketplaceItemPost`:
    - This line defines the model that the `MarketplaceSearchResultsView` view will operate on.
@@ -293,16 +333,33 @@ class MarketplaceSearchResultsView(ListView):
    - It creates an instance of the `SearchForm` form using the `GET` data from the request.
    - The method then filters the queryset based on the form data, applying various filters such as title, user, 
    category, price, location, and post dates.
-
-7. `get_context_data(self, **kwargs)`:
+   - When the form has a `centre` (a "near" place or the browser's position), only the posts within `radius` 
+   kilometres are kept and they are sorted by `distance`, the closest first. The posts are first narrowed to the 
+   bounding box of the circle, which the `latitude`/`longitude` index answers, and the exact distance is only 
+   computed for the posts in the box (see `marketplace/geo.py`).
+   - When "Match similar spellings" (`fuzzy`) is checked and the database has the `pg_trgm` extension, the title 
+   and location are matched by `fuzzy_search` instead of `icontains`. Without `pg_trgm` the box is ignored and the 
+   search matches the exact text, as before.
+
+7. `fuzzy_search(self, posts, title, location)`:
+   - This method keeps the posts whose title, and location when one is searched too, contains a word spelled 
+   similarly to the search text, with a similarity of at least `MARKETPLACE_FUZZY_THRESHOLD`, and sorts them from the most to the least similar 
+   (title and location similarities added up), the newest first among equals.
+   - The comparison is done by the `%>` operator of `pg_trgm` on `UPPER(column)`, which the trigram indexes of 
+   `title` and `location` answer, so the search does not read the whole table (see `dj_proj/trigram.py`).
+
+8. `get_context_data(self, **kwargs)`:
    - This method is overridden to add additional context data to the template context.
    - It creates an instance of the `SearchForm` form using the `GET` data from the request and adds it to the 
    context.
+   - It adds `facets`, the number of matching posts per category, price range and location (see 
+   `marketplace/facets.py`), counted for the same filters with a single query. Each facet links to the current 
+   search narrowed to it.
 """
 
 
 @method_decorator(login_required, name="dispatch")
-class MarketplaceMyPostsView(ListView):
+class MarketplaceMyPostsView(ImageAssetPrefetchMixin, ListView):
     model = MarketplaceItemPost
     template_name = "marketplace/marketplace_my_posts.html"
     context_object_name = "my_posts"
@@ -316,10 +373,12 @@ class MarketplaceMyPostsView(ListView):
    - This decorator is used to apply the `login_required` decorator to the `dispatch` method of the view.
    - `login_required` is a decorator provided by Django that ensures the user must be logged in to access the view.
 
-2. `class MarketplaceMyPostsView(ListView):`:
+2. `class MarketplaceMyPostsView(ImageAssetPrefetchMixin, ListView):`:
    - This line defines a class named `MarketplaceMyPostsView` that inherits from the `ListView` class.
    - By inheriting from `ListView`, the `MarketplaceMyPostsView` class inherits the functionality and attributes 
    of the `ListView` class.
+   - `ImageAssetPrefetchMixin` loads the image derivatives of all listed posts with one query, so the 
+   thumbnails are served as small resized copies without one query per post.
 
 3. `model = MarketplaceItemPost`:
    - This line defines the model that the `MarketplaceMyPostsView` view will operate on.
@@ -0,0 +1,173 @@
+import time
+import tracemalloc
+
+from django.apps import apps
+from django.db import connection
+from django.urls import URLResolver, get_resolver, reverse
+
+
+MEMORY_SLACK_KB = 64
+# Views that look their object up themselves and declare no `model`.
+PK_MODELS = {
+    'tennis-post-detail': 'tennis_app.Posts',
+}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(timings, percent):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+def discover_routes(patterns=None, prefix='', namespace=''):
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            inner = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from discover_routes(pattern.url_patterns, prefix + str(pattern.pattern), inner)
+        elif pattern.name:
+            yield namespace + pattern.name, prefix + str(pattern.pattern), pattern.callback
+
+
+def parameters(route):
+    return [part.split('>')[0].split(':')[-1] for part in route.split('<')[1:]]
+
+
+def view_model(name, callback):
+    if name in PK_MODELS:
+        return apps.get_model(PK_MODELS[name])
+    view_class = getattr(callback, 'view_class', None)
+    model = getattr(view_class, 'model', None)
+    return model or getattr(getattr(view_class, 'queryset', None), 'model', None)
+
+
+def handles_get(callback):
+    view_class = getattr(callback, 'view_class', None)
+    return view_class is None or hasattr(view_class, 'get')
+
+
+def resolve_path(name, route, callback, user):
+    if not handles_get(callback):
+        return None, 'no GET handler'
+    kwargs = {}
+    for parameter in parameters(route):
+        if parameter == 'username':
+            kwargs[parameter] = user.username
+        elif parameter == 'pk':
+            model = view_model(name, callback)
+            if model is None:
+                return None, 'no model for pk'
+            objects = model._default_manager.order_by('pk')
+            if any(field.name == 'author' for field in model._meta.fields):
+                objects = objects.filter(author=user)
+            obj = objects.first()
+            if obj is None:
+                return None, f'no {model._meta.label} row'
+            kwargs[parameter] = obj.pk
+        else:
+            return None, f'no value for <{parameter}>'
+    return reverse(name, kwargs=kwargs), None
+
+
+def request(client, path):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return response.status_code, counter.count
+
+
+def measure(client, path, repeat, login=None):
+    if login:
+        login()
+    status, queries = request(client, path)
+
+    timings = []
+    for _ in range(repeat):
+        if login:
+            login()
+        started = time.perf_counter()
+        _, warm_queries = request(client, path)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    if login:
+        login()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    current = tracemalloc.get_traced_memory()[0]
+    request(client, path)
+    peak = tracemalloc.get_traced_memory()[1] - current
+    if not tracing:
+        tracemalloc.stop()
+
+    return {
+        'path': path,
+        'status': status,
+        'queries': queries,
+        'warm_queries': warm_queries,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(report, baseline, latency_tolerance=0.25, latency_slack_ms=2.0, memory_tolerance=0.25):
+    regressions = []
+    for name, before in baseline.get('routes', {}).items():
+        after = report['routes'].get(name)
+        if after is None:
+            continue
+        if after['status'] != before['status']:
+            regressions.append(f"{name}: status {before['status']} -> {after['status']}")
+        for key in ('queries', 'warm_queries'):
+            if after[key] > before[key]:
+                regressions.append(f'{name}: {key} {before[key]} -> {after[key]}')
+        for key in ('p50_ms', 'p95_ms'):
+            if after[key] > before[key] * (1 + latency_tolerance) + latency_slack_ms:
+                regressions.append(f'{name}: {key} {before[key]} -> {after[key]}')
+        if after['peak_kb'] > before['peak_kb'] * (1 + memory_tolerance) + MEMORY_SLACK_KB:
+            regressions.append(f"{name}: peak_kb {before['peak_kb']} -> {after['peak_kb']}")
+    return regressions
+
+"""
+- This module measures the routes of the project for the `benchmark_urls` command.
+
+- `QueryCounter` counts the queries run while it is installed with `connection.execute_wrapper()`. The test
+client resets `connection.queries` at the start of every request, so the queries are counted as they run.
+
+- `discover_routes()` walks `dj_proj/urls.py` and every included URLconf and yields the full name (with its
+namespace), the route and the view of every named URL pattern.
+
+- `resolve_path(name, route, callback, user)` builds the path to request, or returns why a route is skipped:
+    - views without a `get` handler (the bulk endpoints) are skipped;
+    - `<pk>` is the first row of the view's `model` (or `queryset` model, or the model named in `PK_MODELS`)
+    written by `user`, so the edit and delete pages are the author's own;
+    - `<username>` is `user`'s;
+    - a route with any other parameter (allauth's e-mail confirmation keys) cannot be filled in and is skipped.
+
+- `request(client, path)` sends a `GET`, reads a streamed response to the end, so exports are timed and their
+queries counted in full, and returns the status and the number of queries. The test client closes the response
+itself, without the `request_finished` handler that would close the database connection, and with it the
+transaction of the generated data.
+
+- `measure(client, path, repeat, login=None)` requests a path once cold, `repeat` times timed and once under
+`tracemalloc`. It returns the status and query count of the cold request, the query count of a warm one (cached
+list pages run fewer), the p50 and p95 latency in milliseconds and the peak memory allocated by the request in KB.
+`login` is called before every request, so a route that logs the user out does not change the next one.
+
+- `compare(report, baseline, ...)` lists the regressions of a report against a baseline report: another status,
+more queries (cold or warm), a p50 or p95 latency more than `latency_tolerance` (a fraction) plus
+`latency_slack_ms` above the baseline, or a peak memory more than `memory_tolerance` plus `MEMORY_SLACK_KB` above
+it. Query counts are exact and do not depend on the machine; latency and memory baselines should be recorded on the
+machine that checks them. Routes that are only in one of the reports are not compared.
+"""
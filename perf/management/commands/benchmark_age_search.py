@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from perf.benchmark import percentile
+from tennis_app.ages import age_filter
+from tennis_app.models import Posts
+
+
+SEARCHES = [
+    ('30-40', 30, 40, {}),
+    ('30-40 level language', 30, 40, {'level': '3', 'language': '1'}),
+    ('from 60', 60, None, {}),
+    ('up to 20 level language', None, 20, {'level': '3', 'language': '1'}),
+]
+
+
+def birth_date_filter(start_age=None, end_age=None):
+    this_year = timezone.localdate().year
+    condition = {}
+    if start_age is not None:
+        condition['birth_date__lte'] = f"{this_year - start_age}-12-31"
+    if end_age is not None:
+        condition['birth_date__gte'] = f"{this_year - end_age - 1}-01-01"
+    return condition
+
+
+class Command(BaseCommand):
+    help = "Compare the tennis age search on birth_date strings with the search on the birth_year column."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs of every query.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        self.stdout.write(f"{Posts.objects.count()} posts")
+        self.stdout.write(f"{'search':<24} {'rows':>7} {'birth_date ms':>14} {'birth_year ms':>14} {'speedup':>8}")
+        for label, start_age, end_age, choices in SEARCHES:
+            posts = Posts.objects.filter(**choices)
+            old = posts.filter(**birth_date_filter(start_age, end_age))
+            new = posts.filter(age_filter(start_age, end_age))
+            rows = self.run(old)
+            if rows != self.run(new):
+                raise CommandError(f'The two queries of "{label}" return different posts.')
+            old_ms = self.measure(old, options['repeat'])
+            new_ms = self.measure(new, options['repeat'])
+            self.stdout.write(f"{label:<24} {len(rows):>7} {old_ms:>14.2f} {new_ms:>14.2f} {old_ms / new_ms:>7.1f}x")
+
+    def run(self, queryset):
+        return list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.run(queryset)
+            timings.append((time.perf_counter() - started) * 1000)
+        return percentile(timings, 50)
+
+"""
+- `benchmark_age_search` is a management command that times the age search of the tennis post list on the current
+posts (e.g. after `python manage.py seed`), `python manage.py benchmark_age_search --repeat 50`. Every search of
+`SEARCHES` is run two ways, with the same results:
+    - on `birth_date` compared with the date strings the post list used to build from the current year
+    (`birth_date_filter`);
+    - on the `birth_year` column with `tennis_app.ages.age_filter`, as the post list searches now.
+It prints the number of posts found and the median time of each query over `--repeat` runs. The ids of the posts
+found are fetched, as the post list fetches its rows, so the time of reading them counts too.
+"""
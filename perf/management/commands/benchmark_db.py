@@ -0,0 +1,87 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+MODES = {
+    'per-request': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 0},
+    'persistent': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 600},
+    'pool': {'ENGINE': 'dj_proj.postgresql_pool', 'CONN_MAX_AGE': 0},
+}
+
+
+class Command(BaseCommand):
+    help = "Compare the request latency of the database connection modes (per-request, persistent, pool)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Simulated requests per mode and thread.')
+        parser.add_argument('--queries', type=int, default=3, help='Queries run by every simulated request.')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent worker threads.')
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to compare.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'req/s':>8}")
+        for mode in options['modes']:
+            alias = f'benchmark_{mode}'
+            connections.settings[alias] = {**connections['default'].settings_dict, **MODES[mode]}
+            started = time.perf_counter()
+            try:
+                with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                    runs = [pool.submit(self.run, alias, options['requests'], options['queries'])
+                            for _ in range(options['threads'])]
+                    timings = [timing for run in runs for timing in run.result()]
+                elapsed = time.perf_counter() - started
+            finally:
+                self.close_pool(alias)
+                del connections.settings[alias]
+            p50, p95 = self.percentile(timings, 50), self.percentile(timings, 95)
+            self.stdout.write(f"{mode:<12} {p50:>8.2f} {p95:>8.2f} {statistics.mean(timings):>8.2f} "
+                              f"{len(timings) / elapsed:>8.0f}")
+
+    def run(self, alias, requests, queries):
+        connection = connections[alias]
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+            del connections[alias]
+        return timings
+
+    def close_pool(self, alias):
+        close_pools = getattr(connections[alias], 'close_pools', None)
+        if close_pools is not None:
+            close_pools()
+        del connections[alias]
+
+    def percentile(self, timings, percent):
+        timings = sorted(timings)
+        return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+"""
+- `benchmark_db` is a management command that measures what each `DB_CONN_MODE` costs per request, e.g.
+`python manage.py benchmark_db --requests 1000 --threads 4`. For every mode it replays the database side of a
+request the way Django handles it: the connection is checked at the start of the request
+(`close_if_unusable_or_obsolete()`, which runs the health check or closes an expired connection), `--queries`
+small queries are run, and the connection is released at the end. It prints the p50, p95 and mean latency per
+request and the throughput.
+
+- With `per-request` every request pays for the TCP connection, authentication and backend startup; with
+`persistent` and `pool` only the first one does. The difference grows with the network distance to the database
+and with TLS.
+
+- Every mode runs under its own temporary database alias. `run()` is the loop of one worker thread, with its own
+connection as in a Django worker. `close_pool()` closes
+the pool the `pool` mode created, so the benchmark leaves no connections behind.
+"""
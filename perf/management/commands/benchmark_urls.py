@@ -0,0 +1,144 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from listcache.cache import get_views, invalidate
+from perf.benchmark import compare, discover_routes, measure, resolve_path
+from perf.seed import seed
+
+
+VOLUMES = {'1k': 1000, '100k': 100000}
+EXCLUDED_PREFIXES = ['admin/']
+
+
+class Command(BaseCommand):
+    help = "Measure the query count, latency and memory of every named URL against generated data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--volume', choices=VOLUMES, default='1k', help='Users, posts and comments to generate.')
+        parser.add_argument('--users', type=int, help='Users to generate, instead of the volume.')
+        parser.add_argument('--posts', type=int, help='Posts per app to generate, instead of the volume.')
+        parser.add_argument('--comments', type=int, help='Comments to generate, instead of the volume.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per route.')
+        parser.add_argument('--routes', nargs='+', help='Only measure these URL names.')
+        parser.add_argument('--exclude', nargs='+', default=EXCLUDED_PREFIXES, help='URL prefixes to leave out.')
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--baseline', help='JSON report to compare with; fails on regressions.')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the report to --baseline instead.')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed latency growth, a fraction.')
+        parser.add_argument('--latency-slack-ms', type=float, default=2.0, help='Allowed latency growth, in ms.')
+        parser.add_argument('--memory-tolerance', type=float, default=0.25, help='Allowed memory growth, a fraction.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline.')
+        volume = VOLUMES[options['volume']]
+        counts = {name: volume if options[name] is None else options[name] for name in ('users', 'posts', 'comments')}
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                with transaction.atomic():
+                    report = self.run(counts, options)
+                    transaction.set_rollback(True)
+            finally:
+                self.invalidate_lists()
+
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, sort_keys=True))
+        if options['baseline']:
+            self.check_baseline(report, options)
+
+    def run(self, counts, options):
+        user = seed(**counts, seed=options['seed'])
+        self.invalidate_lists()
+        client = Client(raise_request_exception=False)
+        routes, skipped = {}, {}
+        for name, route, callback in discover_routes():
+            if name in routes or name in skipped or any(route.startswith(prefix) for prefix in options['exclude']):
+                continue
+            if options['routes'] and name not in options['routes']:
+                continue
+            path, reason = resolve_path(name, route, callback, user)
+            if path is None:
+                skipped[name] = reason
+                continue
+            routes[name] = measure(client, path, options['repeat'], login=lambda: client.force_login(user))
+        return {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                **counts,
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'routes': routes,
+            'skipped': skipped,
+        }
+
+    def invalidate_lists(self):
+        for label in {label for labels in get_views().values() for label in labels}:
+            invalidate(label)
+
+    def print_report(self, report):
+        self.stdout.write(f"{'route':<32} {'status':>6} {'queries':>7} {'warm':>5} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'peak KB':>8}")
+        for name, result in report['routes'].items():
+            self.stdout.write(f"{name:<32} {result['status']:>6} {result['queries']:>7} {result['warm_queries']:>5} "
+                              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['peak_kb']:>8.1f}")
+        for name, reason in report['skipped'].items():
+            self.stdout.write(f'{name:<32} skipped: {reason}')
+
+    def check_baseline(self, report, options):
+        baseline = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline.write_text(json.dumps(report, indent=2, sort_keys=True))
+            self.stdout.write(f'Baseline written to {baseline}.')
+            return
+        if not baseline.exists():
+            raise CommandError(f'No baseline at {baseline}; record one with --save-baseline.')
+        regressions = compare(
+            report,
+            json.loads(baseline.read_text()),
+            latency_tolerance=options['latency_tolerance'],
+            latency_slack_ms=options['latency_slack_ms'],
+            memory_tolerance=options['memory_tolerance'],
+        )
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions against {baseline}.')
+        self.stdout.write(f'No regressions against {baseline}.')
+
+"""
+- `benchmark_urls` is a management command that measures every named URL of the project, e.g.
+`python manage.py benchmark_urls --volume 100k --output report.json`. It generates `--volume` users, posts per app
+and comments (`1k` or `100k`, or any number with `--users`, `--posts` and `--comments`) with `perf.seed`, logs the
+test client in as the first generated user and requests every route with `GET` (see `perf/benchmark.py`). The data
+is written in a transaction that is rolled back at the end, so the command can run against a development database
+and leaves it as it was.
+
+- For every route it prints, and writes to `--output` as JSON, the status and query count of a cold request, the
+query count of a warm one, the p50 and p95 latency of `--repeat` requests and the peak memory of one request.
+Routes under the `--exclude` prefixes (Django's admin by default) are left out; routes that cannot be requested are
+listed as skipped with the reason. `--routes` restricts the run to some URL names.
+
+- `--baseline report.json --save-baseline` records a report as the baseline. A later run with `--baseline
+report.json` compares with it and exits with an error listing the regressions: another status, more queries, or a
+latency or memory above the tolerances. Compare runs with the same volume and seed.
+
+- `testserver`, the host of the test client, is allowed for the run. The cached list pages are invalidated after
+the data is generated and again after it is rolled back, so no page rendered from generated rows is served later.
+"""
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from perf.seed import DEFAULT_BATCH_SIZE, Seeder
+
+
+class Command(BaseCommand):
+    help = "Fill the database with generated users, posts, comments and messages of every app."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to generate.')
+        parser.add_argument('--posts', type=int, default=1000, help='Posts to generate in every app.')
+        parser.add_argument('--comments', type=int, default=5000, help='Parenting and tennis comments to generate.')
+        parser.add_argument('--messages', type=int, help='Tennis messages to generate; as many as comments by default.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows per INSERT where COPY is not available.')
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['posts'], options['comments'], options['messages'] or 0) < 0:
+            raise CommandError('Counts cannot be negative.')
+        seeder = Seeder(seed=options['seed'], batch_size=options['batch_size'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            seeder.run(options['users'], options['posts'], options['comments'], options['messages'])
+        elapsed = time.perf_counter() - started
+
+        for label, count in seeder.counts.items():
+            self.stdout.write(f'{label:<32} {count:>10}')
+        total = sum(seeder.counts.values())
+        self.stdout.write(f'{total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s).')
+
+"""
+- `seed` is a management command that fills the database with generated data for load tests, e.g.
+`python manage.py seed --users 100000 --posts 500000 --comments 2000000`. It writes the users (with Laika
+profiles and pets), the posts of every app, nested parenting comments, tennis comments and tennis messages with
+`perf.seed.Seeder`, which uses `COPY` on PostgreSQL and batched `bulk_create` elsewhere.
+
+- Everything is written in one transaction, so a failed run leaves nothing behind. The same `--seed` gives the
+same data; a different one adds another set of users and posts next to the first.
+
+- It prints the number of rows written per model and the overall rate. Generated users log in with the password
+`benchmark`.
+"""
@@ -0,0 +1,402 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections
+from django.utils import timezone
+
+from A_test_post_app.models import TestPost
+from get_app.models import Comment, Post
+from home.models import UserStats
+from home.stats import rebuild as rebuild_stats
+from laika.models import LaikaProfileUser, Pet, Post as LaikaPost
+from listcache.cache import get_views, invalidate
+from marketplace.geo import geocode
+from marketplace.models import MarketplaceItemPost
+from tennis_app.counters import rebuild as rebuild_counters
+from tennis_app.models import Comments as TennisComment, Messages, Posts as TennisPost
+
+
+PASSWORD = 'benchmark'
+DEFAULT_BATCH_SIZE = 5000
+REPLY_SHARE = 0.3
+REPLY_DEPTH = 3
+MAX_PETS = 2
+DAYS = 365
+POOL_SIZE = 512
+LOCATIONS = [
+    'Amsterdam', 'Athens', 'Barcelona', 'Berlin', 'Brussels', 'Dublin', 'Hamburg', 'Lisbon', 'London', 'Lyon',
+    'Madrid', 'Milan', 'Munich', 'Paris', 'Porto', 'Prague', 'Rome', 'Vienna', 'Warsaw', 'Zurich', 'Nowhere',
+]
+WORDS = (
+    'ball baby bike book bottle car chair club coach court dog doubles garden house jacket lamp lesson match '
+    'night park puppy racket school shoe sleep sofa table team toy train walk week cat bird rabbit kitten serve '
+    'volley pram cot stroller bargain vintage repair fresh quiet sunny weekend morning evening friendly'
+).split()
+SPECIES = ['Dog', 'Cat', 'Rabbit', 'Parrot', 'Hamster', 'Turtle']
+COPY_ROWS_PER_CHUNK = 1000
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+TEXT_TYPES = {'CharField', 'TextField', 'EmailField', 'SlugField', 'FileField', 'ImageField'}
+PLAIN_TYPES = {
+    'AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField',
+    'PositiveSmallIntegerField', 'ForeignKey', 'OneToOneField', 'FloatField', 'DecimalField', 'DateField',
+    'DateTimeField',
+}
+
+
+class RowStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = ''
+
+    def read(self, size=-1):
+        parts = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            length += len(chunk)
+        data = ''.join(parts)
+        if size < 0:
+            size = len(data)
+        data, self.buffer = data[:size], data[size:]
+        return data
+
+    readline = read
+
+
+def copy_encoder(field, connection):
+    internal_type = field.get_internal_type()
+    if internal_type in TEXT_TYPES:
+        encode = lambda value: str(value).translate(COPY_ESCAPES)
+    elif internal_type in PLAIN_TYPES:
+        encode = str
+    elif internal_type == 'BooleanField':
+        encode = lambda value: 't' if value else 'f'
+    else:
+        prepare = field.get_db_prep_save
+        encode = lambda value: str(prepare(value, connection)).translate(COPY_ESCAPES)
+    return lambda value: '\\N' if value is None else encode(value)
+
+
+class Seeder:
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE, using='default', days=DAYS):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.use_copy = self.connection.vendor == 'postgresql'
+        self.now = timezone.now()
+        self.span = days * 24 * 3600
+        self.counts = {}
+        self.titles = self.pool(3, 6)
+        self.texts = self.pool(15, 40)
+        self.comments = self.pool(5, 20)
+
+    def pool(self, shortest, longest):
+        return [
+            ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(shortest, longest))).capitalize()
+            for _ in range(POOL_SIZE)
+        ]
+
+    def moment(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.span))
+
+    def later(self, moment):
+        return min(moment + timedelta(seconds=self.rng.randrange(3 * 24 * 3600)), self.now)
+
+    def reserve_ids(self, model, count):
+        if not self.use_copy or not count:
+            return None
+        table = model._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                [self.connection.ops.quote_name(table), model._meta.pk.column, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def write(self, model, names, rows):
+        fields = [model._meta.get_field(name) for name in names]
+        provided = {field.attname for field in fields}
+        defaults = [
+            field for field in model._meta.concrete_fields
+            if field.attname not in provided and not field.primary_key and (field.has_default() or not field.null)
+        ]
+        fields += defaults
+        default_values = tuple(field.get_default() for field in defaults)
+        if self.use_copy:
+            count = self.copy(model, fields, (row + default_values for row in rows))
+        else:
+            count = self.bulk_create(model, fields, (row + default_values for row in rows))
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + count
+        return count
+
+    def copy(self, model, fields, rows):
+        connection = self.connection
+        encoders = [copy_encoder(field, connection) for field in fields]
+        written = 0
+
+        def chunks():
+            nonlocal written
+            lines = []
+            for row in rows:
+                lines.append('\t'.join([encode(value) for encode, value in zip(encoders, row)]))
+                if len(lines) == COPY_ROWS_PER_CHUNK:
+                    written += len(lines)
+                    yield '\n'.join(lines) + '\n'
+                    lines = []
+            if lines:
+                written += len(lines)
+                yield '\n'.join(lines) + '\n'
+
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN', RowStream(chunks()), size=1 << 16
+            )
+        return written
+
+    def bulk_create(self, model, fields, rows):
+        attnames = [field.attname for field in fields]
+        batch, written = [], 0
+        for row in rows:
+            batch.append(model(**dict(zip(attnames, row))))
+            if len(batch) == self.batch_size:
+                model._default_manager.using(self.using).bulk_create(batch)
+                written += len(batch)
+                batch = []
+        created = model._default_manager.using(self.using).bulk_create(batch)
+        return written + len(created)
+
+    def created_ids(self, model, ids, count):
+        if ids is not None:
+            return ids
+        return list(model._default_manager.using(self.using).order_by('-pk').values_list('pk', flat=True)[:count])[::-1]
+
+    def authors(self, users, count):
+        rng = self.rng
+        for index in range(count):
+            yield users[0] if index == 0 else rng.choice(users)
+
+    def users(self, count):
+        ids = self.reserve_ids(User, count)
+        password = make_password(PASSWORD)
+        rows = (
+            ((ids[index],) if ids else ()) + (
+                f'perf{self.seed}-{index}', f'perf{self.seed}-{index}@example.com', password, self.moment(),
+                True, False, False, '', '',
+            )
+            for index in range(count)
+        )
+        names = (['id'] if ids else []) + [
+            'username', 'email', 'password', 'date_joined', 'is_active', 'is_staff', 'is_superuser', 'first_name',
+            'last_name',
+        ]
+        self.write(User, names, rows)
+        users = self.created_ids(User, ids, count)
+        self.write(LaikaProfileUser, ['laika_user_id'], ((user,) for user in users))
+        return users
+
+    def pets(self, users):
+        rng = self.rng
+        rows = (
+            (user, f'Pet {index}', species, f'{species} mix', rng.choice(self.comments))
+            for user in users
+            for index, species in enumerate([rng.choice(SPECIES) for _ in range(rng.randint(0, MAX_PETS))])
+        )
+        self.write(Pet, ['owner_id', 'pet_name', 'species', 'species_type', 'description'], rows)
+
+    def parenting(self, users, posts, comments):
+        rng = self.rng
+        ids = self.reserve_ids(Post, posts)
+        created = [self.moment() for _ in range(posts)]
+        rows = (
+            ((ids[index],) if ids else ()) + (
+                author, rng.choice(self.titles), rng.choice(self.texts), created[index], self.later(created[index]),
+            )
+            for index, author in enumerate(self.authors(users, posts))
+        )
+        self.write(Post, (['id'] if ids else []) + ['author_id', 'title', 'description', 'created_at', 'updated_at'],
+                   rows)
+        post_ids = self.created_ids(Post, ids, posts)
+        if not post_ids:
+            return
+
+        replies = int(comments * REPLY_SHARE)
+        per_level = [comments - replies] + [replies // REPLY_DEPTH] * REPLY_DEPTH
+        per_level[1] += replies - sum(per_level[1:])
+        parents = None
+        for count in per_level:
+            if not count or parents == []:
+                break
+            ids = self.reserve_ids(Comment, count)
+            level = []
+            for index in range(count):
+                if parents is None:
+                    post = rng.randrange(len(post_ids))
+                    post_id, parent_id, moment = post_ids[post], None, self.later(created[post])
+                else:
+                    parent_id, post_id, parent_moment = rng.choice(parents)
+                    moment = self.later(parent_moment)
+                level.append((ids[index] if ids else None, post_id, parent_id, moment))
+            rows = (
+                ((comment_id,) if ids else ()) + (
+                    post_id, parent_id, rng.choice(users), rng.choice(self.comments), moment, moment,
+                )
+                for comment_id, post_id, parent_id, moment in level
+            )
+            names = (['id'] if ids else []) + [
+                'post_id', 'parent_comment_id', 'author_id', 'content', 'created_at', 'updated_at',
+            ]
+            self.write(Comment, names, rows)
+            level_ids = self.created_ids(Comment, ids, count)
+            parents = [(comment_id, post_id, moment)
+                       for comment_id, (_, post_id, _, moment) in zip(level_ids, level)]
+
+    def laika(self, users, posts):
+        rng = self.rng
+
+        def rows():
+            for author in self.authors(users, posts):
+                moment = self.moment()
+                yield author, rng.choice(self.titles), rng.choice(self.texts), moment.date(), self.later(moment).date()
+        self.write(LaikaPost, ['author_id', 'title', 'description', 'created_at', 'updated_at'], rows())
+
+    def marketplace(self, users, posts):
+        rng = self.rng
+        categories = [value for value, _ in MarketplaceItemPost.category_choices]
+        places = {location: geocode(location) or (None, None) for location in LOCATIONS}
+
+        def rows():
+            for index, author in enumerate(self.authors(users, posts)):
+                moment = self.moment()
+                location = rng.choice(LOCATIONS)
+                yield (
+                    author, moment, self.later(moment), rng.choice(self.titles), rng.choice(self.texts),
+                    f'{rng.randrange(1, 500000) / 100:.2f}', location, categories[index % len(categories)],
+                    *places[location],
+                )
+        names = [
+            'author_id', 'created_on', 'updated_on', 'title', 'description', 'price', 'location', 'category',
+            'latitude', 'longitude',
+        ]
+        self.write(MarketplaceItemPost, names, rows())
+
+    def tennis(self, users, posts, comments, messages):
+        rng = self.rng
+        genders = [value for value, _ in TennisPost.GENDER_CHOICES]
+        levels = [value for value, _ in TennisPost.LEVEL_CHOICES]
+        languages = [value for value, _ in TennisPost.LANGUAGE_CHOICES]
+        ranks = [value for value, _ in TennisComment.RANK_CHOICES]
+        ids = self.reserve_ids(TennisPost, posts)
+
+        def post_rows():
+            for index, author in enumerate(self.authors(users, posts)):
+                moment = self.moment()
+                birth = (self.now - timedelta(days=rng.randrange(16 * 365, 70 * 365))).date()
+                yield ((ids[index],) if ids else ()) + (
+                    author, rng.choice(genders), birth, birth.year, f'+351 9{rng.randrange(10 ** 7, 10 ** 8)}',
+                    rng.choice(self.texts), moment.date(), moment, moment + timedelta(days=rng.randrange(1, 30)),
+                    rng.choice(levels), rng.choice(languages), rng.choice(['singles', 'doubles', '']),
+                    rng.choice(self.titles)[:50] if rng.random() < 0.7 else None,
+                )
+        names = (['id'] if ids else []) + [
+            'author_id', 'user_gender', 'birth_date', 'birth_year', 'phone', 'description', 'current_date', 'updated_at',
+            'play_date', 'level', 'language', 'type', 'club_name',
+        ]
+        self.write(TennisPost, names, post_rows())
+        post_ids = self.created_ids(TennisPost, ids, posts)
+
+        comment_rows = (
+            (rng.choice(post_ids), rng.choice(users), rng.choice(self.comments), rng.choice(ranks))
+            for _ in range(comments if post_ids else 0)
+        )
+        self.write(TennisComment, ['post_id', 'author_id', 'text', 'rank'], comment_rows)
+        if post_ids:
+            rebuild_counters(
+                TennisPost.objects.using(self.using).filter(pk__gte=min(post_ids)),
+                TennisComment.objects.using(self.using),
+            )
+
+        def message_rows():
+            for _ in range(messages if len(users) > 1 else 0):
+                sender = rng.randrange(len(users))
+                recipient = (sender + 1 + rng.randrange(len(users) - 1)) % len(users)
+                yield users[sender], users[recipient], rng.choice(self.comments), self.moment()
+        self.write(Messages, ['sender_id', 'recipient_id', 'content', 'created_at'], message_rows())
+
+    def test_posts(self, users, posts):
+        rng = self.rng
+
+        def rows():
+            for author in self.authors(users, posts):
+                moment = self.moment()
+                yield author, rng.choice(self.titles), rng.choice(self.texts), moment, self.later(moment)
+        self.write(TestPost, ['author_id', 'title', 'description', 'created_at', 'updated_at'], rows())
+
+    def run(self, users=1000, posts=1000, comments=1000, messages=None):
+        users = self.users(max(users, 1))
+        self.pets(users)
+        self.parenting(users, posts, comments)
+        self.laika(users, posts)
+        self.marketplace(users, posts)
+        self.tennis(users, posts, comments, comments if messages is None else messages)
+        self.test_posts(users, posts)
+        rebuild_stats(User.objects.using(self.using).filter(pk__gte=min(users)), UserStats.objects.using(self.using))
+        for label in {label for labels in get_views().values() for label in labels}:
+            invalidate(label)
+        return User.objects.using(self.using).get(pk=users[0])
+
+
+def seed(users=1000, posts=1000, comments=1000, seed=0, batch_size=DEFAULT_BATCH_SIZE, messages=None):
+    return Seeder(seed=seed, batch_size=batch_size).run(users, posts, comments, messages)
+
+"""
+- This module fills the database with generated users, posts, comments and messages of every app, for load tests
+and benchmarks. It is used by the `seed` and `benchmark_urls` commands.
+
+- `Seeder` writes each table with PostgreSQL's `COPY ... FROM STDIN`, which loads rows several times faster than
+`INSERT`s. The rows are produced by generators and streamed to the database by `RowStream`, so memory stays flat
+however many rows are written; only the ids of the users and posts that later rows refer to are kept. On other
+databases the same rows are written with `bulk_create`, `batch_size` rows per statement, where `auto_now` fields
+take the current time.
+
+- `reserve_ids(model, count)` draws the ids of rows that other rows refer to from the table's sequence before they
+are written, so comments can name their post and replies their parent without reading the ids back. Drawing them
+from the sequence keeps them clear of rows written at the same time by anyone else.
+
+- `write(model, names, rows)` writes tuples of the named fields and fills every other non-null field with its
+model default.
+
+- `copy_encoder(field, connection)` returns the function that writes a value of the field in the `COPY` text
+format, chosen once per column: text is escaped, numbers, dates and ids are written as they are, and any other
+type goes through the field's `get_db_prep_save` as a save would. `copy` joins `COPY_ROWS_PER_CHUNK` encoded rows
+at a time, which `RowStream` hands to the driver as a file.
+
+- No model signals run. Search vectors are filled by their database triggers, marketplace coordinates are geocoded
+here, the comment counters of tennis posts and the home page counts of the new users are rebuilt, and the cached
+list pages are invalidated at the end.
+
+- `run(users, posts, comments, messages=None)` writes, in order:
+    - `users` users, sharing the password `PASSWORD`, each with a Laika profile and up to `MAX_PETS` pets;
+    - `posts` posts in each of the parenting, Laika, marketplace, tennis and test apps, the marketplace posts
+    cycling through every category;
+    - `comments` parenting comments, `REPLY_SHARE` of them replies nested up to `REPLY_DEPTH` levels, each in the
+    thread of its parent;
+    - `comments` tennis comments, then the comment counters of the tennis posts, and `messages` tennis messages
+    between two different users (as many as comments by default).
+
+- Texts come from pools of `POOL_SIZE` generated sentences and timestamps are spread over the last `DAYS` days,
+with updates, replies and play dates after what they follow. Everything is drawn from a `random.Random(seed)`, so
+the same arguments give the same rows on the same database; usernames include the seed, so several seeds can be
+loaded side by side.
+
+- The first user authors the first post of every app, so a benchmark logged in as that user can open the edit
+and delete pages of its posts. `run` and `seed` return that user.
+"""
@@ -0,0 +1,295 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connections, transaction
+from django.db.models import Sum
+from django.db.utils import load_backend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from A_test_post_app.models import TestPost
+from get_app.models import Comment, Post
+from home.models import UserStats
+from laika.models import LaikaProfileUser, Pet, Post as LaikaPost
+from marketplace.models import MarketplaceItemPost
+from listcache.cache import get_views, invalidate
+from perf.middleware import fingerprint
+from perf.seed import Seeder
+from tennis_app.models import Comments as TennisComment, Messages, Posts as TennisPost
+
+
+class PooledBackendTest(TestCase):
+    def setUp(self):
+        self.settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'dj_proj.postgresql_pool',
+            'CONN_MAX_AGE': 0,
+            'POOL': {'MIN_SIZE': 0, 'MAX_SIZE': 1, 'TIMEOUT': 0.1},
+        }
+        self.wrapper_class = load_backend(self.settings_dict['ENGINE']).DatabaseWrapper
+        self.alias = f'pool_{self._testMethodName}'
+        connections.settings[self.alias] = self.settings_dict
+
+    def tearDown(self):
+        connections[self.alias].close()
+        del connections[self.alias]
+        self.wrapper_class(dict(self.settings_dict), self.alias).close_pools()
+        del connections.settings[self.alias]
+    """
+    The `setUp` method registers a database alias that uses the pooled backend with a single connection and a
+    short timeout; `tearDown` closes the pool and removes the alias again.
+    """
+
+    def connect(self):
+        connection = connections[self.alias]
+        connection.ensure_connection()
+        return connection
+    """
+    The `connect` helper opens the connection of the pooled alias, like the start of a request does.
+    """
+
+    def test_connection_is_reused(self):
+        first = self.connect()
+        raw = first.connection
+        first.close()
+        pools = [pool for key, pool in self.wrapper_class.pools.items() if key[0] == self.alias]
+        self.assertEqual([pool.idle for pool in pools], [[raw]])
+        second = self.connect()
+        self.assertIs(second.connection, raw)
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        second.close()
+    """
+    - The `test_connection_is_reused` method tests that closing a connection hands it back to the pool and the next
+    request gets the same open connection instead of connecting again.
+    """
+
+    def test_open_transaction_is_rolled_back(self):
+        first = self.connect()
+        first.set_autocommit(False)
+        with first.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE pool_probe (id int)')
+        first.close()
+
+        second = self.connect()
+        with second.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pool_probe')")
+            self.assertIsNone(cursor.fetchone()[0])
+        second.close()
+    """
+    - The `test_open_transaction_is_rolled_back` method tests that a transaction left open by one request is rolled
+    back before its connection is used again.
+    """
+
+    def test_exhausted_pool_times_out(self):
+        first = self.connect()
+        other_thread = self.wrapper_class(dict(self.settings_dict), self.alias)
+        with self.assertRaisesMessage(OperationalError, 'No database connection became free'):
+            other_thread.ensure_connection()
+        first.close()
+        other_thread.ensure_connection()
+        other_thread.close()
+    """
+    - The `test_exhausted_pool_times_out` method tests that a second connection, as another thread would open, waits
+    at most `TIMEOUT` seconds when every connection is in use, then fails with the `OperationalError` of a failed
+    connection, and that the connection can be taken again once it was returned.
+    """
+
+
+class BenchmarkDbCommandTest(TestCase):
+    def test_command_reports_every_mode(self):
+        out = StringIO()
+        call_command('benchmark_db', requests=5, threads=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines[1:]], ['per-request', 'persistent', 'pool'])
+        self.assertNotIn('benchmark_pool', connections.settings)
+    """
+    - The `test_command_reports_every_mode` method tests that `benchmark_db` prints one line of timings per
+    connection mode and removes its temporary database aliases afterwards.
+    """
+
+
+class BenchmarkUrlsCommandTest(TestCase):
+    routes = ['post-list', 'post-detail', 'marketplace_my_posts', 'parenting-bulk-api']
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.report = Path(self.directory.name) / 'report.json'
+        self.baseline = Path(self.directory.name) / 'baseline.json'
+
+    def benchmark(self, **options):
+        call_command(
+            'benchmark_urls', users=3, posts=5, comments=10, repeat=2, routes=self.routes, stdout=StringIO(),
+            stderr=StringIO(), **options
+        )
+    """
+    The `benchmark` helper runs `benchmark_urls` on a few routes with a handful of generated rows.
+    """
+
+    def test_report_lists_every_route_and_rolls_the_data_back(self):
+        self.benchmark(output=str(self.report))
+        report = json.loads(self.report.read_text())
+        self.assertEqual(set(report['routes']), {'post-list', 'post-detail', 'marketplace_my_posts'})
+        self.assertEqual(report['skipped'], {'parenting-bulk-api': 'no GET handler'})
+        detail = report['routes']['post-detail']
+        self.assertEqual(detail['status'], 200)
+        self.assertGreater(detail['queries'], 0)
+        self.assertLessEqual(detail['p50_ms'], detail['p95_ms'])
+        self.assertEqual(report['meta']['posts'], 5)
+        self.assertFalse(User.objects.exists())
+    """
+    - The `test_report_lists_every_route_and_rolls_the_data_back` method tests that the JSON report has the
+    status, query count and timings of every requested route, lists the bulk endpoint as skipped, and that the
+    generated rows are gone afterwards.
+    """
+
+    def test_more_queries_than_the_baseline_fail(self):
+        self.benchmark(baseline=str(self.baseline), save_baseline=True)
+        self.benchmark(baseline=str(self.baseline), latency_slack_ms=10000)
+
+        baseline = json.loads(self.baseline.read_text())
+        baseline['routes']['post-detail']['queries'] -= 1
+        self.baseline.write_text(json.dumps(baseline))
+        with self.assertRaisesMessage(CommandError, '1 regressions'):
+            self.benchmark(baseline=str(self.baseline), latency_slack_ms=10000)
+    """
+    - The `test_more_queries_than_the_baseline_fail` method tests that a run passes against the baseline it recorded
+    and fails once the baseline has one query fewer for a route.
+    """
+
+
+class SeedCommandTest(TestCase):
+    def test_every_table_is_filled(self):
+        out = StringIO()
+        call_command('seed', users=5, posts=16, comments=40, messages=7, stdout=out)
+        self.assertIn('rows in', out.getvalue())
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(LaikaProfileUser.objects.count(), 5)
+        self.assertTrue(Pet.objects.exists())
+        for model in (Post, LaikaPost, MarketplaceItemPost, TennisPost, TestPost):
+            self.assertEqual(model.objects.count(), 16)
+            self.assertEqual(model.objects.order_by('pk').first().author.username, 'perf0-0')
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertEqual(TennisComment.objects.count(), 40)
+        self.assertEqual(TennisPost.objects.aggregate(Sum('comment_count'))['comment_count__sum'], 40)
+        self.assertEqual(UserStats.objects.aggregate(Sum('laika_posts'), Sum('tennis_comments')),
+                         {'laika_posts__sum': 16, 'tennis_comments__sum': 40})
+        self.assertEqual(Messages.objects.count(), 7)
+        self.assertEqual(
+            set(MarketplaceItemPost.objects.values_list('category', flat=True)),
+            {value for value, _ in MarketplaceItemPost.category_choices},
+        )
+        self.assertFalse(Post.objects.filter(search_vector=None).exists())
+        self.assertTrue(User.objects.first().check_password('benchmark'))
+    """
+    - The `test_every_table_is_filled` method tests that `seed` writes the requested users (with Laika profiles),
+    posts in every app authored first by the first user, comments and messages, that the comment counters and the
+    home page counts of the users are rebuilt, that marketplace posts cover every category, that the database
+    triggers filled the search vectors and that users can log in.
+    """
+
+    def test_replies_are_nested_in_the_thread_of_their_parent(self):
+        Seeder().run(users=3, posts=4, comments=100)
+        replies = Comment.objects.exclude(parent_comment=None).select_related('parent_comment')
+        self.assertEqual(replies.count(), 30)
+        for reply in replies:
+            self.assertEqual(reply.post_id, reply.parent_comment.post_id)
+            self.assertGreaterEqual(reply.created_at, reply.parent_comment.created_at)
+        self.assertTrue(replies.exclude(parent_comment__parent_comment=None).exists())
+    """
+    - The `test_replies_are_nested_in_the_thread_of_their_parent` method tests that `REPLY_SHARE` of the comments are
+    replies, more than one level deep, each on the post of its parent and written after it.
+    """
+
+    def test_same_seed_gives_the_same_rows(self):
+        def generate():
+            with transaction.atomic():
+                Seeder(seed=7).run(users=3, posts=5, comments=10)
+                rows = list(MarketplaceItemPost.objects.order_by('pk').values_list('title', 'price', 'location'))
+                transaction.set_rollback(True)
+            return rows
+
+        self.assertEqual(generate(), generate())
+    """
+    - The `test_same_seed_gives_the_same_rows` method tests that two runs with the same seed write the same data.
+    """
+
+    def test_bulk_create_fallback(self):
+        seeder = Seeder()
+        seeder.use_copy = False
+        seeder.run(users=3, posts=4, comments=10)
+        self.assertEqual(seeder.counts['get_app.Comment'], 10)
+        self.assertEqual(Comment.objects.exclude(parent_comment=None).count(), 3)
+        self.assertEqual(TennisPost.objects.count(), 4)
+    """
+    - The `test_bulk_create_fallback` method tests that the rows are written with `bulk_create` when `COPY` is not
+    available, and that replies still find the ids of their parents.
+    """
+
+
+@override_settings(PERF_PROFILING=True, PERF_PROFILE_SAMPLE_RATE=1, PERF_SLOW_REQUEST_MS=0)
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        for index in range(3):
+            author = User.objects.create_user(username=f'author{index}', password='password')
+            Post.objects.create(author=author, title=f'Post {index}', description='Text')
+        self.client.force_login(author)
+        for label in {label for labels in get_views().values() for label in labels}:
+            invalidate(label)
+
+    def test_profiled_request(self):
+        with self.assertLogs('perf.slow') as logs:
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries, \d+ duplicated", '
+                                                    r'tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'post-list')
+        self.assertEqual(record['status'], 200)
+        self.assertTrue(record['sampled'])
+        self.assertGreater(record['queries'], 3)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertTrue(any(
+            duplicate['count'] >= 3 and duplicate['sql'].endswith('FROM "auth_user" WHERE "auth_user"."id" = %s LIMIT ?')
+            for duplicate in record['duplicates']
+        ))
+    """
+    - The `test_profiled_request` method tests that a sampled request gets a `Server-Timing` header with the
+    database, template and total time, and is logged as JSON with its query count, template time and the `post.author`
+    query the post list runs once per post.
+    """
+
+    @override_settings(PERF_PROFILE_SAMPLE_RATE=0, PERF_SLOW_REQUEST_MS=60000)
+    def test_unsampled_fast_request(self):
+        with self.assertNoLogs('perf.slow'):
+            response = self.client.get(reverse('post-list'))
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+$')
+    """
+    - The `test_unsampled_fast_request` method tests that a request that is not sampled is only timed, and is not
+    logged when it is faster than `PERF_SLOW_REQUEST_MS`.
+    """
+
+    @override_settings(PERF_PROFILING=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertNotIn('Server-Timing', response)
+    """
+    - The `test_disabled` method tests that the middleware is left out when `PERF_PROFILING` is off.
+    """
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'it''s'\n AND n = 42"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? AND n = ?',
+        )
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id = 1'), fingerprint('SELECT * FROM t WHERE id = 2'))
+    """
+    - The `test_fingerprint` method tests that literals and `IN` lists are left out of fingerprints, so repeated
+    queries with other values share one.
+    """
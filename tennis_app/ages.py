@@ -0,0 +1,59 @@
+from django.db.models import Q
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from tennis_app.models import Posts
+
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def birth_year(birth_date):
+    return Posts._meta.get_field('birth_date').to_python(birth_date).year
+
+
+def set_birth_year(post):
+    year = birth_year(post.birth_date)
+    changed = post.birth_year != year
+    post.birth_year = year
+    return changed
+
+
+def age_filter(start_age=None, end_age=None, today=None):
+    this_year = (today or timezone.localdate()).year
+    condition = Q()
+    if start_age is not None:
+        condition &= Q(birth_year__lte=this_year - start_age)
+    if end_age is not None:
+        condition &= Q(birth_year__gte=this_year - end_age - 1)
+    return condition
+
+
+def rebuild(posts, batch_size=DEFAULT_BATCH_SIZE):
+    stale = posts.exclude(birth_year=ExtractYear('birth_date')).order_by().values_list('pk', flat=True)
+    updated = 0
+    while True:
+        ids = list(stale[:batch_size])
+        if not ids:
+            return updated
+        updated += posts.model._base_manager.using(posts.db).filter(pk__in=ids).update(
+            birth_year=ExtractYear('birth_date'),
+        )
+
+"""
+- This module keeps the `birth_year` column of tennis posts, which the age search of the post list compares instead
+of the birth date.
+
+- `set_birth_year(post)` sets the `birth_year` of a post from its `birth_date` and tells whether it changed. It is
+called by the `pre_save` receiver in `signals.py` and by the bulk API, which writes posts without `save()`.
+`birth_year(birth_date)` accepts what the field accepts: a date, a datetime or an ISO string.
+
+- `age_filter(start_age, end_age, today)` is the condition of an age range, either end optional. A player of age
+`a` this year was born `a` or `a + 1` years ago, so the range keeps the birth years from `end_age + 1` to
+`start_age` years before the current year. It compares the column with two constants, so it is answered by the
+`birth_year` indexes, and no date is built or cast.
+
+- `rebuild(posts, batch_size)` sets the `birth_year` of the posts of a queryset whose birth date was written
+without the model (`QuerySet.update()`, raw SQL), `batch_size` posts per `UPDATE`, and returns how many were fixed.
+The migration that adds the column fills it in with the same update on its historical model.
+"""
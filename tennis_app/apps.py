@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TennisAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tennis_app'
+
+    def ready(self):
+        from . import signals
+        signals.connect_messages()
+        signals.connect_comment_counters()
+        signals.connect_birth_year()
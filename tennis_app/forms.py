@@ -2,6 +2,7 @@ from django import forms
 from .models import Posts
 from dj_proj import settings
 from .models import Comments
+from .models import Messages
 
 """
 1. `from django import forms`:
@@ -261,18 +262,19 @@ template to display the form and handle form submission.
 
 
 class SearchForm(forms.Form):
-    start_age = forms.IntegerField(required=False)
-    end_age = forms.IntegerField(required=False)
+    start_age = forms.IntegerField(min_value=0, required=False)
+    end_age = forms.IntegerField(min_value=0, required=False)
     start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}), required=False)
     end_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}), required=False)
     location = forms.CharField(max_length=50, required=False)
     level = forms.ChoiceField(choices=[('A','Any')] + Posts.LEVEL_CHOICES, required=False)
     language = forms.ChoiceField(choices=[('A','Any')] + Posts.LANGUAGE_CHOICES, required=False)
     gender = forms.ChoiceField(choices=[('A','Any')] + Posts.GENDER_CHOICES, required=False)
+    sort = forms.ChoiceField(choices=[('', 'Any order'), ('rating', 'Best rated')], required=False)
 
 """
  `start_age` and `end_age` are integer fields that represent the minimum and maximum age values for searching 
- posts. They are not required fields (`required=False`).
+ posts. They are not required fields (`required=False`); either can be given alone for an open range.
 - `start_date` and `end_date` are date fields that represent the start and end dates for searching posts. They are 
 rendered as date input widgets (`widget=forms.DateInput(attrs={'type': 'date'})`) and are not required 
 (`required=False`).
@@ -282,7 +284,39 @@ characters and is not required (`required=False`).
 searching posts. They are rendered as select input widgets. The choices for these fields are specified using the 
 `choices` parameter, which is set to the corresponding choices defined in the `Posts` model. These fields are not 
 required (`required=False`).
+- `sort` orders the results; "Best rated" lists the posts with the highest average rank first, posts without 
+ranked comments last.
 
  `request.GET` is used to bind the form to the query parameters in the URL. You can then use this form instance in 
  your view or template to display the form and handle the search criteria.
 """
+
+
+class MessageForm(forms.ModelForm):
+    class Meta:
+        model = Messages
+        fields = ['content']
+        widgets = {
+            'content': forms.Textarea(attrs={'rows': 2, 'placeholder': 'Write a message'}),
+        }
+        labels = {
+            'content': '',
+        }
+
+"""
+- `MessageForm` is the form of the conversation page. It only takes the text of the message; the view sets the 
+sender and the recipient.
+"""
+
+
+class MatchForm(forms.Form):
+    level = forms.ChoiceField(choices=Posts.LEVEL_CHOICES)
+    language = forms.ChoiceField(choices=Posts.LANGUAGE_CHOICES)
+    birth_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    play_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    club_name = forms.CharField(max_length=50, required=False)
+
+"""
+- `MatchForm` describes the player a partner is searched for: their level, language and birth date, the day they 
+want to play and, optionally, their club. Posts are ranked by how close they come (see `matching.py`).
+"""
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tennis_app.counters import DEFAULT_BATCH_SIZE, rebuild
+from tennis_app.models import Comments, Posts
+
+
+class Command(BaseCommand):
+    help = "Recompute the comment count and rank totals of tennis posts from their comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Posts updated per statement.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        updated = rebuild(Posts.objects.all(), Comments.objects.all(), options['batch_size'])
+        self.stdout.write(f"Rebuilt the counters of {updated} posts.")
+
+"""
+- `rebuild_post_counters` is a management command that recomputes `comment_count`, `rank_sum` and `rank_count` of
+every tennis post from its comments, e.g. `python manage.py rebuild_post_counters`. The counters are kept up to date
+as comments are written, so it is only needed after comments were written without the model (fixtures, raw SQL,
+`QuerySet.update()`). Each batch of `--batch-size` posts is one `UPDATE` with the counts computed by the database,
+in its own transaction.
+"""
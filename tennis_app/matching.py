@@ -0,0 +1,112 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Func, Value, When
+from django.db.models.functions import Abs, Cast, Greatest
+from django.utils import timezone
+
+from tennis_app.models import Posts
+
+
+DEFAULT_WEIGHTS = {'level': 3, 'language': 2, 'age': 1, 'play_date': 2, 'club': 1}
+DEFAULT_RESULTS = 20
+LEVEL_SPAN = 4
+AGE_SPAN = timedelta(days=20 * 365.25)
+PLAY_DATE_SPAN = timedelta(days=14)
+
+
+class EpochSeconds(Func):
+    template = "date_part('epoch', %(expressions)s)"
+    output_field = FloatField()
+
+
+def number(value):
+    return Cast(Value(float(value)), FloatField())
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'TENNIS_MATCH_WEIGHTS', {})}
+
+
+def day_moment(value):
+    if isinstance(value, datetime):
+        return value
+    return timezone.make_aware(datetime.combine(value, time(12)))
+
+
+def proximity(field, moment, span):
+    distance = Abs(EpochSeconds(field) - number(moment.timestamp()))
+    return Greatest(number(0), number(1) - distance / number(span.total_seconds()))
+
+
+def equal(field, value):
+    return Case(When(**{field: value}, then=number(1)), default=number(0), output_field=FloatField())
+
+
+def match_score(level, language, birth_date, play_date, club_name=None, weights=None):
+    weights = weights or get_weights()
+    parts = {
+        'level': number(1) - Abs(Cast('level', FloatField()) - number(level)) / number(LEVEL_SPAN),
+        'language': equal('language', language),
+        'age': proximity('birth_date', datetime.combine(birth_date, time(), tzinfo=dt_timezone.utc), AGE_SPAN),
+        'play_date': proximity('play_date', day_moment(play_date), PLAY_DATE_SPAN),
+    }
+    if club_name:
+        parts['club'] = equal('club_name__iexact', club_name)
+    score = number(0)
+    for name, part in parts.items():
+        if weights.get(name):
+            score = score + number(weights[name]) * part
+    return score
+
+
+def find_partners(user, level, language, birth_date, play_date, club_name=None, limit=None):
+    limit = limit or getattr(settings, 'TENNIS_MATCH_RESULTS', DEFAULT_RESULTS)
+    play_date = day_moment(play_date)
+    return (
+        Posts.objects.exclude(author=user)
+        .filter(play_date__range=(play_date - PLAY_DATE_SPAN, play_date + PLAY_DATE_SPAN))
+        .annotate(score=match_score(level, language, birth_date, play_date, club_name))
+        .order_by(F('score').desc(), '-id')
+        .prefetch_related('author')[:limit]
+    )
+
+
+def preferences(user):
+    post = Posts.objects.filter(author=user).order_by('-current_date', '-id').first()
+    if post is None:
+        return {'play_date': timezone.localdate()}
+    return {
+        'level': post.level,
+        'language': post.language,
+        'birth_date': post.birth_date,
+        'play_date': max(timezone.localdate(), timezone.localdate(post.play_date)),
+        'club_name': post.club_name,
+    }
+
+"""
+- This module ranks tennis posts as partners for a player, instead of filtering them like the search page.
+
+- `match_score(level, language, birth_date, play_date, club_name, weights)` is the score of a post as an SQL
+expression, a weighted sum of parts between 0 and 1:
+    - `level`: 1 for the same level, 0 for levels `LEVEL_SPAN` apart;
+    - `language`: 1 for the same language;
+    - `age`: 1 for the same birth date, down to 0 for birth dates `AGE_SPAN` (20 years) apart;
+    - `play_date`: 1 for the same play date, down to 0 for play dates `PLAY_DATE_SPAN` (two weeks) apart;
+    - `club`: 1 for the same club name, ignoring case; only counted when a club is given.
+The weights are `DEFAULT_WEIGHTS` updated with `TENNIS_MATCH_WEIGHTS`; a part with no weight is left out. All the
+arithmetic is in double precision: dates are turned into seconds with `date_part` and constants are cast, since
+PostgreSQL computes `EXTRACT()` and decimal literals as `numeric`, several times slower over many rows.
+
+- `find_partners(user, ...)` returns the `limit` (`TENNIS_MATCH_RESULTS`) best scored posts not written by
+`user`, best first, annotated with their `score`. A wanted play date without a time means noon of that day in
+the current time zone. The candidates are the posts whose play date is within
+`PLAY_DATE_SPAN` of the wanted one, found with the `play_date` index: a partner for another day is no partner, and
+scoring only the candidates keeps the query short however many posts there are. The database scores them and
+keeps the best with a top-N sort, so only `limit` rows are sent to Python, and the ranking always reflects the
+current posts, with no snapshot to refresh. The authors of the results are read by a second query, since joining
+the users before the sort would join every candidate.
+
+- `preferences(user)` is the starting point of the match form: the level, language, birth date and club of the
+user's latest post, and its play date unless it is over.
+"""
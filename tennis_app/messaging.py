@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Q, When, Window
+from django.db.models.functions import RowNumber
+from django.utils.module_loading import import_string
+
+from tennis_app.models import Messages
+
+
+DEFAULT_LAYER = 'tennis_app.messaging.InProcessChannelLayer'
+CONVERSATION_LENGTH = 50
+POLL_LIMIT = 100
+
+
+def resolve(future, message):
+    if not future.done():
+        future.set_result(message)
+
+
+class InProcessChannelLayer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.groups = defaultdict(set)
+
+    @asynccontextmanager
+    async def listen(self, group):
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self.lock:
+            self.groups[group].add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self.lock:
+                waiters = self.groups.get(group)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self.groups[group]
+
+    def group_send(self, group, message):
+        with self.lock:
+            waiters = self.groups.pop(group, set())
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(resolve, future, message)
+            except RuntimeError:
+                pass
+
+
+@lru_cache(maxsize=None)
+def get_layer():
+    return import_string(getattr(settings, 'TENNIS_MESSAGE_LAYER', DEFAULT_LAYER))()
+
+
+def group_name(user_id):
+    return f'tennis.messages.{user_id}'
+
+
+def publish(message):
+    notification = {'id': message.pk, 'sender': message.sender_id, 'recipient': message.recipient_id}
+    layer = get_layer()
+    for user_id in {message.sender_id, message.recipient_id}:
+        layer.group_send(group_name(user_id), notification)
+
+
+def involving(user):
+    return Messages.objects.filter(Q(sender=user) | Q(recipient=user))
+
+
+def inbox(user):
+    other = Case(When(sender=user, then=F('recipient')), default=F('sender'), output_field=IntegerField())
+    position = Window(RowNumber(), partition_by=[F('other')], order_by=[F('created_at').desc(), F('id').desc()])
+    return (
+        involving(user)
+        .annotate(other=other, position=position)
+        .filter(position=1)
+        .select_related('sender', 'recipient')
+        .order_by('-created_at', '-id')
+    )
+
+
+def conversation(user, other, limit=CONVERSATION_LENGTH):
+    thread = Messages.objects.filter(Q(sender=user, recipient=other) | Q(sender=other, recipient=user))
+    return list(thread.select_related('sender').order_by('-created_at', '-id')[:limit])[::-1]
+
+
+def as_dict(message):
+    return {
+        'id': message.pk,
+        'sender': message.sender.username,
+        'recipient': message.recipient.username,
+        'content': message.content,
+        'created_at': message.created_at.isoformat(),
+    }
+
+
+def latest_id(user):
+    return involving(user).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def messages_after(user, after, limit=POLL_LIMIT):
+    messages = involving(user).filter(id__gt=after).select_related('sender', 'recipient').order_by('id')[:limit]
+    return [as_dict(message) for message in messages]
+
+"""
+- This module holds the direct messages of tennis players: the queries of the inbox and of a conversation, and the
+delivery of new messages to open conversation pages without polling the table.
+
+- `inbox(user)` lists the latest message of every conversation of `user`, newest conversation first, in one query:
+`ROW_NUMBER()` numbers the messages `user` sent or received per other user, newest first, and the first of each is
+kept. The messages are read through the two indexes of `Messages`. Each message is annotated with `other`, the id
+of the other user, and comes with its sender and recipient.
+
+- `conversation(user, other, limit)` returns the last `limit` messages between two users, oldest first.
+
+- `messages_after(user, after, limit)` returns, as dicts, the first `limit` messages sent or received by `user`
+with an id greater than `after`, oldest first. `latest_id(user)` is the id of the newest one, the cursor a client
+starts from.
+
+- A channel layer wakes up the requests waiting for a user's messages. It is the class named by
+`TENNIS_MESSAGE_LAYER`, one instance per process (`get_layer()`):
+    - `listen(group)` is an async context manager that yields a future, resolved with the first message sent to the
+    group while the block runs.
+    - `group_send(group, message)` resolves the futures of a group. It can be called from any thread; the futures
+    are resolved in their own event loop.
+`InProcessChannelLayer` keeps the waiters in memory, so it only reaches requests served by the same process. A
+deployment with several processes needs a layer with the same two methods backed by a shared broker.
+
+- `publish(message)` sends the id of a new message to the groups of its sender and recipient
+(`group_name(user_id)`), so every open page of both users fetches it. It is called by `tennis_app/signals.py` once
+the message is committed.
+"""
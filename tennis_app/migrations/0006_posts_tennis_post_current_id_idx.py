@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0005_alter_posts_language_alter_posts_level'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['current_date', 'id'], name='tennis_post_current_id_idx'),
+        ),
+    ]
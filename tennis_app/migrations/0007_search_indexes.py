@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+from dj_proj.trigram import AddTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0006_posts_tennis_post_current_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['level', 'language', 'user_gender', 'play_date'], name='tennis_post_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['birth_date'], name='tennis_post_birth_date_idx'),
+        ),
+        AddTrigramIndex(
+            model_name='posts',
+            field_name='club_name',
+            name='tennis_post_club_trgm_idx',
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def delete_orphaned_messages(apps, schema_editor):
+    Messages = apps.get_model('tennis_app', 'Messages')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    alias = schema_editor.connection.alias
+    users = User.objects.using(alias).values('pk')
+    Messages.objects.using(alias).exclude(sender__in=users, recipient__in=users).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tennis_app', '0007_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphaned_messages, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='messages',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='messages',
+            name='recipient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='received_messages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='messages',
+            name='sender',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='sent_messages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='messages',
+            index=models.Index(fields=['sender', 'recipient', 'created_at'], name='tennis_message_pair_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messages',
+            index=models.Index(fields=['recipient', 'created_at'], name='tennis_message_recipient_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+
+
+def count_existing_comments(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Posts = apps.get_model('tennis_app', 'Posts')
+    Comments = apps.get_model('tennis_app', 'Comments')
+    comments = Comments.objects.using(alias).filter(post=OuterRef('pk')).order_by().values('post')
+    rated = Q(rank__gt='')
+
+    def per_post(aggregate):
+        values = comments.annotate(value=aggregate).values('value')
+        return Coalesce(Subquery(values, output_field=IntegerField()), 0)
+
+    Posts.objects.using(alias).update(
+        comment_count=per_post(Count('pk')),
+        rank_sum=per_post(Sum(Cast('rank', IntegerField()), filter=rated)),
+        rank_count=per_post(Count('pk', filter=rated)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0008_messages_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posts',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='rank_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='rank_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0009_post_comment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['play_date'], name='tennis_post_play_date_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+
+
+def fill_birth_years(apps, schema_editor):
+    Posts = apps.get_model('tennis_app', 'Posts')
+    Posts.objects.using(schema_editor.connection.alias).update(birth_year=ExtractYear('birth_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0010_post_play_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posts',
+            name='birth_year',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_birth_years, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['level', 'language', 'birth_year'], name='tennis_post_age_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['birth_year'], name='tennis_post_birth_year_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='posts',
+            name='tennis_post_birth_date_idx',
+        ),
+    ]
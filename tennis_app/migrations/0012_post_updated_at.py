@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis_app', '0011_post_birth_year'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posts',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -2,7 +2,6 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
-from PIL import Image
 
 class Posts(models.Model):
 
@@ -15,10 +14,12 @@ class Posts(models.Model):
     
     user_gender = models.CharField(max_length=10, choices=GENDER_CHOICES,null=True)
     birth_date = models.DateField(default=timezone.now)
+    birth_year = models.PositiveSmallIntegerField(editable=False)
    
     phone = models.CharField(max_length= 50)
     description = models.TextField(max_length=500)
     current_date = models.DateField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     play_date = models.DateTimeField(default=timezone.now)
     image = models.ImageField(default='tennis_app/static/image/default.jpg', upload_to='tennis_app/static/image')
     LEVEL_CHOICES = [
@@ -40,20 +41,26 @@ class Posts(models.Model):
     type = models.CharField(max_length= 100, blank=True)
     club_name = models.CharField(max_length=50, null=True, blank=True)
     author = models.ForeignKey(User,on_delete= models.CASCADE, null=True, blank=True)    
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    rank_sum = models.PositiveIntegerField(default=0, editable=False)
+    rank_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['current_date', 'id'], name='tennis_post_current_id_idx'),
+            models.Index(fields=['level', 'language', 'user_gender', 'play_date'], name='tennis_post_search_idx'),
+            models.Index(fields=['level', 'language', 'birth_year'], name='tennis_post_age_search_idx'),
+            models.Index(fields=['birth_year'], name='tennis_post_birth_year_idx'),
+            models.Index(fields=['play_date'], name='tennis_post_play_date_idx'),
+        ]
 
     def __str__(self):
             return f'{self.user_name} Post'
 
-    def save(self,*args, **kwargs):
-            super().save(*args, **kwargs)
-
+    @property
+    def average_rank(self):
+        return self.rank_sum / self.rank_count if self.rank_count else None
 
-            img = Image.open(self.image.path)
-
-            if img.height > 300 or img.width > 300:
-                output_size = (300, 300)
-                img.thumbnail(output_size)
-                img.save(self.image.path) 
 
 """
 - "user_name": A character field with a maximum length of 50 characters, representing the user's name.
@@ -62,10 +69,14 @@ class Posts(models.Model):
 - "user_gender": A character field with a maximum length of 10 characters, representing the user's gender. It has 
 predefined choices defined in the "GENDER_CHOICES" list.
 - "birth_date": A DateTimeField with a default value set to the current time, representing the user's birth date.
+- "birth_year": The year of "birth_date", set whenever a post is saved (see `ages.py`). The age search of the post 
+list compares it instead of the birth date, so it can share an index with the level and language.
 - "phone": A character field with a maximum length of 50 characters, representing the user's phone number.
 - "description": A TextField with a maximum length of 500 characters, representing a description provided by the 
 user.
 - "current_date": A DateField with a default value set to the current date, representing the current date.
+- "updated_at": A DateTimeField that automatically stores the time the post was last saved. Exports of changed
+posts filter on it and the detail endpoint of the API validates its `ETag` with it.
 - "play_date": A DateTimeField with a default value set to the current time, representing a play date.
 - "image": An ImageField with a default image path and an upload path, representing an image associated with the 
 post.
@@ -79,12 +90,23 @@ optional and can be left blank.
 optional and can be left blank.
 - "author": A foreign key field referencing the "User" model, indicating the author of the post. It allows null 
 values and blank values.
+- "comment_count", "rank_sum" and "rank_count": The number of comments on the post, the sum of their ranks and the 
+number of comments with a rank. They are kept up to date when comments are written (see `counters.py`), so lists 
+show and sort by ratings without counting comments; "average_rank" is the mean rank, or None without ranks.
+- "Meta.indexes": A composite index on ("current_date", "id"), the keyset the `apis` list endpoint pages on. A 
+composite index on ("level", "language", "user_gender", "play_date") matches the search of the post list, which 
+always compares the three choices and optionally a range of play dates. A composite index on ("level", 
+"language", "birth_year") serves an age range searched with a level and language, and one on "birth_year" an age 
+range alone; both also serve ranges open at one end. An index on "play_date" finds the candidates of a partner 
+match (see `matching.py`). The "club_name" search (`icontains`) uses a trigram index created by migration `0007` 
+where `pg_trgm` is available (see `dj_proj/trigram.py`).
 
 The "__str__" method is overridden to provide a string representation of the "Posts" object, returning the user's 
 name followed by "Post".
 
-The "save" method is overridden to perform additional actions when saving the object. It resizes the image 
-associated with the post if its height or width exceeds 300 pixels.
+The uploaded image is stored untouched. Resized copies for list cards, the detail page and high density screens 
+are produced off-request by the `images` app (see `IMAGE_DERIVATIVE_FIELDS` in the settings) and served with the 
+`derivative` template filter.
 """
 
 
@@ -103,6 +125,26 @@ class Comments(models.Model):
 
 
 class Messages(models.Model):
-    sender = models.IntegerField()
-    recipient = models.IntegerField()
-    content = models.TextField(max_length=1000)
\ No newline at end of file
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages', db_index=False)
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages', db_index=False)
+    content = models.TextField(max_length=1000)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender', 'recipient', 'created_at'], name='tennis_message_pair_idx'),
+            models.Index(fields=['recipient', 'created_at'], name='tennis_message_recipient_idx'),
+        ]
+
+
+"""
+- "sender" and "recipient": The users who wrote and received the message. Deleting a user deletes their messages.
+- "content": The text of the message, at most 1000 characters.
+- "created_at": When the message was sent.
+- "Meta.indexes": A composite index on ("sender", "recipient", "created_at") serves the messages a user sent, and 
+the thread of two users in order, from both directions. One on ("recipient", "created_at") serves the messages a 
+user received. Together they cover the inbox, which reads the messages a user sent or received. The foreign keys 
+get no index of their own, since both indexes start with them.
+
+The conversation queries and the delivery of new messages are in `tennis_app/messaging.py`.
+"""
\ No newline at end of file
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from .ages import set_birth_year
+from .counters import count_comment
+from .messaging import publish
+from .models import Comments, Messages, Posts
+
+
+def announce_message(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: publish(instance), using=using)
+
+
+def remember_counted(sender, instance, **kwargs):
+    instance._counted = (instance.__dict__.get('post_id'), instance.__dict__.get('rank'))
+
+
+def count_saved_comment(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    posts = Posts.objects.using(using)
+    counted = (instance.post_id, instance.rank)
+    if created:
+        count_comment(posts, *counted, 1)
+    elif counted != instance._counted:
+        with transaction.atomic(using=using):
+            count_comment(posts, *instance._counted, -1)
+            count_comment(posts, *counted, 1)
+    instance._counted = counted
+
+
+def uncount_deleted_comment(sender, instance, using=None, **kwargs):
+    count_comment(Posts.objects.using(using), *instance._counted, -1)
+
+
+def date_birth_year(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'birth_date' not in update_fields):
+        return
+    set_birth_year(instance)
+
+
+def connect_messages():
+    post_save.connect(announce_message, sender=Messages, dispatch_uid="tennis_announce_message")
+
+
+def connect_comment_counters():
+    post_init.connect(remember_counted, sender=Comments, dispatch_uid="tennis_remember_counted")
+    post_save.connect(count_saved_comment, sender=Comments, dispatch_uid="tennis_count_saved_comment")
+    post_delete.connect(uncount_deleted_comment, sender=Comments, dispatch_uid="tennis_uncount_deleted_comment")
+
+
+def connect_birth_year():
+    pre_save.connect(date_birth_year, sender=Posts, dispatch_uid="tennis_date_birth_year")
+
+"""
+- `announce_message()` is connected to `post_save` of `Messages` and publishes every new message to the channel
+layer (see `messaging.py`) once the transaction that saved it commits, so waiting requests never look for a row
+they cannot see yet, and a rolled back message is never announced. Fixture loading (`raw` saves) is skipped.
+
+- The comment counters of tennis posts (see `counters.py`) follow every comment saved or deleted through the model:
+    - `remember_counted()` records the post and rank a comment was loaded or last saved with;
+    - `count_saved_comment()` counts a new comment on its post, and moves an edited comment whose post or rank
+    changed from the old counters to the new ones in one transaction;
+    - `uncount_deleted_comment()` removes a deleted comment, also when it goes with its post or author.
+Fixture loading (`raw` saves) is skipped; run `python manage.py rebuild_post_counters` after loading comments.
+
+- `date_birth_year()` is connected to `pre_save` of `Posts` and sets the `birth_year` of a post from its birth date
+(see `ages.py`). Fixture loading (`raw` saves) and saves that only write other fields are skipped; a save with
+`update_fields` that writes `birth_date` should list `birth_year` too.
+
+- `connect_messages()`, `connect_comment_counters()` and `connect_birth_year()` are called from
+`TennisAppConfig.ready()` and connect the receivers.
+"""
@@ -1,7 +1,20 @@
-from django.test import TestCase
+import asyncio
+import threading
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
-from tennis_app.models import Posts
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from dj_proj.trigram import trigram_installed
+from tennis_app import ages, matching, messaging
+from tennis_app.models import Comments, Messages, Posts
+from tennis_app.views import PostListView
 
 
 class PostListViewTest(TestCase):
@@ -305,3 +318,409 @@ class PostDeleteViewTest(TestCase):
     - The `assertFalse` method is used to check that the post does not exist in the database.
     """
 
+
+class PostSearchIndexUsageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        Posts.objects.bulk_create(
+            Posts(
+                user_gender='MFO'[i % 3],
+                birth_date=f'{1960 + i % 40}-06-01',
+                birth_year=1960 + i % 40,
+                phone='123456789',
+                description='Looking for a partner',
+                play_date=f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00Z',
+                level=str(i % 5 + 1),
+                language=str(i // 5 % 5 + 1),
+                club_name=f'Club {i % 7}',
+                author=cls.user,
+            )
+            for i in range(2000)
+        )
+
+    def search_plan(self, **params):
+        view = PostListView()
+        view.setup(RequestFactory().get(reverse('tennis-post-list'), params))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tennis_app_posts')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return view.get_queryset().explain()
+    """
+    The `search_plan` helper runs the query the tennis `PostListView` builds for the given search parameters 
+    (no level, language or gender unless given) through `EXPLAIN`. The table is analyzed, so the planner knows 
+    how selective each index is, and sequential scans are switched off for the current transaction, since on a 
+    table this small the planner would read the whole table whatever indexes exist. The posts spread over every 
+    level and language pair, play date and birth year, so the indexes that start with the level and language differ
+    in cost by the column that follows.
+    """
+
+    def test_choice_and_date_search_uses_search_index(self):
+        plan = self.search_plan(level='3', language='1', gender='M', start_date='2024-01-01', end_date='2024-01-15')
+        self.assertIn('tennis_post_search_idx', plan)
+        self.assertIn('play_date', plan.split('tennis_post_search_idx', 1)[1])
+    """
+    - The `test_choice_and_date_search_uses_search_index` method tests that a search on level, language, gender 
+    and a play date range is answered by `tennis_post_search_idx`, including the date range.
+    """
+
+    def test_age_search_uses_birth_year_indexes(self):
+        plan = self.search_plan(level='3', language='1', start_age=30, end_age=40)
+        self.assertIn('tennis_post_age_search_idx', plan)
+        self.assertIn('birth_year', plan.split('tennis_post_age_search_idx', 1)[1])
+        self.assertIn('tennis_post_birth_year_idx', self.search_plan(start_age=30))
+        self.assertIn('tennis_post_birth_year_idx', self.search_plan(end_age=40))
+    """
+    - The `test_age_search_uses_birth_year_indexes` method tests that an age range searched with a level and 
+    language is answered by `tennis_post_age_search_idx`, including the birth years, and that a range open at 
+    either end uses `tennis_post_birth_year_idx`.
+    """
+
+    def test_location_search_uses_trigram_index(self):
+        if not trigram_installed(connection):
+            self.skipTest('pg_trgm is not installed')
+        self.assertIn('tennis_post_club_trgm_idx', self.search_plan(location='club'))
+    """
+    - The `test_location_search_uses_trigram_index` method tests that the club name search uses the trigram index. 
+    It is skipped where the `pg_trgm` extension is not available.
+    """
+
+
+class PostAgeSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        this_year = date.today().year
+        cls.posts = {
+            age: Posts.objects.create(
+                birth_date=f'{this_year - age}-06-01',
+                phone='123456789',
+                description='Looking for a partner',
+                level='3',
+                language='1',
+                author=cls.user,
+            )
+            for age in (20, 30, 40)
+        }
+
+    def search(self, **params):
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('tennis-post-list'), params)
+        return sorted(age for age, post in self.posts.items() if post in response.context['posts'])
+
+    def test_birth_year_follows_birth_date(self):
+        post = self.posts[20]
+        self.assertEqual(post.birth_year, date.today().year - 20)
+        post.birth_date = date(1985, 12, 31)
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.birth_year, 1985)
+
+        Posts.objects.filter(pk=post.pk).update(birth_date=date(1970, 1, 1))
+        self.assertEqual(ages.rebuild(Posts.objects.all()), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.birth_year, 1970)
+    """
+    - The `test_birth_year_follows_birth_date` method tests that saving a post sets its birth year from its birth 
+    date, given as a string or a date, and that `ages.rebuild` fixes a post whose birth date was updated without the
+    model, and only that one.
+    """
+
+    def test_age_ranges(self):
+        self.assertEqual(self.search(start_age=25, end_age=35), [30])
+        self.assertEqual(self.search(start_age=25), [30, 40])
+        self.assertEqual(self.search(end_age=35), [20, 30])
+        self.assertEqual(self.search(start_age=30, end_age=30), [30])
+        self.assertEqual(self.search(start_age=0), [20, 30, 40])
+        self.assertEqual(self.search(start_age=25, level='A', language='A', gender='A'), [30, 40])
+        self.assertEqual(self.search(end_age=35, level='3', language='1'), [20, 30])
+        self.assertEqual(self.search(end_age=35, level='4'), [])
+    """
+    - The `test_age_ranges` method tests the age search of the post list: a closed range, ranges open at either 
+    end, a single age and an age of zero, which the old search ignored. The ages are sent alone, as the form sends
+    them when no level, language or gender is chosen, and with "Any", a level and a language, or another level.
+    """
+
+
+class MessagingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='testpassword')
+        cls.bob = User.objects.create_user(username='bob', password='testpassword')
+        cls.carol = User.objects.create_user(username='carol', password='testpassword')
+        cls.first = Messages.objects.create(sender=cls.alice, recipient=cls.bob, content='Play on Sunday?')
+        cls.reply = Messages.objects.create(sender=cls.bob, recipient=cls.alice, content='Sure, at ten.')
+        cls.other = Messages.objects.create(sender=cls.carol, recipient=cls.alice, content='Doubles next week?')
+        Messages.objects.create(sender=cls.bob, recipient=cls.carol, content='Not for Alice.')
+
+    def test_inbox_lists_latest_message_per_conversation_in_one_query(self):
+        with self.assertNumQueries(1):
+            inbox = list(messaging.inbox(self.alice))
+        self.assertEqual(inbox, [self.other, self.reply])
+        self.assertEqual([message.other for message in inbox], [self.carol.pk, self.bob.pk])
+        self.assertEqual(inbox[1].sender.username, 'bob')
+    """
+    - The `test_inbox_lists_latest_message_per_conversation_in_one_query` method tests that the inbox has the latest
+    message of each conversation of the user, newest first, and only those, read with one query.
+    """
+
+    def test_inbox_uses_message_indexes(self):
+        sql, params = messaging.inbox(self.alice).select_related(None).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tennis_app_messages')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn('tennis_message_pair_idx', plan)
+        self.assertIn('tennis_message_recipient_idx', plan)
+    """
+    - The `test_inbox_uses_message_indexes` method tests that the inbox reads the messages a user sent
+    and received through the two indexes of `Messages`. The users are not joined, so the plan shows how the messages
+    are found; the table is analyzed and sequential scans are switched off, since it is tiny.
+    `QuerySet.explain()` cannot explain a query filtered on a window function, so `EXPLAIN` is run directly.
+    """
+
+    def test_conversation_view(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('tennis-conversation', args=['bob']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['chat_messages'], [self.first, self.reply])
+        self.assertEqual(response.context['cursor'], self.other.pk)
+
+        response = self.client.post(reverse('tennis-conversation', args=['bob']), {'content': 'See you there.'})
+        self.assertRedirects(response, reverse('tennis-conversation', args=['bob']))
+        response = self.client.post(reverse('tennis-conversation', args=['bob']), {'content': 'Bring balls.'},
+                                    headers={'x-requested-with': 'XMLHttpRequest'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(Messages.objects.filter(sender=self.alice).order_by('id').values_list('recipient__username', 'content')),
+            [('bob', 'Play on Sunday?'), ('bob', 'See you there.'), ('bob', 'Bring balls.')],
+        )
+        self.assertEqual(self.client.get(reverse('tennis-conversation', args=['nobody'])).status_code, 404)
+    """
+    - The `test_conversation_view` method tests that the conversation page shows the messages between two users
+    with the cursor of the logged-in user, and that posting the form, plain or from the page's script, sends a
+    message to the user named in the URL.
+    """
+
+    def test_new_message_is_published_on_commit(self):
+        with mock.patch('tennis_app.signals.publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                message = Messages.objects.create(sender=self.alice, recipient=self.bob, content='Hi')
+                publish.assert_not_called()
+        publish.assert_called_once_with(message)
+    """
+    - The `test_new_message_is_published_on_commit` method tests that a new message is announced to the channel
+    layer once its transaction commits, not before.
+    """
+
+    def test_layer_wakes_listeners_from_another_thread(self):
+        layer = messaging.InProcessChannelLayer()
+
+        async def listen():
+            async with layer.listen('group') as notified:
+                threading.Timer(0.05, layer.group_send, ['group', {'id': 1}]).start()
+                return await asyncio.wait_for(notified, 5)
+
+        self.assertEqual(asyncio.run(listen()), {'id': 1})
+        self.assertEqual(layer.groups, {})
+    """
+    - The `test_layer_wakes_listeners_from_another_thread` method tests that `InProcessChannelLayer` resolves a
+    listener in its event loop when a message is sent from another thread, and forgets it once it stops listening.
+    """
+
+    @override_settings(TENNIS_MESSAGE_POLL_TIMEOUT=0.05)
+    def test_poll_answers_at_once_or_after_the_timeout(self):
+        url = reverse('tennis-message-poll')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.alice)
+        self.assertEqual(self.client.get(url).json(), {'messages': [], 'cursor': self.other.pk})
+
+        data = self.client.get(url, {'after': self.first.pk}).json()
+        self.assertEqual([message['content'] for message in data['messages']], ['Sure, at ten.', 'Doubles next week?'])
+        self.assertEqual(data['cursor'], self.other.pk)
+        self.assertEqual(self.client.get(url, {'after': self.other.pk}).json(), {'messages': [], 'cursor': self.other.pk})
+    """
+    - The `test_poll_answers_at_once_or_after_the_timeout` method tests that the poll needs a logged-in user, gives
+    the current cursor without `after`, answers at once with the messages after a cursor (only those of the user),
+    and answers with none once `TENNIS_MESSAGE_POLL_TIMEOUT` is over.
+    """
+
+    @override_settings(TENNIS_MESSAGE_POLL_TIMEOUT=30)
+    async def test_poll_is_woken_up_by_a_new_message(self):
+        await sync_to_async(self.async_client.force_login)(self.bob)
+        after = await sync_to_async(messaging.latest_id)(self.bob)
+        poll = asyncio.create_task(self.async_client.get(reverse('tennis-message-poll'), {'after': after}))
+        await asyncio.sleep(0.1)
+        self.assertFalse(poll.done())
+        message = await sync_to_async(Messages.objects.create)(sender=self.alice, recipient=self.bob, content='Now?')
+        messaging.publish(message)
+        response = await asyncio.wait_for(poll, 5)
+        self.assertEqual(response.json()['messages'][0]['content'], 'Now?')
+        self.assertEqual(response.json()['cursor'], message.pk)
+    """
+    - The `test_poll_is_woken_up_by_a_new_message` method tests that a waiting poll answers as soon as a message
+    for the user is published, well before the timeout, with that message.
+    """
+
+
+class PostCommentCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.posts = [
+            Posts.objects.create(phone='123456789', description=f'Post {i}', level='1', language='1', author=cls.user)
+            for i in range(3)
+        ]
+
+    def counters(self, post):
+        post.refresh_from_db()
+        return post.comment_count, post.rank_sum, post.rank_count
+
+    def test_counters_follow_comments(self):
+        first, second, _ = self.posts
+        good = Comments.objects.create(text='Good', rank='4', author=self.user, post=first)
+        Comments.objects.create(text='Perfect', rank='5', author=self.user, post=first)
+        unranked = Comments.objects.create(text='No rank', rank='', author=self.user, post=first)
+        self.assertEqual(self.counters(first), (3, 9, 2))
+        self.assertEqual(first.average_rank, 4.5)
+
+        good.rank = '2'
+        good.save()
+        self.assertEqual(self.counters(first), (3, 7, 2))
+        moved = Comments.objects.get(pk=unranked.pk)
+        moved.post, moved.rank = second, '3'
+        moved.save()
+        self.assertEqual(self.counters(first), (2, 7, 2))
+        self.assertEqual(self.counters(second), (1, 3, 1))
+
+        good.delete()
+        self.assertEqual(self.counters(first), (1, 5, 1))
+        self.assertEqual(self.counters(self.posts[2]), (0, 0, 0))
+        self.assertIsNone(self.posts[2].average_rank)
+    """
+    - The `test_counters_follow_comments` method tests that creating, editing (rank and post) and deleting comments
+    keeps the comment count, rank sum and rank count of their posts, and the average rank, up to date. Comments
+    without a rank are counted as comments only.
+    """
+
+    def test_rebuild_command(self):
+        first, second, third = self.posts
+        Comments.objects.create(text='Good', rank='3', author=self.user, post=first)
+        Comments.objects.create(text='Bad', rank='1', author=self.user, post=second)
+        Comments.objects.create(text='No rank', rank='', author=self.user, post=second)
+        Posts.objects.update(comment_count=9, rank_sum=9, rank_count=9)
+        out = StringIO()
+        call_command('rebuild_post_counters', batch_size=2, stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Rebuilt the counters of 3 posts.')
+        self.assertEqual([self.counters(post) for post in self.posts], [(1, 3, 1), (2, 1, 1), (0, 0, 0)])
+    """
+    - The `test_rebuild_command` method tests that `rebuild_post_counters` recomputes wrong counters of every post,
+    in batches, from the comments.
+    """
+
+    def test_list_sorts_by_rating_without_reading_comments(self):
+        first, second, third = self.posts
+        for post, ranks in ((first, '33'), (second, '55'), (third, '')):
+            for rank in ranks:
+                Comments.objects.create(text='Text', rank=rank, author=self.user, post=post)
+        self.client.force_login(self.user)
+        params = {'level': 'A', 'language': 'A', 'gender': 'A', 'sort': 'rating'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tennis-post-list'), params)
+        self.assertEqual(list(response.context['posts']), [second, first, third])
+        self.assertNotIn('tennis_app_comments', ' '.join(query['sql'] for query in queries))
+        self.assertContains(response, '5.0 &#9733; (2 reviews), 2 comments', html=False)
+        self.assertContains(response, 'No reviews yet')
+    """
+    - The `test_list_sorts_by_rating_without_reading_comments` method tests that the search page sorted by rating
+    lists the best rated post first and posts without ranks last, shows the rating of every card, and never reads
+    the comments table to do so.
+    """
+
+
+class PartnerMatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.other = User.objects.create_user(username='other', password='testpassword')
+
+        def post(author=cls.other, level='3', language='1', birth_date='1990-01-01', play_date='2030-06-10', **fields):
+            return Posts.objects.create(
+                phone='123456789', description='Partner wanted', author=author, level=level, language=language,
+                birth_date=birth_date, play_date=f'{play_date}T12:00:00Z', **fields,
+            )
+
+        cls.own = post(author=cls.user, club_name='Rot-Weiss')
+        cls.perfect = post(club_name='rot-weiss')
+        cls.other_club = post(club_name='Blau-Gold')
+        cls.level_apart = post(level='5')
+        cls.other_language = post(language='2')
+        cls.older = post(birth_date='1960-01-01')
+        cls.later = post(play_date='2030-06-20')
+        cls.next_month = post(play_date='2030-07-20')
+
+    def partners(self, **kwargs):
+        preferences = {
+            'level': '3', 'language': '1', 'birth_date': date(1990, 1, 1), 'play_date': date(2030, 6, 10),
+            'club_name': 'Rot-Weiss', **kwargs,
+        }
+        return list(matching.find_partners(self.user, **preferences))
+
+    def test_posts_are_ranked_by_score(self):
+        partners = self.partners()
+        self.assertEqual(partners[0], self.perfect)
+        self.assertEqual(
+            {post: round(post.score, 2) for post in partners},
+            {self.perfect: 9, self.other_club: 8, self.older: 7, self.later: 6.57, self.level_apart: 6.5,
+             self.other_language: 6},
+        )
+        self.assertEqual([post.score for post in partners], sorted((post.score for post in partners), reverse=True))
+    """
+    - The `test_posts_are_ranked_by_score` method tests the parts of the score: the post that matches in every
+    way scores the sum of the weights (the club compared ignoring case), and every difference costs its part.
+    """
+
+    def test_candidates(self):
+        partners = self.partners()
+        self.assertNotIn(self.own, partners)
+        self.assertNotIn(self.next_month, partners)
+        self.assertEqual(len(self.partners(play_date=datetime(2030, 7, 6, 12, tzinfo=dt_timezone.utc))), 1)
+        self.assertEqual(len(matching.find_partners(self.user, '3', '1', date(1990, 1, 1), date(2030, 6, 10),
+                                                    limit=2)), 2)
+    """
+    - The `test_candidates` method tests that the user's own posts and posts to be played more than two weeks from
+    the wanted day are not ranked, and that `limit` bounds the results.
+    """
+
+    @override_settings(TENNIS_MATCH_WEIGHTS={'level': 0, 'language': 0, 'age': 0, 'play_date': 0, 'club': 1})
+    def test_weights_setting(self):
+        scores = {post: post.score for post in self.partners()}
+        self.assertEqual(scores[self.perfect], 1)
+        self.assertEqual(scores[self.other_club], 0)
+    """
+    - The `test_weights_setting` method tests that `TENNIS_MATCH_WEIGHTS` changes the weights and leaves out parts
+    with weight 0.
+    """
+
+    def test_view_starts_from_latest_post(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('tennis-partner-match'))
+        self.assertEqual(response.context['form']['club_name'].value(), 'Rot-Weiss')
+        self.assertEqual(response.context['posts'][0], self.perfect)
+        self.assertContains(response, 'Match:</strong> 9.0', html=False)
+
+        response = self.client.get(reverse('tennis-partner-match'), {
+            'level': '5', 'language': '1', 'birth_date': '1990-01-01', 'play_date': '2030-06-10',
+        })
+        self.assertEqual(response.context['posts'][0], self.level_apart)
+
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('tennis-partner-match'))
+        self.assertEqual(response.status_code, 200)
+    """
+    - The `test_view_starts_from_latest_post` method tests that the partner page ranks posts for the preferences
+    of the user's latest post, or for those submitted in the form, with a fixed number of queries (session, user,
+    latest post, candidates and their authors).
+    """
@@ -10,6 +10,10 @@ urlpatterns =[
     path('<int:pk>/update/',views.PostUpdateView.as_view(), name='tennis-post-update'),
     path('<int:pk>/delete/',views.PostDeleteView.as_view(),name='tennis-post-delete'),
     path('<int:pk>/detail/',views.PostDetailView.as_view(),name='tennis-post-detail'),
+    path('match/', views.PartnerMatchView.as_view(), name='tennis-partner-match'),
+    path('messages/', views.InboxView.as_view(), name='tennis-inbox'),
+    path('messages/poll/', views.MessagePollView.as_view(), name='tennis-message-poll'),
+    path('messages/<str:username>/', views.ConversationView.as_view(), name='tennis-conversation'),
 ]
 
 if settings.DEBUG:
@@ -36,6 +40,18 @@ deletion of a post. The name of this URL pattern is 'tennis-post-delete'.
 integer parameter (`<int:pk>`) from the URL and maps it to the `PostDetailView` view class. This view displays the 
 details of a specific post. The name of this URL pattern is 'tennis-post-detail'.
 
+6. `path('match/', views.PartnerMatchView.as_view(), name='tennis-partner-match')`: The posts of other players 
+ranked as partners for the logged-in user.
+
+7. `path('messages/', views.InboxView.as_view(), name='tennis-inbox')`: The conversations of the logged-in user.
+
+8. `path('messages/poll/', views.MessagePollView.as_view(), name='tennis-message-poll')`: The long poll that 
+delivers new messages to open conversations. It comes before the conversation pattern, so it is not read as a 
+username.
+
+9. `path('messages/<str:username>/', views.ConversationView.as_view(), name='tennis-conversation')`: The messages 
+between the logged-in user and the user with that username, and the form to write to them.
+
 Additionally, the code checks if the project is in debug mode (`settings.DEBUG`) and, if so, adds a URL pattern to 
 serve media files (`static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)`).
 """
\ No newline at end of file
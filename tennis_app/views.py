@@ -1,5 +1,9 @@
+import asyncio
 from typing import Any
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse, JsonResponse
 
 from django.shortcuts import get_object_or_404,render,redirect
 from django.views.generic import (TemplateView,
@@ -11,13 +15,14 @@ from django.views.generic import (TemplateView,
                                   View)
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from .models import Posts
+from listcache.mixins import ListCacheMixin
 from django.urls import path, reverse_lazy
 from django.contrib import messages
-from tennis_app import forms
-from datetime import datetime, timedelta
+from tennis_app import ages, forms, matching, messaging
+from tennis_app.counters import RATING
 
 
-class PostListView(LoginRequiredMixin,ListView):
+class PostListView(ListCacheMixin, LoginRequiredMixin, ListView):
     model = Posts
     template_name = 'tennis/post_search.html'
     context_object_name = 'posts'
@@ -43,12 +48,8 @@ class PostListView(LoginRequiredMixin,ListView):
 
             # Customize the queryset based on your search criteria
             # This is just a simple example, adjust it based on your model fields
-            if start_age and end_age:
-                end_year = datetime.now().year - start_age
-                start_year = datetime.now().year - end_age-1 
-                start_date_str = f"{start_year}-01-01T00:00:00Z"
-                end_date_str = f"{end_year}-12-31T23:59:59Z"
-                queryset = queryset.filter(birth_date__range=(start_date_str, end_date_str))
+            if start_age is not None or end_age is not None:
+                queryset = queryset.filter(ages.age_filter(start_age, end_age))
 
             if start_date and end_date:
                 queryset = queryset.filter(play_date__range=(start_date,end_date))
@@ -56,21 +57,23 @@ class PostListView(LoginRequiredMixin,ListView):
             if location:
                 queryset = queryset.filter(club_name__icontains=location)
                 
-            if level!= 'A':
+            if level not in ('', 'A'):
                 queryset = queryset.filter(level=level)
 
-            if language != 'A':
+            if language not in ('', 'A'):
                  queryset = queryset.filter(language=language)
            
-            if gender != 'A':
+            if gender not in ('', 'A'):
                 queryset = queryset.filter(user_gender=gender)             
-                
-            if not ( start_date or end_date or location or level or language or gender):
-              queryset = self.model.objects.all()
+
+            if form.cleaned_data.get('sort') == 'rating':
+                queryset = queryset.order_by(RATING.desc(nulls_last=True), '-rank_count', '-id')
 
             return queryset
 
 """
+- `ListCacheMixin` caches the rendered search results per normalized query string until a post or a user changes 
+(see `LIST_CACHE_VIEWS`), so repeating a search neither queries the posts nor renders them again.
 - `model`: This attribute specifies the model class that the view will be working with, it is a model `Posts`.
 - `template_name`: This attribute specifies the template to be used for rendering the view, in this case, it is 
 set to `'tennis/post_search.html'`.
@@ -81,7 +84,11 @@ template. It calls the parent class method to get the initial context data and t
 instance of `forms.SearchForm()` as its value.
 - `get_queryset(self)`: This method is overridden to customize the queryset based on the search criteria provided 
 in the `forms.SearchForm`. It retrieves the form data from the request, performs filtering on the `queryset` based 
-on the form data, and returns the modified queryset.
+on the form data, and returns the modified queryset. A level, language or gender left out or set to "Any" 
+(`'A'`) is not filtered on. The age range compares the indexed `birth_year` column and 
+either end may be left empty (`ages.age_filter`). Sorted by rating, the posts are ordered by the average rank 
+computed from their counter columns (`counters.RATING`), then by the number of ranks, with no aggregate over the 
+comments.
 """
 
 
@@ -252,3 +259,107 @@ Otherwise, it returns `False`.
   
 
 
+
+
+class InboxView(LoginRequiredMixin, ListView):
+    template_name = 'tennis/inbox.html'
+    context_object_name = 'conversations'
+
+    def get_queryset(self):
+        return messaging.inbox(self.request.user)
+"""
+- `InboxView` lists the conversations of the logged-in user with the latest message of each, newest first. The
+list is read with one query (see `messaging.inbox()`).
+"""
+
+
+class ConversationView(LoginRequiredMixin, View):
+    template_name = 'tennis/conversation.html'
+
+    def get(self, request, *args, **kwargs):
+        other = get_object_or_404(User, username=self.kwargs['username'])
+        context = {
+            'other': other,
+            'chat_messages': messaging.conversation(request.user, other),
+            'cursor': messaging.latest_id(request.user),
+            'form': forms.MessageForm(),
+        }
+        return render(request, self.template_name, context)
+
+    def post(self, request, *args, **kwargs):
+        other = get_object_or_404(User, username=self.kwargs['username'])
+        form = forms.MessageForm(request.POST)
+        if form.is_valid():
+            message = form.save(commit=False)
+            message.sender = request.user
+            message.recipient = other
+            message.save()
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'errors': form.errors}, status=400 if form.errors else 201)
+        return redirect('tennis-conversation', username=other.username)
+"""
+- `ConversationView` shows the last messages between the logged-in user and the user named in the URL, with a
+form to write to them. `cursor` is the id of the newest message of the user when the page was rendered; the page
+asks `MessagePollView` for the messages after it.
+- `post` saves a new message from the logged-in user. A form posted by the page's script gets a JSON answer, and
+the message itself arrives through the poll like messages of the other user; a plain form is redirected back to
+the conversation.
+"""
+
+
+class MessagePollView(View):
+    async def get(self, request, *args, **kwargs):
+        user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+        if user is None:
+            return JsonResponse({'detail': 'Authentication required.'}, status=403)
+        try:
+            after = int(request.GET['after'])
+        except (KeyError, ValueError):
+            return JsonResponse({'messages': [], 'cursor': await sync_to_async(messaging.latest_id)(user)})
+
+        timeout = getattr(settings, 'TENNIS_MESSAGE_POLL_TIMEOUT', 25)
+        async with messaging.get_layer().listen(messaging.group_name(user.pk)) as notified:
+            found = await sync_to_async(messaging.messages_after)(user, after)
+            if not found:
+                try:
+                    await asyncio.wait_for(notified, timeout)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    found = await sync_to_async(messaging.messages_after)(user, after)
+        return JsonResponse({'messages': found, 'cursor': found[-1]['id'] if found else after})
+"""
+- `MessagePollView` is the long poll that delivers messages to open conversation pages. `GET ?after=<id>` answers
+at once with the messages of the logged-in user after that id, if there are any. Otherwise the request waits, up to
+`TENNIS_MESSAGE_POLL_TIMEOUT` seconds, until the channel layer announces a message for the user, and answers with
+it, or with no messages when the time is up. The answer carries the `cursor` to send with the next poll. Without
+`after` it answers at once with the current cursor.
+- The view is async: under ASGI a waiting request holds no thread, and nothing is read from the database while it
+waits. The layer starts listening before the first read, so a message saved in between is not missed. Under WSGI
+each waiting request holds a worker thread.
+"""
+
+
+class PartnerMatchView(LoginRequiredMixin, ListView):
+    template_name = 'tennis/partner_match.html'
+    context_object_name = 'posts'
+
+    def get_form(self):
+        data = self.request.GET or matching.preferences(self.request.user)
+        return forms.MatchForm(data if 'level' in data else None, initial=data)
+
+    def get_queryset(self):
+        self.form = self.get_form()
+        if not self.form.is_valid():
+            return Posts.objects.none()
+        return matching.find_partners(self.request.user, **self.form.cleaned_data)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = self.form
+        return context
+"""
+- `PartnerMatchView` ranks the tennis posts of other players as partners for the logged-in user, best first, with
+their score (see `matching.find_partners()`). The `MatchForm` is filled in from the query string, or else from the
+user's latest post; a user without posts gets an empty form and no results until they submit it.
+"""